@@ -7,6 +7,7 @@ from alembic import context
 import db_lib
 from depends import db_depends
 from domain.github.stars import GithubStarsAPIResponseModel
+from domain.github.stars.search import include_search_index_name
 import settings
 from sqlalchemy import engine_from_config, pool
 
@@ -50,6 +51,7 @@ def run_migrations_offline() -> None:
     context.configure(
         url=url,
         target_metadata=target_metadata,
+        include_name=include_search_index_name,
         literal_binds=True,
         dialect_opts={"paramstyle": "named"},
     )
@@ -72,7 +74,12 @@ def run_migrations_online() -> None:
     )
 
     with connectable.connect() as connection:
-        context.configure(connection=connection, target_metadata=target_metadata)
+        ## The full-text search index is not in the metadata, keep autogenerate from dropping it
+        context.configure(
+            connection=connection,
+            target_metadata=target_metadata,
+            include_name=include_search_index_name,
+        )
 
         with context.begin_transaction():
             context.run_migrations()
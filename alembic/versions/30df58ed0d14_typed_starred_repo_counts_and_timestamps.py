@@ -0,0 +1,234 @@
+"""typed starred repo counts and timestamps
+
+Revision ID: 30df58ed0d14
+Revises: f615558ef0cf
+Create Date: 2026-10-17 16:05:31.184620
+
+"""
+from datetime import datetime, timezone
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '30df58ed0d14'
+down_revision: Union[str, None] = 'f615558ef0cf'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+## Rows are read & written this many at a time while moving the timestamps
+BACKFILL_CHUNK_SIZE: int = 1000
+
+## id can be past the 32-bit range, the other counts stay well under it
+BIGINT_COLUMNS: list[str] = ['id']
+INTEGER_COLUMNS: list[str] = [
+    'size',
+    'stargazers_count',
+    'watchers_count',
+    'forks_count',
+    'open_issues_count',
+    'forks',
+    'open_issues',
+    'watchers',
+]
+GH_TIMESTAMP_COLUMNS: dict[str, str] = {
+    'created_at': 'gh_created_at',
+    'updated_at': 'gh_updated_at',
+    'pushed_at': 'gh_pushed_at',
+}
+
+repo_table = sa.table(
+    'gh_starred_repo',
+    sa.column('repo_id', sa.Integer),
+    sa.column('created_at', sa.TEXT),
+    sa.column('updated_at', sa.TEXT),
+    sa.column('pushed_at', sa.TEXT),
+    sa.column('gh_created_at', sa.TIMESTAMP),
+    sa.column('gh_updated_at', sa.TIMESTAMP),
+    sa.column('gh_pushed_at', sa.TIMESTAMP),
+)
+
+
+def _parse_timestamp(value: str | None) -> datetime | None:
+    """Parse one of Github's ISO 8601 timestamps, i.e. '2020-01-01T00:00:00Z', to a naive UTC datetime."""
+    if not value:
+        return None
+
+    parsed: datetime = datetime.fromisoformat(value)
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+
+    return parsed
+
+
+def _format_timestamp(value: datetime | None) -> str:
+    """Format a naive UTC datetime the way the Github API does."""
+    if value is None:
+        return ''
+
+    return value.strftime('%Y-%m-%dT%H:%M:%SZ')
+
+
+def _iter_repo_rows(bind: sa.Connection, columns: list[str]):
+    """Yield chunks of rows from gh_starred_repo, paging on repo_id so the table is never loaded at once."""
+    last_repo_id: int = 0
+
+    while True:
+        rows = bind.execute(
+            sa.select(repo_table.c.repo_id, *[repo_table.c[col] for col in columns])
+            .where(repo_table.c.repo_id > last_repo_id)
+            .order_by(repo_table.c.repo_id)
+            .limit(BACKFILL_CHUNK_SIZE)
+        ).all()
+
+        if not rows:
+            return
+
+        yield rows
+        last_repo_id = rows[-1].repo_id
+
+
+def upgrade() -> None:
+    with op.batch_alter_table('gh_starred_repo') as batch_op:
+        for gh_column in GH_TIMESTAMP_COLUMNS.values():
+            batch_op.add_column(sa.Column(gh_column, sa.TIMESTAMP(), nullable=True))
+
+    ## Move Github's timestamps out of the TEXT columns. The rows were saved before their own
+    #  created_at & updated_at were tracked, so those are reset to the time of the migration below.
+    bind = op.get_bind()
+    stmt = (
+        sa.update(repo_table)
+        .where(repo_table.c.repo_id == sa.bindparam('b_repo_id'))
+        .values(
+            gh_created_at=sa.bindparam('b_gh_created_at'),
+            gh_updated_at=sa.bindparam('b_gh_updated_at'),
+            gh_pushed_at=sa.bindparam('b_gh_pushed_at'),
+        )
+    )
+
+    for rows in _iter_repo_rows(bind, list(GH_TIMESTAMP_COLUMNS)):
+        bind.execute(
+            stmt,
+            [
+                {
+                    'b_repo_id': row.repo_id,
+                    'b_gh_created_at': _parse_timestamp(row.created_at),
+                    'b_gh_updated_at': _parse_timestamp(row.updated_at),
+                    'b_gh_pushed_at': _parse_timestamp(row.pushed_at),
+                }
+                for row in rows
+            ],
+        )
+
+    ## The old values were moved above & are reset below. Overwrite them with the migration time first, so
+    #  every row casts to TIMESTAMP, i.e. MySQL rejects Github's trailing 'Z' & Postgres rejects ''
+    bind.execute(
+        sa.update(repo_table).values(
+            created_at=sa.cast(sa.func.current_timestamp(), sa.TEXT),
+            updated_at=sa.cast(sa.func.current_timestamp(), sa.TEXT),
+        )
+    )
+
+    with op.batch_alter_table('gh_starred_repo') as batch_op:
+        batch_op.drop_column('pushed_at')
+        batch_op.alter_column('gh_created_at', existing_type=sa.TIMESTAMP(), nullable=False)
+        batch_op.alter_column('gh_updated_at', existing_type=sa.TIMESTAMP(), nullable=False)
+
+        for column in ('created_at', 'updated_at'):
+            batch_op.alter_column(
+                column,
+                existing_type=sa.TEXT(),
+                type_=sa.TIMESTAMP(),
+                server_default=sa.text('(CURRENT_TIMESTAMP)'),
+                existing_nullable=False,
+                postgresql_using=f'{column}::timestamp',
+            )
+
+        for column in BIGINT_COLUMNS:
+            batch_op.alter_column(
+                column,
+                existing_type=sa.NUMERIC(),
+                type_=sa.BigInteger(),
+                existing_nullable=False,
+                postgresql_using=f'{column}::bigint',
+            )
+        for column in INTEGER_COLUMNS:
+            batch_op.alter_column(
+                column,
+                existing_type=sa.NUMERIC(),
+                type_=sa.Integer(),
+                existing_nullable=False,
+                postgresql_using=f'{column}::integer',
+            )
+
+        for column in ['created_at', 'updated_at', *GH_TIMESTAMP_COLUMNS.values()]:
+            batch_op.create_index(batch_op.f(f'ix_gh_starred_repo_{column}'), [column], unique=False)
+
+    ## Set after the type change, casting text to TIMESTAMP on SQLite keeps only the leading number
+    bind.execute(
+        sa.update(repo_table).values(
+            created_at=sa.func.current_timestamp(),
+            updated_at=sa.func.current_timestamp(),
+        )
+    )
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('gh_starred_repo') as batch_op:
+        for column in ['created_at', 'updated_at', *GH_TIMESTAMP_COLUMNS.values()]:
+            batch_op.drop_index(batch_op.f(f'ix_gh_starred_repo_{column}'))
+
+        batch_op.add_column(sa.Column('pushed_at', sa.TEXT(), nullable=True))
+
+        for column in ('created_at', 'updated_at'):
+            batch_op.alter_column(
+                column,
+                existing_type=sa.TIMESTAMP(),
+                type_=sa.TEXT(),
+                server_default=None,
+                existing_nullable=False,
+                postgresql_using=f'{column}::text',
+            )
+
+        for column in [*BIGINT_COLUMNS, *INTEGER_COLUMNS]:
+            batch_op.alter_column(
+                column,
+                existing_type=sa.Integer(),
+                type_=sa.NUMERIC(),
+                existing_nullable=False,
+                postgresql_using=f'{column}::numeric',
+            )
+
+    ## Write Github's timestamps back to the TEXT columns, in the API's format
+    bind = op.get_bind()
+    stmt = (
+        sa.update(repo_table)
+        .where(repo_table.c.repo_id == sa.bindparam('b_repo_id'))
+        .values(
+            created_at=sa.bindparam('b_created_at'),
+            updated_at=sa.bindparam('b_updated_at'),
+            pushed_at=sa.bindparam('b_pushed_at'),
+        )
+    )
+
+    for rows in _iter_repo_rows(bind, list(GH_TIMESTAMP_COLUMNS.values())):
+        bind.execute(
+            stmt,
+            [
+                {
+                    'b_repo_id': row.repo_id,
+                    'b_created_at': _format_timestamp(row.gh_created_at),
+                    'b_updated_at': _format_timestamp(row.gh_updated_at),
+                    'b_pushed_at': _format_timestamp(row.gh_pushed_at),
+                }
+                for row in rows
+            ],
+        )
+
+    with op.batch_alter_table('gh_starred_repo') as batch_op:
+        batch_op.alter_column('pushed_at', existing_type=sa.TEXT(), nullable=False)
+
+        for gh_column in GH_TIMESTAMP_COLUMNS.values():
+            batch_op.drop_column(gh_column)
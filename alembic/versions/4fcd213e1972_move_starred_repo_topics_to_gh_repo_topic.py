@@ -0,0 +1,131 @@
+"""move starred repo topics to gh_repo_topic
+
+Revision ID: 4fcd213e1972
+Revises: 30df58ed0d14
+Create Date: 2026-10-17 16:48:09.573214
+
+"""
+import json
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4fcd213e1972'
+down_revision: Union[str, None] = '30df58ed0d14'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+## Repositories are read & their topics written this many at a time
+BACKFILL_CHUNK_SIZE: int = 1000
+
+repo_table = sa.table(
+    'gh_starred_repo',
+    sa.column('repo_id', sa.Integer),
+    sa.column('topics', sa.JSON().with_variant(sa.Text(), 'sqlite')),
+)
+topic_table = sa.table(
+    'gh_repo_topic',
+    sa.column('repo_id', sa.Integer),
+    sa.column('topic', sa.String),
+)
+
+
+def _load_topics(value: list[str] | str | None) -> list[str]:
+    """Parse a stored topics value. SQLite stores the list as JSON text, other databases as JSON."""
+    if not value:
+        return []
+    if isinstance(value, str):
+        value = json.loads(value)
+
+    return list(dict.fromkeys(value or []))
+
+
+def upgrade() -> None:
+    op.create_table(
+        'gh_repo_topic',
+        sa.Column('repo_id', sa.Integer(), nullable=False),
+        sa.Column('topic', sa.String(255), nullable=False),
+        sa.ForeignKeyConstraint(['repo_id'], ['gh_starred_repo.repo_id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('repo_id', 'topic'),
+    )
+    op.create_index('ix_gh_repo_topic_topic', 'gh_repo_topic', ['topic', 'repo_id'], unique=False)
+
+    ## Copy each repository's topics into gh_repo_topic, paging on repo_id so the table is never loaded at once
+    bind = op.get_bind()
+    last_repo_id: int = 0
+
+    while True:
+        rows = bind.execute(
+            sa.select(repo_table.c.repo_id, repo_table.c.topics)
+            .where(repo_table.c.repo_id > last_repo_id)
+            .order_by(repo_table.c.repo_id)
+            .limit(BACKFILL_CHUNK_SIZE)
+        ).all()
+
+        if not rows:
+            break
+
+        topic_rows: list[dict] = [
+            {'repo_id': row.repo_id, 'topic': topic}
+            for row in rows
+            for topic in _load_topics(row.topics)
+        ]
+        if topic_rows:
+            bind.execute(topic_table.insert(), topic_rows)
+
+        last_repo_id = rows[-1].repo_id
+
+    with op.batch_alter_table('gh_starred_repo') as batch_op:
+        batch_op.drop_index('ix_gh_starred_repo_topics')
+        batch_op.drop_column('topics')
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('gh_starred_repo') as batch_op:
+        batch_op.add_column(
+            sa.Column('topics', sa.JSON().with_variant(sa.Text(), 'sqlite'), nullable=True)
+        )
+
+    ## Write each repository's topics back to the column, repositories without topics get an empty list.
+    #  Serialized with json.dumps on every database, like the converter did before the topics table.
+    bind = op.get_bind()
+    topics_by_repo_id: dict[int, list[str]] = {}
+
+    for repo_id, topic in bind.execute(
+        sa.select(topic_table.c.repo_id, topic_table.c.topic).order_by(
+            topic_table.c.repo_id, topic_table.c.topic
+        )
+    ):
+        topics_by_repo_id.setdefault(repo_id, []).append(topic)
+
+    bind.execute(sa.update(repo_table).values(topics=json.dumps([])))
+
+    stmt = (
+        sa.update(repo_table)
+        .where(repo_table.c.repo_id == sa.bindparam('b_repo_id'))
+        .values(topics=sa.bindparam('b_topics'))
+    )
+    repo_ids: list[int] = list(topics_by_repo_id)
+
+    for start in range(0, len(repo_ids), BACKFILL_CHUNK_SIZE):
+        bind.execute(
+            stmt,
+            [
+                {'b_repo_id': repo_id, 'b_topics': json.dumps(topics_by_repo_id[repo_id])}
+                for repo_id in repo_ids[start : start + BACKFILL_CHUNK_SIZE]
+            ],
+        )
+
+    with op.batch_alter_table('gh_starred_repo') as batch_op:
+        batch_op.alter_column(
+            'topics',
+            existing_type=sa.JSON().with_variant(sa.Text(), 'sqlite'),
+            nullable=False,
+        )
+        batch_op.create_index('ix_gh_starred_repo_topics', ['topics'], unique=False)
+
+    op.drop_index('ix_gh_repo_topic_topic', table_name='gh_repo_topic')
+    op.drop_table('gh_repo_topic')
@@ -0,0 +1,156 @@
+"""add starred repo search index
+
+Revision ID: 6fbf65781171
+Revises: 4fcd213e1972
+Create Date: 2026-10-17 17:32:40.118204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '6fbf65781171'
+down_revision: Union[str, None] = '4fcd213e1972'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+## A copy of the DDL in domain.github.stars.search at this revision, so the migration does not change
+#  when that module does. Other databases have no full-text index, search is skipped for them.
+SQLITE_SEARCH_DDL: list[str] = [
+    """CREATE VIRTUAL TABLE IF NOT EXISTS gh_starred_repo_search
+    USING fts5(name, topics, description, tokenize = 'unicode61 remove_diacritics 2')""",
+    """CREATE TRIGGER IF NOT EXISTS gh_starred_repo_search_insert AFTER INSERT ON gh_starred_repo BEGIN
+        INSERT INTO gh_starred_repo_search (rowid, name, topics, description)
+        VALUES (new.repo_id, new.name, '', coalesce(new.description, ''));
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS gh_starred_repo_search_update
+    AFTER UPDATE OF name, description ON gh_starred_repo BEGIN
+        UPDATE gh_starred_repo_search SET name = new.name, description = coalesce(new.description, '')
+        WHERE rowid = new.repo_id;
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS gh_starred_repo_search_delete AFTER DELETE ON gh_starred_repo BEGIN
+        DELETE FROM gh_starred_repo_search WHERE rowid = old.repo_id;
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS gh_repo_topic_search_insert AFTER INSERT ON gh_repo_topic BEGIN
+        UPDATE gh_starred_repo_search
+        SET topics = (SELECT group_concat(topic, ' ') FROM gh_repo_topic WHERE repo_id = new.repo_id)
+        WHERE rowid = new.repo_id;
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS gh_repo_topic_search_delete AFTER DELETE ON gh_repo_topic BEGIN
+        UPDATE gh_starred_repo_search
+        SET topics = coalesce((SELECT group_concat(topic, ' ') FROM gh_repo_topic WHERE repo_id = old.repo_id), '')
+        WHERE rowid = old.repo_id;
+    END""",
+]
+
+SQLITE_REBUILD_SQL: list[str] = [
+    """DELETE FROM gh_starred_repo_search""",
+    """INSERT INTO gh_starred_repo_search (rowid, name, topics, description)
+    SELECT
+        r.repo_id,
+        r.name,
+        coalesce((SELECT group_concat(t.topic, ' ') FROM gh_repo_topic t WHERE t.repo_id = r.repo_id), ''),
+        coalesce(r.description, '')
+    FROM gh_starred_repo r""",
+]
+
+SQLITE_DROP_DDL: list[str] = [
+    """DROP TRIGGER IF EXISTS gh_repo_topic_search_delete""",
+    """DROP TRIGGER IF EXISTS gh_repo_topic_search_insert""",
+    """DROP TRIGGER IF EXISTS gh_starred_repo_search_delete""",
+    """DROP TRIGGER IF EXISTS gh_starred_repo_search_update""",
+    """DROP TRIGGER IF EXISTS gh_starred_repo_search_insert""",
+    """DROP TABLE IF EXISTS gh_starred_repo_search""",
+]
+
+POSTGRES_SEARCH_DDL: list[str] = [
+    """CREATE TABLE IF NOT EXISTS gh_starred_repo_search (
+        repo_id INTEGER PRIMARY KEY REFERENCES gh_starred_repo (repo_id) ON DELETE CASCADE,
+        document TSVECTOR NOT NULL
+    )""",
+    """CREATE INDEX IF NOT EXISTS ix_gh_starred_repo_search_document
+    ON gh_starred_repo_search USING GIN (document)""",
+    """CREATE OR REPLACE FUNCTION gh_starred_repo_search_refresh(p_repo_id INTEGER) RETURNS VOID AS $$
+        INSERT INTO gh_starred_repo_search (repo_id, document)
+        SELECT
+            r.repo_id,
+            setweight(to_tsvector('simple', coalesce(r.name, '')), 'A')
+            || setweight(to_tsvector('simple', coalesce(
+                (SELECT string_agg(t.topic, ' ') FROM gh_repo_topic t WHERE t.repo_id = r.repo_id), ''
+            )), 'B')
+            || setweight(to_tsvector('simple', coalesce(r.description, '')), 'C')
+        FROM gh_starred_repo r
+        WHERE r.repo_id = p_repo_id
+        ON CONFLICT (repo_id) DO UPDATE SET document = excluded.document
+    $$ LANGUAGE sql""",
+    """CREATE OR REPLACE FUNCTION gh_starred_repo_search_trigger() RETURNS TRIGGER AS $$
+    BEGIN
+        PERFORM gh_starred_repo_search_refresh(NEW.repo_id);
+        RETURN NULL;
+    END
+    $$ LANGUAGE plpgsql""",
+    """CREATE OR REPLACE FUNCTION gh_repo_topic_search_trigger() RETURNS TRIGGER AS $$
+    BEGIN
+        IF TG_OP = 'DELETE' THEN
+            PERFORM gh_starred_repo_search_refresh(OLD.repo_id);
+        ELSE
+            PERFORM gh_starred_repo_search_refresh(NEW.repo_id);
+        END IF;
+        RETURN NULL;
+    END
+    $$ LANGUAGE plpgsql""",
+    """DROP TRIGGER IF EXISTS gh_starred_repo_search_update ON gh_starred_repo""",
+    """CREATE TRIGGER gh_starred_repo_search_update
+    AFTER INSERT OR UPDATE OF name, description ON gh_starred_repo
+    FOR EACH ROW EXECUTE FUNCTION gh_starred_repo_search_trigger()""",
+    """DROP TRIGGER IF EXISTS gh_repo_topic_search_update ON gh_repo_topic""",
+    """CREATE TRIGGER gh_repo_topic_search_update
+    AFTER INSERT OR DELETE ON gh_repo_topic
+    FOR EACH ROW EXECUTE FUNCTION gh_repo_topic_search_trigger()""",
+]
+
+POSTGRES_REBUILD_SQL: list[str] = [
+    """DELETE FROM gh_starred_repo_search""",
+    """SELECT gh_starred_repo_search_refresh(repo_id) FROM gh_starred_repo""",
+]
+
+POSTGRES_DROP_DDL: list[str] = [
+    """DROP FUNCTION IF EXISTS gh_repo_topic_search_trigger() CASCADE""",
+    """DROP FUNCTION IF EXISTS gh_starred_repo_search_trigger() CASCADE""",
+    """DROP FUNCTION IF EXISTS gh_starred_repo_search_refresh(INTEGER)""",
+    """DROP TABLE IF EXISTS gh_starred_repo_search""",
+]
+
+SEARCH_DDL: dict[str, list[str]] = {
+    'sqlite': SQLITE_SEARCH_DDL,
+    'postgresql': POSTGRES_SEARCH_DDL,
+}
+REBUILD_SQL: dict[str, list[str]] = {
+    'sqlite': SQLITE_REBUILD_SQL,
+    'postgresql': POSTGRES_REBUILD_SQL,
+}
+DROP_DDL: dict[str, list[str]] = {
+    'sqlite': SQLITE_DROP_DDL,
+    'postgresql': POSTGRES_DROP_DDL,
+}
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    dialect: str = bind.dialect.name
+
+    if dialect not in SEARCH_DDL:
+        return
+
+    ## Create the index & its triggers, then index the repositories that are already saved
+    for statement in [*SEARCH_DDL[dialect], *REBUILD_SQL[dialect]]:
+        bind.exec_driver_sql(statement)
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+
+    for statement in DROP_DDL.get(bind.dialect.name, []):
+        bind.exec_driver_sql(statement)
@@ -0,0 +1,29 @@
+"""add starred repo content hash
+
+Revision ID: b825d230c5b6
+Revises: cd69ac54bcb5
+Create Date: 2026-10-17 15:10:42.318204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b825d230c5b6'
+down_revision: Union[str, None] = 'cd69ac54bcb5'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    ## Existing rows have no hash, and are updated with fresh data on their next sync
+    with op.batch_alter_table("gh_starred_repo") as batch_op:
+        batch_op.add_column(sa.Column('content_hash', sa.String(64), nullable=True))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("gh_starred_repo") as batch_op:
+        batch_op.drop_column('content_hash')
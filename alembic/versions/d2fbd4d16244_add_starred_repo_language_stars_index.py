@@ -0,0 +1,31 @@
+"""add starred repo language stars index
+
+Revision ID: d2fbd4d16244
+Revises: 6fbf65781171
+Create Date: 2026-10-17 18:20:51.402817
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd2fbd4d16244'
+down_revision: Union[str, None] = '6fbf65781171'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    ## Created without batch mode, so SQLite keeps the search index triggers on gh_starred_repo
+    op.create_index(
+        'ix_gh_starred_repo_language_stargazers_count',
+        'gh_starred_repo',
+        ['language', 'stargazers_count', 'repo_id'],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_gh_starred_repo_language_stargazers_count', table_name='gh_starred_repo')
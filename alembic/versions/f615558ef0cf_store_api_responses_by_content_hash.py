@@ -0,0 +1,135 @@
+"""store api responses by content hash
+
+Revision ID: f615558ef0cf
+Revises: b825d230c5b6
+Create Date: 2026-10-17 15:40:12.502194
+
+"""
+import hashlib
+import json
+from typing import Sequence, Union
+import zlib
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f615558ef0cf'
+down_revision: Union[str, None] = 'b825d230c5b6'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+response_table = sa.table(
+    'gh_stars_api_response',
+    sa.column('id', sa.Integer),
+    sa.column('json_data', sa.JSON),
+    sa.column('snapshot_id', sa.String),
+    sa.column('page', sa.Integer),
+    sa.column('content_hash', sa.String),
+)
+body_table = sa.table(
+    'gh_stars_api_response_body',
+    sa.column('content_hash', sa.String),
+    sa.column('compression', sa.String),
+    sa.column('body', sa.LargeBinary),
+    sa.column('size', sa.Integer),
+)
+
+
+def upgrade() -> None:
+    op.create_table(
+        'gh_stars_api_response_body',
+        sa.Column('content_hash', sa.String(64), nullable=False),
+        sa.Column('compression', sa.String(16), nullable=False),
+        sa.Column('body', sa.LargeBinary(), nullable=False),
+        sa.Column('size', sa.Integer(), nullable=False),
+        sa.Column('created_at', sa.TIMESTAMP(), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=False),
+        sa.PrimaryKeyConstraint('content_hash'),
+    )
+
+    with op.batch_alter_table('gh_stars_api_response') as batch_op:
+        batch_op.alter_column('json_data', existing_type=sa.JSON(), nullable=True)
+        batch_op.add_column(sa.Column('snapshot_id', sa.String(36), nullable=True))
+        batch_op.add_column(sa.Column('page', sa.Integer(), nullable=True))
+        batch_op.add_column(sa.Column('content_hash', sa.String(64), nullable=True))
+        batch_op.create_index(batch_op.f('ix_gh_stars_api_response_snapshot_id'), ['snapshot_id'], unique=False)
+        batch_op.create_index(batch_op.f('ix_gh_stars_api_response_content_hash'), ['content_hash'], unique=False)
+        batch_op.create_foreign_key(
+            'fk_gh_stars_api_response_content_hash',
+            'gh_stars_api_response_body',
+            ['content_hash'],
+            ['content_hash'],
+        )
+
+    ## Move existing responses into compressed, de-duplicated bodies. Each existing response becomes its
+    #  own single-page snapshot. Rows are loaded one at a time, old responses hold the full starred list.
+    bind = op.get_bind()
+    stored_hashes: set[str] = set()
+
+    response_ids = bind.execute(
+        sa.select(response_table.c.id).where(response_table.c.json_data.is_not(None))
+    ).scalars().all()
+
+    for response_id in response_ids:
+        json_data = bind.execute(
+            sa.select(response_table.c.json_data).where(response_table.c.id == response_id)
+        ).scalar_one()
+
+        data: bytes = json.dumps(json_data, sort_keys=True, separators=(",", ":")).encode("utf-8")
+        content_hash: str = hashlib.sha256(data).hexdigest()
+
+        if content_hash not in stored_hashes:
+            bind.execute(
+                body_table.insert().values(
+                    content_hash=content_hash,
+                    compression='zlib',
+                    body=zlib.compress(data, 6),
+                    size=len(data),
+                )
+            )
+            stored_hashes.add(content_hash)
+
+        bind.execute(
+            response_table.update()
+            .where(response_table.c.id == response_id)
+            .values(
+                json_data=sa.null(),
+                snapshot_id=f"legacy-{response_id}",
+                page=1,
+                content_hash=content_hash,
+            )
+        )
+
+
+def downgrade() -> None:
+    ## Restore the JSON of every response from its body before the bodies are dropped
+    bind = op.get_bind()
+
+    rows = bind.execute(
+        sa.select(response_table.c.id, response_table.c.content_hash).where(
+            response_table.c.content_hash.is_not(None)
+        )
+    ).all()
+
+    for response_id, content_hash in rows:
+        body = bind.execute(
+            sa.select(body_table.c.body).where(body_table.c.content_hash == content_hash)
+        ).scalar_one()
+
+        bind.execute(
+            response_table.update()
+            .where(response_table.c.id == response_id)
+            .values(json_data=json.loads(zlib.decompress(body)))
+        )
+
+    with op.batch_alter_table('gh_stars_api_response') as batch_op:
+        batch_op.drop_constraint('fk_gh_stars_api_response_content_hash', type_='foreignkey')
+        batch_op.drop_index(batch_op.f('ix_gh_stars_api_response_content_hash'))
+        batch_op.drop_index(batch_op.f('ix_gh_stars_api_response_snapshot_id'))
+        batch_op.drop_column('content_hash')
+        batch_op.drop_column('page')
+        batch_op.drop_column('snapshot_id')
+        batch_op.alter_column('json_data', existing_type=sa.JSON(), nullable=False)
+
+    op.drop_table('gh_stars_api_response_body')
@@ -0,0 +1,87 @@
+from __future__ import annotations
+
+import base64
+import json
+import typing as t
+
+from pydantic import BaseModel, Field
+
+__all__ = [
+    "CursorParams",
+    "CursorPagedResponseSchema",
+    "encode_cursor",
+    "decode_cursor",
+]
+
+
+class CursorParams(BaseModel):
+    """Request query params for cursor paginated API response."""
+
+    cursor: str | None = Field(
+        default=None,
+        description="The next_cursor of the previous page. Omit to get the first page.",
+    )
+    size: int = Field(default=10, ge=1, le=100)
+    include_total: bool = Field(
+        default=False,
+        description="Count every matching row & return it as total. Costs a full count on every request.",
+    )
+
+
+T = t.TypeVar("T")
+
+
+class CursorPagedResponseSchema(BaseModel, t.Generic[T]):
+    """Response schema for cursor paginated API response.
+
+    Description:
+        `next_cursor` is `None` on the last page. `total` is only set when it was requested.
+    """
+
+    size: int
+    next_cursor: str | None = None
+    total: int | None = None
+    results: t.List[T]
+
+
+def encode_cursor(key: t.Sequence[t.Any]) -> str:
+    """Encode the sort key of a page's last row as an opaque, URL safe cursor.
+
+    Params:
+        key (Sequence[Any]): The values the rows are sorted by, i.e. `[repo_id]`. Values that are not
+            JSON serializable, like datetimes, are encoded with `str()`.
+
+    Returns:
+        (str): The cursor, to send back as the `cursor` param for the next page.
+
+    """
+    data: bytes = json.dumps(list(key), separators=(",", ":"), default=str).encode(
+        "utf-8"
+    )
+
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode("ascii")
+
+
+def decode_cursor(cursor: str) -> list[t.Any]:
+    """Decode a cursor created by `encode_cursor()` back to its sort key.
+
+    Params:
+        cursor (str): The cursor sent by the client.
+
+    Returns:
+        (list[Any]): The sort key of the last row of the previous page.
+
+    Raises:
+        ValueError: When the cursor was not created by `encode_cursor()`.
+
+    """
+    try:
+        data: bytes = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        key = json.loads(data)
+    except (ValueError, UnicodeDecodeError) as exc:
+        raise ValueError(f"Invalid cursor: {cursor!r}") from exc
+
+    if not isinstance(key, list) or not key:
+        raise ValueError(f"Invalid cursor: {cursor!r}")
+
+    return key
@@ -1,20 +1,25 @@
 from __future__ import annotations
 
 import json
-import math
 import typing as t
 
 from api import helpers as api_helpers
-from api.pagination import PagedResponseSchema, PageParams
+from api.pagination import (
+    CursorPagedResponseSchema,
+    CursorParams,
+    decode_cursor,
+    encode_cursor,
+)
 from api.responses import API_RESPONSE_DICT
 
 import db_lib
 from depends import db_depends
 from domain.github import stars as stars_domain
-from fastapi import APIRouter, Depends, Request, status
+from fastapi import APIRouter, Depends, Query, Request, status
 from fastapi.encoders import jsonable_encoder
 from fastapi.responses import FileResponse, JSONResponse, Response, StreamingResponse
 from loguru import logger as log
+from pydantic import BaseModel, Field
 import sqlalchemy as sa
 import sqlalchemy.exc as sa_exc
 import sqlalchemy.orm as so
@@ -27,30 +32,162 @@ tags: list[str] = ["stars"]
 
 router: APIRouter = APIRouter(prefix=prefix, responses=API_RESPONSE_DICT, tags=tags)
 
+## Accepted `sort` values, built from the domain's whitelist of sortable columns
+StarredRepoSort = t.Literal[tuple(stars_domain.STARRED_REPO_SORT_COLUMNS)]
+
+
+class StarredRepoFilterParams(BaseModel):
+    """Request query params filtering & sorting starred repositories.
+
+    Description:
+        Only these params are accepted, each maps to an indexed column. `sort` is one of the keys of
+        `stars_domain.STARRED_REPO_SORT_COLUMNS`.
+    """
+
+    language: str | None = Field(
+        default=None, description="Primary language, i.e. 'Python'."
+    )
+    min_stars: int | None = Field(default=None, ge=0)
+    archived: bool | None = None
+    topic: str | None = Field(default=None, max_length=255)
+    sort: StarredRepoSort = "repo_id"
+    order: t.Literal["asc", "desc"] = "asc"
+
+
+def parse_fields(fields: str | None) -> list[str] | None:
+    """Split a comma separated `fields` query param into field names, without duplicates.
+
+    Raises:
+        ValueError: When a field is not in `stars_domain.STARRED_REPO_FIELDS`.
+
+    """
+    if not fields:
+        return None
+
+    field_names: list[str] = list(
+        dict.fromkeys(field.strip() for field in fields.split(",") if field.strip())
+    )
+
+    invalid_fields: list[str] = [
+        field for field in field_names if field not in stars_domain.STARRED_REPO_FIELDS
+    ]
+    if invalid_fields:
+        raise ValueError(f"Invalid fields: {', '.join(invalid_fields)}")
+
+    return field_names or None
+
+
+def get_repo_results(
+    starred_models: list[stars_domain.GithubStarredRepositoryModel],
+    fields: list[str] | None,
+) -> list[stars_domain.GithubStarredRepoOut] | list[dict[str, t.Any]]:
+    """Convert repositories to response items, with only the requested fields when `fields` is set."""
+    if fields is not None:
+        return [
+            stars_domain.converters.convert_github_starred_repo_db_model_to_dict(
+                starred_model, fields
+            )
+            for starred_model in starred_models
+        ]
+
+    return [
+        stars_domain.converters.convert_github_starred_repo_db_model_to_schema(
+            starred_repo_model=starred_model
+        )
+        for starred_model in starred_models
+    ]
+
 
 @router.get("/all")
 def return_all_stars(
-    request: Request, page_params: PageParams = Depends()
+    request: Request,
+    cursor_params: CursorParams = Depends(),
+    filter_params: StarredRepoFilterParams = Depends(),
+    fields: str | None = Query(
+        default=None,
+        description="Comma separated fields to return for each repository, i.e. 'name,html_url,stargazers_count'. Only these columns are selected. Returns every field when omitted.",
+    ),
 ) -> JSONResponse:
+    """Return a page of filtered & sorted starred repositories.
+
+    Description:
+        Pages are found with keyset pagination on the sort column & `repo_id`, so a deep page costs the same
+        as the first. Pass each response's `next_cursor` as the `cursor` param to get the next page, with the
+        same filters & sort. `next_cursor` is `None` on the last page. The total count of matching
+        repositories is only run with `include_total=true`.
+
+        `fields` returns a sparse fieldset: only the listed fields are selected from the database &
+        serialized.
+    """
     session_pool = db_depends.get_session_pool()
 
-    starred_repo_out_schemas: list[stars_domain.GithubStarredRepoOut] = []
+    try:
+        field_names: list[str] | None = parse_fields(fields)
+    except ValueError as exc:
+        log.warning(f"({type(exc)}) Error parsing fields. Details: {exc}")
+
+        return JSONResponse(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            content={"msg": str(exc)},
+        )
+
+    filters: dict[str, t.Any] = filter_params.model_dump(
+        include={"language", "min_stars", "archived", "topic"}
+    )
+
+    ## Cursors start with the sort they were created for, a cursor from another sort does not point into this one
+    try:
+        after: list[t.Any] | None = None
+        if cursor_params.cursor:
+            cursor_sort, cursor_order, *after = decode_cursor(cursor_params.cursor)
+
+            if (cursor_sort, cursor_order) != (filter_params.sort, filter_params.order):
+                raise ValueError(
+                    f"Cursor is for sort '{cursor_sort}' {cursor_order}, not '{filter_params.sort}' {filter_params.order}"
+                )
+    except (ValueError, TypeError) as exc:
+        msg = f"({type(exc)}) Error decoding pagination cursor. Details: {exc}"
+        log.warning(msg)
+
+        return JSONResponse(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            content={"msg": "Invalid cursor"},
+        )
+
+    starred_repo_out_schemas: (
+        list[stars_domain.GithubStarredRepoOut] | list[dict[str, t.Any]]
+    ) = []
+    total_count: int | None = None
+    next_cursor: str | None = None
 
     log.info("Retrieving all Github starred repositories")
     try:
         with session_pool() as session:
             repo = stars_domain.GithubStarredRepositoryDBRepository(session)
 
-            total_count = repo.count()
+            if cursor_params.include_total:
+                total_count = repo.count(**filters)
 
-            # Calculate offset and limit for pagination
-            offset = (page_params.page - 1) * page_params.size
-            limit = page_params.size
+            ## Fetch one extra repository to know if there is a next page
+            try:
+                all_starredrepo_models: list[
+                    stars_domain.GithubStarredRepositoryModel
+                ] = repo.get_page(
+                    limit=cursor_params.size + 1,
+                    after=after,
+                    sort=filter_params.sort,
+                    descending=filter_params.order == "desc",
+                    fields=field_names,
+                    **filters,
+                )
+            except ValueError as exc:
+                msg = f"({type(exc)}) Error applying pagination cursor. Details: {exc}"
+                log.warning(msg)
 
-            # Fetch paginated results from the database
-            all_starredrepo_models: list[stars_domain.GithubStarredRepositoryModel] = (
-                repo.get_all_paginated(offset=offset, limit=limit)
-            )
+                return JSONResponse(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    content={"msg": "Invalid cursor"},
+                )
 
             if len(all_starredrepo_models) == 0:
                 return JSONResponse(
@@ -58,24 +195,34 @@ def return_all_stars(
                     content={"starred_repositories": json.dumps([])},
                 )
 
+            if len(all_starredrepo_models) > cursor_params.size:
+                all_starredrepo_models = all_starredrepo_models[: cursor_params.size]
+                next_cursor = encode_cursor(
+                    [
+                        filter_params.sort,
+                        filter_params.order,
+                        *stars_domain.get_sort_key(
+                            all_starredrepo_models[-1], filter_params.sort
+                        ),
+                    ]
+                )
+
             log.info(
                 f"Retrieved {len(all_starredrepo_models)} Github starred repositories"
             )
 
-            for starred_model in all_starredrepo_models:
-                try:
-                    starred_schema: stars_domain.GithubStarredRepoOut = stars_domain.converters.convert_github_starred_repo_db_model_to_schema(
-                        starred_repo_model=starred_model
-                    )
-                    starred_repo_out_schemas.append(starred_schema)
-                except Exception as exc:
-                    msg = f"({type(exc)}) Error converting model to schema. Details: {exc}"
-                    log.error(msg)
-
-                    return JSONResponse(
-                        status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                        content={"msg": "Internal server error"},
-                    )
+            try:
+                starred_repo_out_schemas = get_repo_results(
+                    all_starredrepo_models, field_names
+                )
+            except Exception as exc:
+                msg = f"({type(exc)}) Error converting model to schema. Details: {exc}"
+                log.error(msg)
+
+                return JSONResponse(
+                    status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                    content={"msg": "Internal server error"},
+                )
     except Exception as exc:
         msg = f"({type(exc)}) Error getting all Github stars. Details: {exc}"
         log.error(msg)
@@ -91,17 +238,11 @@ def return_all_stars(
             content={"msg": "No repositories found"},
         )
 
-    log.info("Start JSON encoding")
-    repo_out_dicts: list[dict] = [m.model_dump() for m in starred_repo_out_schemas]
-
-    ## Calculate total number of pages
-    total_pages = math.ceil(total_count / page_params.size)
-
     try:
-        return_obj = PagedResponseSchema(
-            page=page_params.page,
-            size=page_params.size,
-            total=total_pages,
+        return_obj = CursorPagedResponseSchema(
+            size=cursor_params.size,
+            next_cursor=next_cursor,
+            total=total_count,
             results=starred_repo_out_schemas,
         )
     except Exception as exc:
@@ -114,3 +255,72 @@ def return_all_stars(
         )
 
     return return_obj
+
+
+@router.get("/search")
+def search_stars(
+    q: str,
+    limit: int = Query(default=20, ge=1, le=100),
+    offset: int = Query(default=0, ge=0),
+    fields: str | None = Query(
+        default=None,
+        description="Comma separated fields to return for each repository. Returns every field when omitted.",
+    ),
+) -> JSONResponse:
+    """Search starred repositories by name, topic & description, best match first."""
+    session_pool = db_depends.get_session_pool()
+
+    try:
+        field_names: list[str] | None = parse_fields(fields)
+    except ValueError as exc:
+        log.warning(f"({type(exc)}) Error parsing fields. Details: {exc}")
+
+        return JSONResponse(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            content={"msg": str(exc)},
+        )
+
+    log.info(f"Searching Github starred repositories for '{q}'")
+    try:
+        with session_pool() as session:
+            repo = stars_domain.GithubStarredRepositoryDBRepository(session)
+
+            search_results: list[
+                tuple[stars_domain.GithubStarredRepositoryModel, float]
+            ] = repo.search(q, limit=limit, offset=offset, fields=field_names)
+
+            results: list[dict] = [
+                {"rank": rank, "repository": repo_result}
+                for (_, rank), repo_result in zip(
+                    search_results,
+                    get_repo_results(
+                        [starred_model for starred_model, _ in search_results],
+                        field_names,
+                    ),
+                )
+            ]
+    except ValueError as exc:
+        msg = f"({type(exc)}) Full-text search is unavailable. Details: {exc}"
+        log.error(msg)
+
+        return JSONResponse(
+            status_code=status.HTTP_501_NOT_IMPLEMENTED,
+            content={"msg": "Search is not supported by the configured database"},
+        )
+    except Exception as exc:
+        msg = f"({type(exc)}) Error searching Github stars. Details: {exc}"
+        log.error(msg)
+
+        return JSONResponse(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            content={"msg": "Internal server error"},
+        )
+
+    log.info(f"Found {len(results)} Github starred repositories matching '{q}'")
+
+    return JSONResponse(
+        status_code=status.HTTP_200_OK,
+        content=jsonable_encoder(
+            {"query": q, "limit": limit, "offset": offset, "results": results}
+        ),
+    )
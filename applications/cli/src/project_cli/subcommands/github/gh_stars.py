@@ -1,12 +1,15 @@
 from __future__ import annotations
 
+from contextlib import AbstractContextManager, ExitStack
 import json
 from pathlib import Path
+import textwrap
 import typing as t
 
 from cli_spinners import CustomSpinner
 from controllers import GithubAPIController
 from cyclopts import App, Group, Parameter
+from depends import db_depends
 from domain.github import stars as stars_domain
 import gh_client
 from loguru import logger as log
@@ -15,7 +18,7 @@ import sqlalchemy as sa
 import sqlalchemy.exc as sa_exc
 import sqlalchemy.orm as so
 
-__all__ = ["gh_stars_app", "get_user_stars"]
+__all__ = ["gh_stars_app", "get_user_stars", "sync_all_accounts", "search_stars"]
 
 gh_stars_app = App(name="stars", help="Github starred repositories")
 
@@ -53,6 +56,62 @@ def get_user_stars(
     | None = "starred.json",
     use_cache: t.Annotated[bool, Parameter("use-cache", show_default=True)] = True,
     cache_ttl: t.Annotated[int, Parameter("cache-ttl", show_default=True)] = 3600,
+    parallel: t.Annotated[
+        bool,
+        Parameter(
+            "parallel",
+            show_default=True,
+            help="Request pages concurrently instead of following each page's 'next' link.",
+        ),
+    ] = False,
+    max_concurrency: t.Annotated[
+        int,
+        Parameter(
+            "max-concurrency",
+            show_default=True,
+            help="Max number of concurrent page requests when --parallel is set.",
+        ),
+    ] = 4,
+    incremental: t.Annotated[
+        bool,
+        Parameter(
+            "incremental",
+            show_default=True,
+            help="Stop requesting pages at the first repository that already exists in the database.",
+        ),
+    ] = False,
+    use_etags: t.Annotated[
+        bool,
+        Parameter(
+            "use-etags",
+            show_default=True,
+            help="Send conditional requests with the ETag/Last-Modified values saved by previous runs. Unchanged pages are loaded from disk.",
+        ),
+    ] = True,
+    checkpoint: t.Annotated[
+        bool,
+        Parameter(
+            "checkpoint",
+            show_default=True,
+            help="Save completed pages to disk, so an interrupted run resumes where it stopped. Ignored with --incremental.",
+        ),
+    ] = True,
+    graphql: t.Annotated[
+        bool,
+        Parameter(
+            "graphql",
+            show_default=True,
+            help="Use the GraphQL API, which only requests the fields that are saved, 100 repositories per request.",
+        ),
+    ] = False,
+    workers: t.Annotated[
+        int,
+        Parameter(
+            "workers",
+            show_default=True,
+            help="Number of processes validating pages before they are saved with --save-db. 0 validates in this process.",
+        ),
+    ] = 0,
 ):
     """Get starred repositories associated with Github PAT.
 
@@ -60,6 +119,20 @@ def get_user_stars(
         api_token (str): The Github PAT to use with the API. If not provided, will look for a value in your config/.secrets.local.toml, or set the GH_API_TOKEN environment variable.
         use_cache (bool): (default: True) Use cached data if available.
         cache_ttl (int): (default: 900) Time to live for cached data.
+        parallel (bool): (default: False) Request pages concurrently, using the `rel="last"` link to compute page URLs.
+        max_concurrency (int): (default: 4) Max number of concurrent page requests when `parallel=True`.
+        incremental (bool): (default: False) Only get repositories starred since the last sync. Paging stops at the
+            first repository that already exists in the database, and only new repositories are saved to JSON.
+        use_etags (bool): (default: True) Send conditional requests using stored `ETag`/`Last-Modified` values. A
+            `304 Not Modified` page is served from disk, and does not count against the API rate limit.
+        checkpoint (bool): (default: True) Save completed pages to disk. If a run is interrupted, i.e. a page request
+            or saving a page fails, the next run yields the saved pages & resumes requesting from the first page that
+            was not completed. The checkpoint is deleted once the last page was processed. Checkpoints older than a day
+            are not resumed from.
+        graphql (bool): (default: False) Request pages from the GraphQL API. Responses are much smaller than the REST
+            API's. The HTTP cache, ETags, --parallel & --checkpoint only apply to the REST API.
+        workers (int): (default: 0) Number of worker processes validating & converting pages when `save_db=True`.
+            The database is written by this process only. With `0`, pages are validated in this process.
     """
     if api_token is None:
         api_token = settings.GITHUB_SETTINGS.get("GH_API_TOKEN")
@@ -68,54 +141,280 @@ def get_user_stars(
                 "Missing a Github PAT to use with the API. Please set a value in your config/.secrets.local.toml, or set the GH_API_TOKEN environment variable."
             )
 
+    if save_json:
+        if json_file is None:
+            json_file = "starred.json"
+
+        json_file: Path = Path(json_file)
+
+        if json_file.exists():
+            log.warning(
+                f"JSON file '{json_file}' already exists and will be overwritten"
+            )
+
+    if graphql and (parallel or use_cache):
+        log.debug("--parallel & --use-cache do not apply to GraphQL requests")
+
+    if incremental:
+        if parallel:
+            log.warning(
+                "--parallel is ignored with --incremental, pages are requested one at a time"
+            )
+
+        starred_pages: t.Iterator[list[dict]] = gh_client.iter_new_starred_repos(
+            api_token=api_token,
+            use_cache=use_cache,
+            cache_ttl=cache_ttl,
+            use_etags=use_etags,
+            results_per_page=100 if graphql else 30,
+            use_graphql=graphql,
+        )
+    elif graphql:
+        starred_pages: t.Iterator[list[dict]] = gh_client.iter_starred_repos_graphql(
+            api_token=api_token
+        )
+    else:
+        starred_pages: t.Iterator[list[dict]] = gh_client.iter_starred_repos(
+            api_token=api_token,
+            use_cache=use_cache,
+            cache_ttl=cache_ttl,
+            parallel=parallel,
+            max_concurrency=max_concurrency,
+            use_etags=use_etags,
+            checkpoint=checkpoint,
+        )
+
+    ## Pages are saved as they arrive, so only a few pages are held in memory at a time
+    starred_count: int = 0
+
     try:
-        with CustomSpinner("Getting user's starred repositories...") as spinner:
-            starred_repos: list[dict] = gh_client.get_starred_repos(
-                api_token=api_token, use_cache=use_cache, cache_ttl=cache_ttl
+        with (
+            CustomSpinner("Getting user's starred repositories...") as spinner,
+            ExitStack() as stack,
+        ):
+            json_writer: _JSONArrayWriter | None = (
+                stack.enter_context(_JSONArrayWriter(json_file)) if save_json else None
             )
+
+            def _iter_pages() -> t.Iterator[list[dict]]:
+                nonlocal starred_count
+
+                for starred_repos in starred_pages:
+                    starred_count += len(starred_repos)
+                    spinner.text = (
+                        f"Processed [{starred_count}] starred repositories..."
+                    )
+
+                    if json_writer:
+                        json_writer.write_items(starred_repos)
+
+                    yield starred_repos
+
+            if save_db:
+                ## Pages are validated in worker processes & saved by this process
+                try:
+                    gh_client.ingest_starred_repo_pages(_iter_pages(), workers=workers)
+                except Exception as exc:
+                    msg = f"({type(exc)}) Error saving starred repositories to database. Details: {exc}"
+                    log.error(msg)
+
+                    raise
+            else:
+                for _ in _iter_pages():
+                    pass
+
     except Exception as exc:
         msg = f"({type(exc)}) Error getting user's starred repositories. Details: {exc}"
         log.error(msg)
 
         return
 
-    log.info(f"Requested [{len(starred_repos)}] starred repo(s) from Github")
+    log.info(f"Requested [{starred_count}] starred repo(s) from Github")
 
     if save_db:
-        log.info("Saving requested repositories to database")
+        log.success("Saved starred repositories to database")
 
-        log.info(f"Saving [{len(starred_repos)}] starred repositories to database...")
-        try:
-            with CustomSpinner(
-                f"Saving [{len(starred_repos)}] starred repositories to database..."
-            ):
-                saved_stars = gh_client.save_github_stars(starred_repos=starred_repos)
-                log.success(f"Saved starred repositories to database")
-        except Exception as exc:
-            msg = f"({type(exc)}) Error saving starred repositories to database. Details: {exc}"
-            log.error(msg)
+    if save_json:
+        log.success(f"Saved starred repositories to {json_file}")
 
-            return
 
-    if save_json:
-        if json_file is None:
-            json_file = "starred.json"
+@gh_stars_app.command(
+    name="sync-all",
+    help="Sync starred repositories for every Github PAT in the gh_api_tokens setting.",
+)
+def sync_all_accounts(
+    save_db: t.Annotated[
+        bool,
+        Parameter(
+            "save-db", show_default=True, help="Save the results to the database."
+        ),
+    ] = True,
+    json_file: t.Annotated[
+        str | None,
+        Parameter(
+            "json-file",
+            show_default=True,
+            help="Save the node_id of each account's starred repositories to a JSON file, keyed by account login.",
+        ),
+    ] = None,
+    batch_size: t.Annotated[
+        int,
+        Parameter(
+            "batch-size",
+            show_default=True,
+            help="Number of repositories to collect before writing them to the database.",
+        ),
+    ] = 500,
+    use_cache: t.Annotated[bool, Parameter("use-cache", show_default=True)] = True,
+    cache_ttl: t.Annotated[int, Parameter("cache-ttl", show_default=True)] = 3600,
+    parallel: t.Annotated[
+        bool,
+        Parameter(
+            "parallel",
+            show_default=True,
+            help="Request each account's pages concurrently instead of following each page's 'next' link.",
+        ),
+    ] = False,
+    max_concurrency: t.Annotated[
+        int,
+        Parameter(
+            "max-concurrency",
+            show_default=True,
+            help="Max number of concurrent page requests per account when --parallel is set.",
+        ),
+    ] = 4,
+):
+    """Sync starred repositories for multiple Github accounts at once.
 
-        json_file: Path = Path(json_file)
+    Description:
+        Tokens are loaded from the `gh_api_tokens` list in your config/.secrets.toml, or the GH_API_TOKENS
+        environment variable (i.e. `GH_API_TOKENS='["token1", "token2"]'`). Accounts are fetched concurrently over
+        one shared connection pool & HTTP cache, and repositories are written to the database in batches.
 
-        if json_file.exists():
-            log.warning(
-                f"JSON file '{json_file}' already exists and will be overwritten"
+    Params:
+        save_db (bool): (default: True) Save the results to the database.
+        json_file (str | None): (default: None) Path to a JSON file to save each account's starred repository node IDs to.
+        batch_size (int): (default: 500) Number of repositories to collect before writing them to the database.
+        use_cache (bool): (default: True) Use cached data if available.
+        cache_ttl (int): (default: 3600) Time to live for cached data.
+        parallel (bool): (default: False) Request each account's pages concurrently.
+        max_concurrency (int): (default: 4) Max number of concurrent page requests per account when `parallel=True`.
+    """
+    try:
+        with CustomSpinner("Syncing starred repositories for all accounts..."):
+            starred_node_ids: dict[str, list[str]] = (
+                gh_client.sync_starred_repos_for_accounts(
+                    save_db=save_db,
+                    batch_size=batch_size,
+                    use_cache=use_cache,
+                    cache_ttl=cache_ttl,
+                    parallel=parallel,
+                    max_concurrency=max_concurrency,
+                )
             )
+    except Exception as exc:
+        msg = f"({type(exc)}) Error syncing starred repositories for all accounts. Details: {exc}"
+        log.error(msg)
+
+        return
+
+    for login, node_ids in starred_node_ids.items():
+        log.info(f"Account '{login}' has [{len(node_ids)}] starred repo(s)")
+
+    if save_db:
+        log.success("Saved starred repositories to database")
+
+    if json_file:
+        with open(json_file, "w") as f:
+            f.write(json.dumps(starred_node_ids, indent=4, sort_keys=True))
+
+        log.success(f"Saved each account's starred repositories to {json_file}")
+
+
+@gh_stars_app.command(
+    name="search",
+    help="Search saved starred repositories by name, topic & description.",
+)
+def search_stars(
+    query: t.Annotated[
+        str,
+        Parameter(
+            help="The text to search for. Each word matches the start of a word, i.e. 'json pars'."
+        ),
+    ],
+    limit: t.Annotated[
+        int,
+        Parameter("limit", show_default=True, help="Max number of results to show."),
+    ] = 20,
+):
+    """Search the starred repositories saved in the database.
+
+    Description:
+        Uses the database's full-text search index, so results come back quickly even with many saved
+        repositories. A match in a repository's name ranks above a match in its topics or description.
+
+    Params:
+        query (str): The text to search for.
+        limit (int): (default: 20) Max number of results to show.
+    """
+    session_pool = db_depends.get_session_pool()
+
+    try:
+        with session_pool() as session:
+            repo = stars_domain.GithubStarredRepositoryDBRepository(session)
+
+            search_results: list[
+                tuple[stars_domain.GithubStarredRepositoryModel, float]
+            ] = repo.search(query, limit=limit)
+
+            for starred_model, rank in search_results:
+                print(
+                    f"[{rank:.2f}] {starred_model.name} ({starred_model.stargazers_count} stars) {starred_model.html_url}"
+                )
+                if starred_model.description:
+                    print(f"    {starred_model.description}")
+    except Exception as exc:
+        msg = f"({type(exc)}) Error searching starred repositories. Details: {exc}"
+        log.error(msg)
+
+        return
+
+    log.info(f"Found [{len(search_results)}] starred repo(s) matching '{query}'")
+
+
+class _JSONArrayWriter(AbstractContextManager):
+    """Write a JSON array to a file one batch of items at a time.
+
+    Description:
+        Produces the same output as `json.dumps(items, indent=4, default=str, sort_keys=True)`,
+        without needing every item in memory at once.
+    """
+
+    def __init__(self, json_file: t.Union[str, Path]):
+        self.json_file: Path = Path(json_file)
+        self.file: t.TextIO | None = None
+        self.item_count: int = 0
+
+    def __enter__(self) -> t.Self:
+        self.file = open(self.json_file, "w")
+        self.file.write("[")
+
+        return self
+
+    def __exit__(self, exc_type, exc_val, traceback) -> t.Literal[False]:
+        if self.item_count > 0:
+            self.file.write("\n")
+
+        self.file.write("]")
+        self.file.close()
+
+        return False
 
-        try:
-            json_data = json.dumps(starred_repos, indent=4, default=str, sort_keys=True)
-            with open(json_file, "w") as f:
-                f.write(json_data)
+    def write_items(self, items: list[dict]) -> None:
+        for item in items:
+            item_json: str = json.dumps(item, indent=4, default=str, sort_keys=True)
 
-            log.success(f"Saved starred repositories to {json_file}")
-        except Exception as exc:
-            msg = f"({type(exc)}) Error saving starred repositories to {json_file}. Details: {exc}"
-            log.error(msg)
+            self.file.write("," if self.item_count > 0 else "")
+            self.file.write("\n" + textwrap.indent(item_json, "    "))
 
-            return
+            self.item_count += 1
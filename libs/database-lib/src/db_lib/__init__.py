@@ -4,6 +4,7 @@ from . import annotated
 from .__methods import (
     count_table_rows,
     create_base_metadata,
+    enable_sqlite_savepoints,
     get_db_uri,
     get_engine,
     get_session_pool,
@@ -86,6 +86,31 @@ def get_db_uri(
         raise msg
 
 
+def enable_sqlite_savepoints(engine: sa.Engine) -> None:
+    """Make SAVEPOINTs work on a pysqlite engine.
+
+    Description:
+        The pysqlite driver only emits BEGIN before INSERT/UPDATE/DELETE statements, so a SAVEPOINT opened
+        before any of those starts its own transaction, and is committed when it is released even if the
+        outer transaction is rolled back. This disables the driver's transaction handling & emits BEGIN
+        when SQLAlchemy starts a transaction, so `Session.begin_nested()` nests inside it.
+
+        https://docs.sqlalchemy.org/en/20/dialects/sqlite.html#serializable-isolation-savepoints-transactional-ddl
+
+    Params:
+        engine (sqlalchemy.Engine): A SQLite engine using the pysqlite driver.
+
+    """
+
+    @sa.event.listens_for(engine, "connect")
+    def _disable_pysqlite_transactions(dbapi_connection, connection_record) -> None:
+        dbapi_connection.isolation_level = None
+
+    @sa.event.listens_for(engine, "begin")
+    def _emit_begin(conn: sa.Connection) -> None:
+        conn.exec_driver_sql("BEGIN")
+
+
 def get_engine(
     pool: sa.Pool | None = None,
     url: sa.URL = None,
@@ -105,6 +130,10 @@ def get_engine(
         query_cache_size=query_cache_size,
     )
 
+    ## Writes are isolated in SAVEPOINTs, which need a workaround on pysqlite
+    if engine.dialect.name == "sqlite" and engine.dialect.driver == "pysqlite":
+        enable_sqlite_savepoints(engine)
+
     return engine
 
 
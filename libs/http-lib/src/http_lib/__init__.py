@@ -1,5 +1,12 @@
 from __future__ import annotations
 
-from . import cache, client, constants, controllers
+from . import cache, client, constants, controllers, etags
 from .client import build_request, decode_response, encode_data, save_json
-from .controllers import HttpxController, get_http_controller, merge_headers
+from .controllers import (
+    AsyncHttpxController,
+    HttpxController,
+    get_async_http_controller,
+    get_http_controller,
+    merge_headers,
+)
+from .etags import ETagStore, get_etag_store
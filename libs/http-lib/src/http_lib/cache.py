@@ -1,10 +1,13 @@
 from __future__ import annotations
 
+from hashlib import blake2b
 from pathlib import Path
 import sqlite3
 import typing as t
 
+import anysqlite
 import hishel
+import httpcore
 import httpx
 
 
@@ -30,8 +33,12 @@ def get_sqlite_cache_storage(
     if not cache_dir.exists():
         cache_dir.mkdir(parents=True, exist_ok=True)
 
-    ## Get sqlite3 connection to cache database
-    conn: sqlite3.Connection = sqlite3.connect(database=cache_db_path)
+    ## Get sqlite3 connection to cache database.
+    #  hishel guards the connection with its own lock, so it can be shared by
+    #  a client that sends requests from multiple threads.
+    conn: sqlite3.Connection = sqlite3.connect(
+        database=cache_db_path, check_same_thread=False
+    )
     ## Create SQLiteStorage object using sqlite3 connection
     storage: hishel.SQLiteStorage = hishel.SQLiteStorage(connection=conn, ttl=ttl)
 
@@ -64,6 +71,108 @@ def get_file_cache_storage(
     return storage
 
 
+async def get_async_sqlite_cache_storage(
+    cache_db_path: str = ".cache/http/hishel.sqlite3", ttl=900
+) -> hishel.AsyncSQLiteStorage:
+    """Get a hishel.AsyncSQLiteStorage cache.
+
+    Description:
+        The async counterpart of `get_sqlite_cache_storage()`. Opening an `anysqlite` connection
+        must be awaited, so this function is a coroutine.
+
+    Params:
+        cache_db_path (str): The path where the SQLite database file will be saved.
+        ttl (int): (default: 900) Amount of time, in seconds, for cached items to live.
+
+    Returns:
+        (hishel.AsyncSQLiteStorage): An initialized AsyncSQLiteStorage object.
+
+    """
+    ## Ensure database filename ends with a valid SQLite file extension
+    if Path(cache_db_path).suffix not in [".sqlite", ".sqlite3", ".db"]:
+        cache_db_path = f"{cache_db_path}/.sqlite3"
+
+    cache_dir: Path = Path(cache_db_path).parent
+    ## Ensure the cache directory exists
+    if not cache_dir.exists():
+        cache_dir.mkdir(parents=True, exist_ok=True)
+
+    ## Get anysqlite connection to cache database
+    conn: anysqlite.Connection = await anysqlite.connect(
+        database=cache_db_path, check_same_thread=False
+    )
+    ## Create AsyncSQLiteStorage object using anysqlite connection
+    storage: hishel.AsyncSQLiteStorage = hishel.AsyncSQLiteStorage(
+        connection=conn, ttl=ttl
+    )
+
+    return storage
+
+
+def get_async_file_cache_storage(
+    base_path: str = ".cache/http/hishel", ttl: int = 900, check_ttl_every: float = 60
+) -> hishel.AsyncFileStorage:
+    """Get a hishel.AsyncFileStorage cache.
+
+    Params:
+        base_path (str): The path where file caches will be saved.
+        ttl (int): (default: 900) Amount of time, in seconds, for cached items to live.
+        check_ttl_every (int): (default: 60) Interval in seconds to check cached item ttl.
+
+    Returns:
+        (hishel.AsyncFileStorage): An initialized AsyncFileStorage object.
+
+    """
+    ## Ensure cache directory exists
+    if not Path(base_path).exists():
+        Path(base_path).mkdir(parents=True, exist_ok=True)
+
+    ## Initialize AsyncFileStorage cache
+    storage: hishel.AsyncFileStorage = hishel.AsyncFileStorage(
+        base_path=Path(base_path), ttl=ttl, check_ttl_every=check_ttl_every
+    )
+
+    return storage
+
+
+def generate_cache_key(request: httpcore.Request, body: bytes | None = b"") -> str:
+    """Generate the key a response is cached under.
+
+    Description:
+        hishel's default key only uses the method, URL & body. Responses for endpoints like `/user/starred`
+        depend on who is asking, so the `Authorization` header is also part of the key. Without it, clients
+        with different tokens sharing a cache would be served each other's responses.
+
+    Params:
+        request (httpcore.Request): The request to generate a key for.
+        body (bytes | None): The request body.
+
+    Returns:
+        (str): A hex digest identifying the request.
+
+    """
+    url: httpcore.URL = request.url
+    authorization: bytes = b"".join(
+        value for name, value in request.headers if name.lower() == b"authorization"
+    )
+
+    key_parts: list[bytes] = [
+        request.method,
+        url.scheme,
+        url.host,
+        str(url.port).encode("ascii"),
+        url.target,
+        body or b"",
+        authorization,
+    ]
+
+    key = blake2b(digest_size=16, usedforsecurity=False)
+    for part in key_parts:
+        key.update(part)
+
+    return key.hexdigest()
+
+
 def get_cache_controller(
     force_cache: bool = False,
     cacheable_methods: list[str] | None = None,
@@ -99,6 +208,7 @@ def get_cache_controller(
         cacheable_status_codes=cacheable_status_codes,
         allow_heuristics=allow_heuristics,
         allow_stale=allow_stale,
+        key_generator=generate_cache_key,
     )
 
     return controller
@@ -137,3 +247,37 @@ def get_cache_transport(
     )
 
     return transport
+
+
+def get_async_cache_transport(
+    cache_storage: t.Union[hishel.AsyncSQLiteStorage, hishel.AsyncFileStorage],
+    cache_controller: hishel.Controller,
+    transport_base: httpx.AsyncHTTPTransport | None = None,
+) -> hishel.AsyncCacheTransport:
+    """Build & return a hishel.AsyncCacheTransport for an httpx.AsyncClient.
+
+    Description:
+        The async counterpart of `get_cache_transport()`. The async cache storage must be created
+        inside a running event loop, so there are no pre-built defaults for the storage & controller.
+
+    Params:
+        cache_storage (hishel.AsyncSQLiteStorage | hishel.AsyncFileStorage): The async cache storage to use
+            for requests made using a client with this transport mounted.
+        cache_controller (hishel.Controller): The cache controller that handles responses from HTTP requests
+            made using a client with this transport mounted.
+        transport_base (httpx.AsyncHTTPTransport | None): The base transport to append a cache storage &
+            controller to. If `None`, a new `httpx.AsyncHTTPTransport` is created.
+
+    Returns:
+        (hishel.AsyncCacheTransport): An initialized hishel.AsyncCacheTransport HTTP transport.
+
+    """
+    if transport_base is None:
+        transport_base = httpx.AsyncHTTPTransport()
+
+    ## Build async cache transport
+    transport: hishel.AsyncCacheTransport = hishel.AsyncCacheTransport(
+        transport=transport_base, storage=cache_storage, controller=cache_controller
+    )
+
+    return transport
@@ -1,6 +1,10 @@
 from __future__ import annotations
 
-from contextlib import AbstractContextManager, contextmanager
+from contextlib import (
+    AbstractAsyncContextManager,
+    AbstractContextManager,
+    contextmanager,
+)
 import json
 import logging
 from pathlib import Path
@@ -62,6 +66,7 @@ def get_http_controller(
     cacheable_status_codes: list[int] | None = None,
     cache_allow_heuristics: bool = True,
     cache_allow_stale: bool = False,
+    transport: httpx.BaseTransport | None = None,
 ) -> HttpxController:
     """Return an initialized HttpxController class object.
 
@@ -92,6 +97,9 @@ def get_http_controller(
         cache_allow_heuristics (bool): (default: True) Use heuristics to match objects in cache, improves performance &
             reliability of caching new objects.
         cache_allow_stale (bool): (default: False) When `True`, allow stale/expired responses from cache.
+        transport (httpx.BaseTransport | None): Transport requests are sent with, i.e. an `httpx.MockTransport`
+            serving a local stand-in for a remote API. When cache is enabled, the cache transport wraps it.
+            Defaults to a new `httpx.HTTPTransport`.
 
     Returns:
         (HttpxController): Initialized HttpxController object to use for requests.
@@ -120,6 +128,7 @@ def get_http_controller(
             cacheable_status_codes=cacheable_status_codes,
             cache_allow_heuristics=cache_allow_heuristics,
             cache_allow_stale=cache_allow_stale,
+            transport=transport,
         )
 
         return http_ctl
@@ -130,6 +139,71 @@ def get_http_controller(
         raise exc
 
 
+def get_async_http_controller(
+    use_cache: bool = True,
+    force_cache: bool = True,
+    follow_redirects: bool = False,
+    cache_type: str = HTTP_SETTINGS.get("HTTP_CACHE_TYPE", default="sqlite"),
+    cache_file_dir: str = HTTP_SETTINGS.get(
+        "HTTP_CACHE_FILE_DIR", default=".cache/http/hishel"
+    ),
+    cache_db_file: str = HTTP_SETTINGS.get(
+        "HTTP_CACHE_DB_FILE", default=".cache/http/hishel.sqlite3"
+    ),
+    cache_ttl: int | None = HTTP_SETTINGS.get("HTTP_CACHE_TTL", default=900),
+    check_ttl_every: float | None = HTTP_SETTINGS.get(
+        "HTTP_CACHE_CHECK_TTL_EVERY", default=60
+    ),
+    cacheable_methods: list[str] | None = None,
+    cacheable_status_codes: list[int] | None = None,
+    cache_allow_heuristics: bool = True,
+    cache_allow_stale: bool = False,
+    transport: httpx.AsyncBaseTransport | None = None,
+) -> AsyncHttpxController:
+    """Return an initialized AsyncHttpxController class object.
+
+    Description:
+        The asyncio counterpart of `get_http_controller()`. Params are the same, the returned
+        controller is used with `async with` and its `send_request()` method is awaited.
+
+    Returns:
+        (AsyncHttpxController): Initialized AsyncHttpxController object to use for requests.
+
+    """
+    if not use_cache:
+        log.debug("use_cache is disabled, setting all cache-related settings to None.")
+        cache_type = None
+        cache_file_dir = None
+        cache_db_file = None
+        cache_ttl = None
+        check_ttl_every = None
+
+    ## Build AsyncHttpxController object
+    try:
+        http_ctl: AsyncHttpxController = AsyncHttpxController(
+            use_cache=use_cache,
+            force_cache=force_cache,
+            follow_redirects=follow_redirects,
+            cache_type=cache_type,
+            cache_file_dir=cache_file_dir,
+            cache_db_file=cache_db_file,
+            cache_ttl=cache_ttl,
+            check_ttl_every=check_ttl_every,
+            cacheable_methods=cacheable_methods,
+            cacheable_status_codes=cacheable_status_codes,
+            cache_allow_heuristics=cache_allow_heuristics,
+            cache_allow_stale=cache_allow_stale,
+            transport=transport,
+        )
+
+        return http_ctl
+    except Exception as exc:
+        msg = f"({type(exc)}) Error initializing AsyncHttpxController. Details: {exc}"
+        log.error(msg)
+
+        raise exc
+
+
 def merge_headers(header_dicts: list[t.Union[str, dict]] | None = []) -> dict:
     """Merge multiple header dicts/JSON strings into a single header.
 
@@ -196,6 +270,8 @@ class HttpxController(AbstractContextManager):
         cache_allow_heuristics (bool): (default: True) Use heuristics to match objects in cache, improves performance &
             reliability of caching new objects.
         cache_allow_stale (bool): (default: False) When `True`, allow stale/expired responses from cache.
+        transport (httpx.BaseTransport | None): Transport requests are sent with. When cache is enabled, the
+            cache transport wraps it. Defaults to a new `httpx.HTTPTransport`.
     """
 
     def __init__(
@@ -221,6 +297,7 @@ class HttpxController(AbstractContextManager):
         cacheable_status_codes: list[int] | None = [200, 201, 202, 301, 308],
         cache_allow_heuristics: bool = True,
         cache_allow_stale: bool = False,
+        transport: httpx.BaseTransport | None = None,
     ) -> None:
         self.use_cache: bool = use_cache
         self.force_cache: bool = force_cache
@@ -236,6 +313,7 @@ class HttpxController(AbstractContextManager):
         self.cacheable_status_codes: list[int] | None = cacheable_status_codes
         self.cache_allow_heuristics: bool = cache_allow_heuristics
         self.cache_allow_stale: bool = cache_allow_stale
+        self.transport: httpx.BaseTransport | None = transport
 
         ## Placeholder for initialized httpx.Client
         self.client: httpx.Client | None = None
@@ -274,7 +352,8 @@ class HttpxController(AbstractContextManager):
         if self.client:
             self.client.close()
 
-        if exc_val:
+        ## A generator that sends requests being closed early is not an error
+        if exc_val and not isinstance(exc_val, GeneratorExit):
             msg = f"({exc_type}) {exc_val}"
             self.logger.error(msg)
 
@@ -347,7 +426,9 @@ class HttpxController(AbstractContextManager):
 
         if self.use_cache:
             _transport: hishel.CacheTransport = cache.get_cache_transport(
-                cache_storage=self.cache, cache_controller=self.cache_controller
+                transport_base=self.transport or httpx.HTTPTransport(),
+                cache_storage=self.cache,
+                cache_controller=self.cache_controller,
             )
         else:
             _transport = None
@@ -366,7 +447,9 @@ class HttpxController(AbstractContextManager):
 
             return client
         else:
-            return httpx.Client()
+            return httpx.Client(
+                transport=self.transport, follow_redirects=self.follow_redirects
+            )
 
     def send_request(
         self,
@@ -396,3 +479,203 @@ class HttpxController(AbstractContextManager):
             self.logger.error(msg)
 
             raise exc
+
+
+class AsyncHttpxController(AbstractAsyncContextManager):
+    """Controller for an httpx AsyncClient with optional hishel cache storage.
+
+    Description:
+        The asyncio counterpart of `HttpxController`. It builds the same hishel cache configuration using
+        hishel's async storages & transport, and manages an `httpx.AsyncClient`.
+
+        Use the controller with `async with`, and await `send_request()`.
+
+    Params:
+        See `HttpxController`. Params are the same.
+    """
+
+    def __init__(
+        self,
+        use_cache: bool = True,
+        force_cache: bool = True,
+        follow_redirects: bool = False,
+        cache_type: str | None = "sqlite",
+        cache_file_dir: str | None = ".cache/http/hishel",
+        cache_db_file: str = ".cache/http/hishel.sqlite3",
+        cache_ttl: int | None = 900,
+        check_ttl_every: float | None = 60,
+        cacheable_methods: list[str] | None = [
+            "GET",
+            "POST",
+            "PUT",
+            "DELETE",
+            "HEAD",
+            "CONNECT",
+            "TRACE",
+            "PATCH",
+        ],
+        cacheable_status_codes: list[int] | None = [200, 201, 202, 301, 308],
+        cache_allow_heuristics: bool = True,
+        cache_allow_stale: bool = False,
+        transport: httpx.AsyncBaseTransport | None = None,
+    ) -> None:
+        self.use_cache: bool = use_cache
+        self.force_cache: bool = force_cache
+        self.follow_redirects: bool = follow_redirects
+        self.cache_type: str | None = (
+            cache_type.lower() if (cache_type and isinstance(cache_type, str)) else None
+        )
+        self.cache_file_dir: str | None = cache_file_dir
+        self.cache_db_file: str = cache_db_file
+        self.cache_ttl: int | None = cache_ttl
+        self.check_ttl_every: float | None = check_ttl_every
+        self.cacheable_methods: list[str] | None = cacheable_methods
+        self.cacheable_status_codes: list[int] | None = cacheable_status_codes
+        self.cache_allow_heuristics: bool = cache_allow_heuristics
+        self.cache_allow_stale: bool = cache_allow_stale
+        self.transport: httpx.AsyncBaseTransport | None = transport
+
+        ## Placeholder for initialized httpx.AsyncClient
+        self.client: httpx.AsyncClient | None = None
+        ## Placeholder for hishel async cache storage object
+        self.cache: (
+            t.Union[hishel.AsyncSQLiteStorage, hishel.AsyncFileStorage] | None
+        ) = None
+        ## Placeholder for hishel cache controller object
+        self.cache_controller: hishel.Controller | None = None
+        ## Placeholder for hishel async cache transport object
+        self.cache_transport: hishel.AsyncCacheTransport | None = None
+
+        ## Class logger
+        self.logger: logging.Logger = log.getChild("AsyncHttpxController")
+
+    async def __aenter__(self) -> t.Self:
+        if self.use_cache:
+            ## If cache is enabled, build cache from class params
+            self.cache = await self._get_cache()
+            self.cache_controller = self._get_cache_controller()
+
+            if self.cache is not None:
+                self.cache_transport = cache.get_async_cache_transport(
+                    cache_storage=self.cache,
+                    cache_controller=self.cache_controller,
+                    transport_base=self.transport,
+                )
+        else:
+            ## Set all cache objects to None to disable
+            self.cache = None
+            self.cache_transport = None
+            self.cache_controller = None
+
+        ## Initialize httpx AsyncClient
+        self.client: httpx.AsyncClient = self._get_client()
+
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, traceback) -> t.Literal[False] | None:
+        if self.client:
+            ## Closing the client also closes the cache transport & storage
+            await self.client.aclose()
+
+        ## A generator that sends requests being closed early is not an error
+        if exc_val and not isinstance(exc_val, GeneratorExit):
+            msg = f"({exc_type}) {exc_val}"
+            self.logger.error(msg)
+
+            if traceback:
+                self.logger.error(f"Traceback: {traceback}")
+
+            return False
+
+        return
+
+    async def _get_cache(
+        self,
+    ) -> t.Union[hishel.AsyncSQLiteStorage, hishel.AsyncFileStorage] | None:
+        """Initialize hishel async cache storage."""
+        if not self.use_cache:
+            return None
+
+        match self.cache_type:
+            case None:
+                return None
+            case "sqlite":
+                ## Get hishel async SQLite storage object
+                _cache: hishel.AsyncSQLiteStorage = (
+                    await cache.get_async_sqlite_cache_storage(
+                        cache_db_path=self.cache_db_file, ttl=self.cache_ttl
+                    )
+                )
+            case "file":
+                ## Get hishel async file storage object
+                _cache: hishel.AsyncFileStorage = cache.get_async_file_cache_storage(
+                    base_path=self.cache_file_dir,
+                    ttl=self.cache_ttl,
+                    check_ttl_every=self.check_ttl_every,
+                )
+            case _:
+                ## Unsupported cache type
+                log.error(f"Unrecognized cache type: {self.cache_type}")
+
+                return None
+
+        return _cache
+
+    def _get_cache_controller(self) -> hishel.Controller:
+        """Initialize hishel cache controller."""
+        if not self.use_cache:
+            return None
+
+        _controller: hishel.Controller = cache.get_cache_controller(
+            force_cache=self.force_cache,
+            cacheable_methods=self.cacheable_methods,
+            cacheable_status_codes=self.cacheable_status_codes,
+            allow_heuristics=self.cache_allow_heuristics,
+            allow_stale=self.cache_allow_stale,
+        )
+
+        return _controller
+
+    def _get_client(self) -> httpx.AsyncClient:
+        """Return an httpx.AsyncClient object initialized from class parameters."""
+        if self.use_cache and self.cache_transport is not None:
+            client = httpx.AsyncClient(
+                transport=self.cache_transport, follow_redirects=self.follow_redirects
+            )
+
+            return client
+        else:
+            return httpx.AsyncClient(
+                transport=self.transport, follow_redirects=self.follow_redirects
+            )
+
+    async def send_request(
+        self,
+        request: httpx.Request,
+        auth: t.Union[
+            t.Tuple[t.Union[str, bytes], t.Union[str, bytes]],
+            t.Callable[[httpx.Request], httpx.Request],
+            httpx.Auth,
+        ] = None,
+        stream: bool = False,
+    ) -> httpx.Response:
+        """Make an HTTP request and return the httpx.Response using the controller's .client.
+
+        Params:
+            request (httpx.Request): An initialized HTTPX Request object to send.
+
+        Returns:
+            (httpx.Response): An HTTPX Response object with the response's data.
+
+        """
+        try:
+            res: httpx.Response = await self.client.send(
+                request, stream=stream, auth=auth
+            )
+
+            return res
+        except Exception as exc:
+            msg = f"({type(exc)}) Error sending request. Details: {exc}"
+            self.logger.error(msg)
+
+            raise exc
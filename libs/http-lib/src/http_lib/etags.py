@@ -0,0 +1,270 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+from pathlib import Path
+import sqlite3
+import threading
+import time
+import typing as t
+
+log = logging.getLogger(__name__)
+
+import httpx
+
+__all__ = ["ETagStore", "get_etag_store", "get_etag_store_key"]
+
+## Headers describing the encoding of the original body. Stored bodies are already decoded,
+#  so these are dropped instead of being replayed on a response built from storage.
+_NON_REPLAYABLE_HEADERS: set[str] = {
+    "content-encoding",
+    "content-length",
+    "transfer-encoding",
+}
+
+
+def get_etag_store_key(request: httpx.Request) -> str:
+    """Build the key a request's stored response is saved under.
+
+    Description:
+        A response depends on who is asking, so the `Authorization` header is part of the key.
+        The key is hashed so tokens are never written to disk.
+
+    Params:
+        request (httpx.Request): The request to build a key for.
+
+    Returns:
+        (str): A sha256 hex digest identifying the request.
+
+    """
+    key_src: str = "\n".join(
+        [
+            request.method,
+            str(request.url),
+            request.headers.get("Authorization", ""),
+            request.headers.get("Accept", ""),
+        ]
+    )
+
+    return hashlib.sha256(key_src.encode("utf-8")).hexdigest()
+
+
+def get_etag_store(
+    etag_db_file: str = ".cache/http/etags.sqlite3",
+) -> ETagStore:
+    """Return an initialized ETagStore.
+
+    Params:
+        etag_db_file (str): Path to the SQLite database where validators & response bodies are saved.
+
+    Returns:
+        (ETagStore): An initialized ETagStore object.
+
+    """
+    try:
+        etag_store: ETagStore = ETagStore(db_file=etag_db_file)
+    except Exception as exc:
+        msg = f"({type(exc)}) Error initializing ETagStore. Details: {exc}"
+        log.error(msg)
+
+        raise exc
+
+    return etag_store
+
+
+class ETagStore:
+    """Persist response validators (`ETag`/`Last-Modified`) & bodies for conditional requests.
+
+    Description:
+        Unlike the hishel cache, entries do not expire. Each run sends the stored validators as
+        `If-None-Match`/`If-Modified-Since`, and when the remote answers `304 Not Modified` the
+        stored body is served instead. For the Github API, a 304 does not count against the rate limit.
+
+        The SQLite connection is guarded by a lock, so one store can be shared by requests sent
+        from multiple threads.
+
+    Params:
+        db_file (str): Path to the SQLite database file. Parent directories are created if needed.
+
+    Usage:
+        req = etag_store.add_conditional_headers(req)
+        res = client.send(req)
+        res = etag_store.handle_response(req, res)
+    """
+
+    def __init__(self, db_file: str = ".cache/http/etags.sqlite3"):
+        self.db_file: Path = Path(db_file)
+
+        if not self.db_file.parent.exists():
+            self.db_file.parent.mkdir(parents=True, exist_ok=True)
+
+        self._lock: threading.Lock = threading.Lock()
+        self._conn: sqlite3.Connection = sqlite3.connect(
+            database=str(self.db_file), check_same_thread=False
+        )
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS etag_responses (
+                key TEXT PRIMARY KEY,
+                url TEXT NOT NULL,
+                etag TEXT,
+                last_modified TEXT,
+                headers TEXT NOT NULL,
+                body BLOB NOT NULL,
+                updated_at REAL NOT NULL
+            )"""
+        )
+        self._conn.commit()
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def get(self, request: httpx.Request) -> dict[str, t.Any] | None:
+        """Get the stored response for a request.
+
+        Params:
+            request (httpx.Request): The request to look up.
+
+        Returns:
+            (dict | None): A dict with `etag`, `last_modified`, `headers` & `body` keys, or `None`
+                if nothing is stored for the request.
+
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT etag, last_modified, headers, body FROM etag_responses WHERE key = ?",
+                (get_etag_store_key(request),),
+            ).fetchone()
+
+        if row is None:
+            return None
+
+        etag, last_modified, headers, body = row
+
+        return {
+            "etag": etag,
+            "last_modified": last_modified,
+            "headers": json.loads(headers),
+            "body": body,
+        }
+
+    def save(self, request: httpx.Request, response: httpx.Response) -> None:
+        """Store a response's validators & body.
+
+        Description:
+            Responses without an `ETag` or `Last-Modified` header cannot be revalidated, and are not stored.
+
+        Params:
+            request (httpx.Request): The request the response answers.
+            response (httpx.Response): A successful, fully read response.
+
+        """
+        etag: str | None = response.headers.get("ETag")
+        last_modified: str | None = response.headers.get("Last-Modified")
+
+        if etag is None and last_modified is None:
+            return
+
+        headers: dict[str, str] = {
+            k: v
+            for k, v in response.headers.items()
+            if k.lower() not in _NON_REPLAYABLE_HEADERS
+        }
+
+        with self._lock:
+            self._conn.execute(
+                """INSERT INTO etag_responses (key, url, etag, last_modified, headers, body, updated_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT (key) DO UPDATE SET
+                    url = excluded.url,
+                    etag = excluded.etag,
+                    last_modified = excluded.last_modified,
+                    headers = excluded.headers,
+                    body = excluded.body,
+                    updated_at = excluded.updated_at""",
+                (
+                    get_etag_store_key(request),
+                    str(request.url),
+                    etag,
+                    last_modified,
+                    json.dumps(headers),
+                    response.content,
+                    time.time(),
+                ),
+            )
+            self._conn.commit()
+
+    def add_conditional_headers(self, request: httpx.Request) -> httpx.Request:
+        """Add `If-None-Match`/`If-Modified-Since` headers from the stored response, if one exists.
+
+        Params:
+            request (httpx.Request): The request to add headers to. The request is modified in place.
+
+        Returns:
+            (httpx.Request): The same request.
+
+        """
+        stored: dict[str, t.Any] | None = self.get(request)
+
+        if stored is None:
+            return request
+
+        if stored["etag"]:
+            request.headers["If-None-Match"] = stored["etag"]
+        if stored["last_modified"]:
+            request.headers["If-Modified-Since"] = stored["last_modified"]
+
+        return request
+
+    def handle_response(
+        self, request: httpx.Request, response: httpx.Response
+    ) -> httpx.Response:
+        """Store a 200 response, or rebuild a 304 response from storage.
+
+        Description:
+            A `304 Not Modified` response is replaced with a `200` response using the stored body. Headers
+            are the stored headers, updated with the headers of the 304 (i.e. current rate limit values).
+            Any other response is returned unchanged.
+
+        Params:
+            request (httpx.Request): The request that was sent.
+            response (httpx.Response): The response from the remote.
+
+        Returns:
+            (httpx.Response): The response to use.
+
+        """
+        if response.status_code == 200:
+            self.save(request, response)
+
+            return response
+
+        if response.status_code != 304:
+            return response
+
+        stored: dict[str, t.Any] | None = self.get(request)
+        if stored is None:
+            log.warning(
+                f"Received 304 Not Modified for '{request.url}', but no response is stored for it."
+            )
+            return response
+
+        log.debug(f"Not modified, using stored response for '{request.url}'")
+
+        headers: dict[str, str] = {
+            **stored["headers"],
+            **{
+                k: v
+                for k, v in response.headers.items()
+                if k.lower() not in _NON_REPLAYABLE_HEADERS
+            },
+        }
+
+        return httpx.Response(
+            status_code=200,
+            headers=headers,
+            content=stored["body"],
+            request=request,
+            extensions={"from_etag_store": True},
+        )
@@ -185,6 +185,21 @@ def run_tests(session: nox.Session):
     )
 
 
+## Benchmark fetching starred repositories from a local stand-in for the Github API.
+#  Pass benchmark args after --, i.e. nox -s bench-stars-fetch -- --sizes 1000 --end-to-end
+@nox.session(python=[DEFAULT_PYTHON], name="bench-stars-fetch", tags=["benchmark"])
+def run_stars_fetch_benchmark(session: nox.Session):
+    install_uv_project(session)
+
+    session.run(
+        "uv",
+        "run",
+        "python",
+        "scripts/benchmark/bench_stars_fetch.py",
+        *session.posargs,
+    )
+
+
 @nox.session(name="init-clone-setup")
 def run_init_clone_setup(session: nox.Session):
     install_uv_project(session)
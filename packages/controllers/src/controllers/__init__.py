@@ -1,3 +1,7 @@
 from __future__ import annotations
 
+from ._async_controllers import AsyncGithubAPIController
+from ._checkpoint import PaginationCheckpointStore
 from ._controllers import GithubAPIController
+from ._graphql import GithubGraphQLController, convert_graphql_starred_repo
+from ._rate_limit import GithubRateLimiter
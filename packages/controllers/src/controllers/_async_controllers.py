@@ -0,0 +1,395 @@
+from __future__ import annotations
+
+import asyncio
+from contextlib import AbstractAsyncContextManager, aclosing, nullcontext
+import typing as t
+
+from ._rate_limit import GithubRateLimiter
+from ._star_pages import OrderedPageWindow, StarPageProgress, build_star_params
+
+import http_lib
+import httpx
+from loguru import logger as log
+
+__all__ = ["AsyncGithubAPIController"]
+
+
+class AsyncGithubAPIController(AbstractAsyncContextManager):
+    """The asyncio counterpart of `GithubAPIController`.
+
+    Description:
+        Requests are sent with an `http_lib.AsyncHttpxController`, which uses the same hishel cache
+        configuration as the synchronous controller. Pages of starred repositories are returned as an
+        async iterator, so many syncs can run concurrently on one event loop.
+
+    Usage:
+        async with AsyncGithubAPIController(api_token=...) as gh:
+            async for page in gh.iter_user_stars():
+                ...
+
+        ## Share one connection pool & cache between accounts
+        async with http_lib.get_async_http_controller() as http_ctl:
+            async with AsyncGithubAPIController(api_token=..., http_controller=http_ctl) as gh:
+                ...
+    """
+
+    def __init__(
+        self,
+        api_token: str,
+        github_api_version: str = "2022-11-28",
+        use_cache: bool = True,
+        follow_redirects: bool = False,
+        cache_ttl: int = 900,
+        use_etags: bool = True,
+        rate_limiter: GithubRateLimiter | None = None,
+        http_controller: http_lib.AsyncHttpxController | None = None,
+        transport: httpx.AsyncBaseTransport | None = None,
+    ):
+        self.api_token = api_token
+        self.github_api_version = github_api_version
+        self.use_cache = use_cache
+        self.follow_redirects = follow_redirects
+        self.cache_ttl = cache_ttl
+        self.use_etags = use_etags
+        ## Rate limits are per token, share a limiter only between controllers using the same token
+        self.rate_limiter: GithubRateLimiter = (
+            rate_limiter if rate_limiter is not None else GithubRateLimiter()
+        )
+
+        ## An already open AsyncHttpxController shared with other controllers. This controller
+        #  uses its client & cache, but does not open or close it.
+        self.shared_http_controller: http_lib.AsyncHttpxController | None = (
+            http_controller
+        )
+        ## Transport for the HTTP client, i.e. a local stand-in for the Github API. Ignored when
+        #  an http_controller is shared.
+        self.transport: httpx.AsyncBaseTransport | None = transport
+
+        self.base_url = "https://api.github.com"
+        self.http_controller: http_lib.AsyncHttpxController | None = None
+        self.etag_store: http_lib.ETagStore | None = None
+
+    async def __aenter__(self) -> t.Self:
+        self.http_controller = (
+            self.shared_http_controller
+            if self.shared_http_controller is not None
+            else self._get_http_controller()
+        )
+
+        if self.use_etags:
+            self.etag_store = http_lib.get_etag_store()
+
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        if self.etag_store:
+            self.etag_store.close()
+            self.etag_store = None
+
+        if exc_type:
+            ## Closing a page iterator early (i.e. an incremental sync) is not an error
+            if not issubclass(exc_type, GeneratorExit):
+                log.error(f"({exc_type}) {exc_val}")
+            return False
+
+        return True
+
+    def _default_headers(self) -> dict[str, str]:
+        return {
+            "Accept": "application/vnd.github+json",
+            "Authorization": f"Bearer {self.api_token}",
+            "X-GitHub-Api-Version": self.github_api_version,
+            "User-Agent": "mygh-python",
+        }
+
+    def _get_http_controller(self) -> http_lib.AsyncHttpxController:
+        http_controller: http_lib.AsyncHttpxController = (
+            http_lib.get_async_http_controller(
+                use_cache=self.use_cache,
+                follow_redirects=self.follow_redirects,
+                cache_ttl=self.cache_ttl,
+                transport=self.transport,
+            )
+        )
+
+        return http_controller
+
+    def _open_http_controller(
+        self,
+    ) -> t.AsyncContextManager[http_lib.AsyncHttpxController]:
+        """Open the controller's AsyncHttpxController, unless it is shared & already open."""
+        if self.shared_http_controller is not None:
+            return nullcontext(self.shared_http_controller)
+
+        return self.http_controller
+
+    async def _send_request(
+        self, http_ctl: http_lib.AsyncHttpxController, req: httpx.Request
+    ) -> httpx.Response:
+        """Send a request, making it conditional when a response for it was stored by a previous run.
+
+        Description:
+            See `GithubAPIController._send_request()`. Waiting for the rate limiter & reads/writes to the
+            ETag store do not block the event loop.
+
+        Params:
+            http_ctl (http_lib.AsyncHttpxController): An open AsyncHttpxController to send the request with.
+            req (httpx.Request): The request to send.
+
+        Returns:
+            (httpx.Response): The response.
+
+        """
+        if self.etag_store:
+            req = await asyncio.to_thread(self.etag_store.add_conditional_headers, req)
+
+        res = await self.rate_limiter.send_async(
+            lambda: http_ctl.send_request(req), description=f"request to '{req.url}'"
+        )
+
+        if self.etag_store:
+            res = await asyncio.to_thread(self.etag_store.handle_response, req, res)
+
+        return res
+
+    async def _get_star_page(
+        self,
+        http_ctl: http_lib.AsyncHttpxController,
+        url: str,
+        headers: dict[str, str],
+        params: dict | None = None,
+    ) -> tuple[httpx.Response, list[dict[str, t.Any]]]:
+        """Request a single page of starred repositories.
+
+        Params:
+            http_ctl (http_lib.AsyncHttpxController): An open AsyncHttpxController to send the request with.
+            url (str): The URL of the page to request.
+            headers (dict[str, str]): Headers to send with the request.
+            params (dict | None): Optional URL params. Only the first page needs these.
+
+        Returns:
+            (tuple[httpx.Response, list[dict]]): The response, and the decoded page of repositories.
+
+        Raises:
+            httpx.HTTPStatusError: When the request is not successful.
+
+        """
+        req = http_lib.build_request(url=url, headers=headers, params=params)
+        res = await self._send_request(http_ctl, req)
+
+        if res.status_code != 200:
+            msg = f"Failed to get user's starred repositories. [{res.status_code}: {res.reason_phrase}] {res.text}"
+            log.error(msg)
+
+            raise httpx.HTTPStatusError(msg, request=res.request, response=res)
+
+        try:
+            res_data = http_lib.decode_response(res)
+        except Exception as exc:
+            msg = f"({type(exc)}) Error decoding user's starred repositories. Details: {exc}"
+            log.error(msg)
+            raise exc
+
+        return res, res_data
+
+    async def iter_user_stars(
+        self,
+        results_per_page: int = 30,
+        sort_by: str = "created",
+        sort_direction: str = "desc",
+        parallel: bool = False,
+        max_concurrency: int = 4,
+        checkpoint: bool = False,
+        checkpoint_max_age: int | None = 86400,
+    ) -> t.AsyncIterator[list[dict[str, t.Any]]]:
+        """Iterate over pages of the authenticated user's starred repositories.
+
+        Description:
+            Yields one decoded page (a list of repository dicts) at a time. When `parallel=True`, the
+            `rel="last"` link of the first response is used to request the remaining pages concurrently,
+            with at most `max_concurrency` requests in flight. Pages are still yielded in order, and at
+            most `max_concurrency` pages are held in memory while waiting to be yielded.
+
+            When `checkpoint=True`, completed pages are saved to disk & an interrupted run is resumed. The
+            checkpoint is kept when a page request fails or the consumer raises, and deleted once the last page
+            has been yielded, see `GithubAPIController.iter_user_stars()`.
+
+        Params:
+            results_per_page (int): (default: 30) Number of repositories per page, between 1 and 100.
+            sort_by (str): (default: "created") Sort by "created" or "updated".
+            sort_direction (str): (default: "desc") Sort "asc" or "desc".
+            parallel (bool): (default: False) Request pages concurrently using the `rel="last"` link.
+            max_concurrency (int): (default: 4) Max number of concurrent page requests when `parallel=True`.
+            checkpoint (bool): (default: False) Save completed pages to disk, and resume from a previous
+                interrupted run.
+            checkpoint_max_age (int | None): (default: 86400) Max age, in seconds, of a checkpoint to resume from.
+
+        Yields:
+            (list[dict]): A page of starred repository dicts.
+
+        Raises:
+            httpx.HTTPStatusError: When a page request is not successful.
+
+        """
+        params = build_star_params(
+            results_per_page=results_per_page,
+            sort_by=sort_by,
+            sort_direction=sort_direction,
+            max_concurrency=max_concurrency,
+        )
+
+        url: str = f"{self.base_url}/user/starred"
+        headers = self._default_headers()
+
+        log.info("Getting user's starred repositories.")
+
+        progress: StarPageProgress = StarPageProgress.for_request(
+            checkpoint, api_token=self.api_token, url=url, params=params
+        )
+
+        try:
+            async with aclosing(
+                self._iter_star_pages(
+                    progress,
+                    url=url,
+                    headers=headers,
+                    params=params,
+                    parallel=parallel,
+                    max_concurrency=max_concurrency,
+                    checkpoint_max_age=checkpoint_max_age,
+                )
+            ) as pages:
+                async for page_data in pages:
+                    yield page_data
+
+            ## Every page was requested, the checkpoint is no longer needed
+            await asyncio.to_thread(progress.clear)
+
+        finally:
+            progress.close()
+
+    async def _iter_star_pages(
+        self,
+        progress: StarPageProgress,
+        url: str,
+        headers: dict[str, str],
+        params: dict[str, t.Any],
+        parallel: bool,
+        max_concurrency: int,
+        checkpoint_max_age: int | None,
+    ) -> t.AsyncIterator[list[dict[str, t.Any]]]:
+        """Request the pages of `iter_user_stars()`, recording each completed page in `progress`."""
+        async with self._open_http_controller() as http_ctl:
+            if await asyncio.to_thread(progress.resume, max_age=checkpoint_max_age):
+                for page in range(1, progress.completed_pages + 1):
+                    yield await asyncio.to_thread(progress.get_saved_page, page)
+
+            else:
+                ## Only use params for the first request, after that, use direct URLs from pagination
+                res, res_data = await self._get_star_page(
+                    http_ctl, url=url, headers=headers, params=params
+                )
+
+                await asyncio.to_thread(progress.response_page_done, res, res_data)
+                yield res_data
+
+            if parallel:
+                page_urls: list[str] = progress.get_remaining_page_urls()
+                log.debug(
+                    f"Requesting [{len(page_urls)}] remaining page(s) with max_concurrency={max_concurrency}"
+                )
+
+                window: OrderedPageWindow[asyncio.Task] = OrderedPageWindow(
+                    page_urls,
+                    submit=lambda page_url: asyncio.create_task(
+                        self._get_star_page(http_ctl, url=page_url, headers=headers)
+                    ),
+                    max_concurrency=max_concurrency,
+                )
+
+                try:
+                    while window:
+                        task, next_page_url = window.pop()
+                        _, page_data = await task
+                        window.submit_next()
+
+                        await asyncio.to_thread(
+                            progress.page_done, page_data, next_url=next_page_url
+                        )
+                        yield page_data
+                finally:
+                    await asyncio.gather(*window.cancel(), return_exceptions=True)
+
+            else:
+                while progress.next_url:
+                    res, res_data = await self._get_star_page(
+                        http_ctl, url=progress.next_url, headers=headers
+                    )
+
+                    await asyncio.to_thread(progress.response_page_done, res, res_data)
+                    yield res_data
+
+    async def get_authenticated_user(self) -> dict[str, t.Any]:
+        """Get the Github account the API token belongs to.
+
+        Returns:
+            (dict): The `/user` response, i.e. `{"login": ..., "id": ..., ...}`.
+
+        Raises:
+            httpx.HTTPStatusError: When the request is not successful.
+
+        """
+        req = http_lib.build_request(
+            url=f"{self.base_url}/user", headers=self._default_headers()
+        )
+
+        async with self._open_http_controller() as http_ctl:
+            res = await self._send_request(http_ctl, req)
+
+        if res.status_code != 200:
+            msg = f"Failed to get authenticated user. [{res.status_code}: {res.reason_phrase}] {res.text}"
+            log.error(msg)
+
+            raise httpx.HTTPStatusError(msg, request=res.request, response=res)
+
+        return http_lib.decode_response(res)
+
+    async def get_user_stars(
+        self,
+        results_per_page: int = 30,
+        sort_by: str = "created",
+        sort_direction: str = "desc",
+        parallel: bool = False,
+        max_concurrency: int = 4,
+        checkpoint: bool = False,
+        checkpoint_max_age: int | None = 86400,
+    ) -> t.Optional[list[dict[str, t.Any]]]:
+        """Fetch all starred repositories of the authenticated user, handling pagination.
+
+        Description:
+            Collects every page from `iter_user_stars()` into a single list. See `iter_user_stars()`
+            for a description of the params.
+
+        Returns:
+            (list[dict] | None): A list of starred repository dicts, or `None` if no repositories were found.
+
+        """
+        all_stars = []
+
+        try:
+            async for page in self.iter_user_stars(
+                results_per_page=results_per_page,
+                sort_by=sort_by,
+                sort_direction=sort_direction,
+                parallel=parallel,
+                max_concurrency=max_concurrency,
+                checkpoint=checkpoint,
+                checkpoint_max_age=checkpoint_max_age,
+            ):
+                all_stars.extend(page)
+        except Exception as exc:
+            msg = f"({type(exc)}) Error getting user's starred repositories. Details: {exc}"
+            log.error(msg)
+            raise exc
+
+        return all_stars if all_stars else None
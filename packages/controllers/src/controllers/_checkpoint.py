@@ -0,0 +1,197 @@
+from __future__ import annotations
+
+import hashlib
+import json
+from pathlib import Path
+import sqlite3
+import threading
+import time
+import typing as t
+
+from loguru import logger as log
+
+__all__ = ["PaginationCheckpointStore", "get_checkpoint_key"]
+
+
+def get_checkpoint_key(*parts: t.Any) -> str:
+    """Build the key a paginated request's checkpoint is saved under.
+
+    Description:
+        Parts (i.e. the API token, URL & params) are hashed, so tokens are never written to disk.
+
+    Returns:
+        (str): A sha256 hex digest of the parts.
+
+    """
+    key_src: str = json.dumps(parts, sort_keys=True, default=str)
+
+    return hashlib.sha256(key_src.encode("utf-8")).hexdigest()
+
+
+class PaginationCheckpointStore:
+    """Save completed pages of a paginated request, so an interrupted run can resume where it stopped.
+
+    Description:
+        For each checkpoint key, the store keeps the decoded data of every completed page, the URL of
+        the next page to request & the `rel="last"` URL. Pages are written in a single transaction
+        with the checkpoint's progress, so a checkpoint never points past a page that was not saved.
+
+        The SQLite connection is guarded by a lock, so one store can be shared by multiple threads.
+
+    Params:
+        db_file (str): Path to the SQLite database file. Parent directories are created if needed.
+
+    """
+
+    def __init__(self, db_file: str = ".cache/checkpoints/pagination.sqlite3"):
+        self.db_file: Path = Path(db_file)
+
+        if not self.db_file.parent.exists():
+            self.db_file.parent.mkdir(parents=True, exist_ok=True)
+
+        self._lock: threading.Lock = threading.Lock()
+        self._conn: sqlite3.Connection = sqlite3.connect(
+            database=str(self.db_file), check_same_thread=False
+        )
+        self._conn.executescript(
+            """CREATE TABLE IF NOT EXISTS checkpoints (
+                key TEXT PRIMARY KEY,
+                next_url TEXT,
+                last_url TEXT,
+                page_count INTEGER NOT NULL,
+                created_at REAL NOT NULL,
+                updated_at REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS checkpoint_pages (
+                key TEXT NOT NULL,
+                page INTEGER NOT NULL,
+                data TEXT NOT NULL,
+                PRIMARY KEY (key, page)
+            );"""
+        )
+        self._conn.commit()
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def get_checkpoint(
+        self, key: str, max_age: int | None = None
+    ) -> dict[str, t.Any] | None:
+        """Get a saved checkpoint.
+
+        Params:
+            key (str): The checkpoint key.
+            max_age (int | None): Max age, in seconds, of a checkpoint to resume from. Older checkpoints
+                are deleted. When `None`, checkpoints do not expire.
+
+        Returns:
+            (dict | None): A dict with `next_url`, `last_url` & `page_count` keys, or `None` if there is
+                no usable checkpoint.
+
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT next_url, last_url, page_count, created_at FROM checkpoints WHERE key = ?",
+                (key,),
+            ).fetchone()
+
+        if row is None:
+            return None
+
+        next_url, last_url, page_count, created_at = row
+
+        if max_age is not None and time.time() - created_at > max_age:
+            log.info(
+                f"Checkpoint is older than {max_age}s, starting from the first page"
+            )
+            self.clear(key)
+
+            return None
+
+        return {"next_url": next_url, "last_url": last_url, "page_count": page_count}
+
+    def get_page(self, key: str, page: int) -> list[dict[str, t.Any]]:
+        """Get the saved data of a completed page.
+
+        Params:
+            key (str): The checkpoint key.
+            page (int): The page number, starting at 1.
+
+        Returns:
+            (list[dict]): The decoded page.
+
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT data FROM checkpoint_pages WHERE key = ? AND page = ?",
+                (key, page),
+            ).fetchone()
+
+        if row is None:
+            raise KeyError(f"Page {page} is missing from checkpoint '{key}'")
+
+        return json.loads(row[0])
+
+    def iter_pages(self, key: str) -> t.Generator[list[dict[str, t.Any]], None, None]:
+        """Yield the saved data of each completed page, in order.
+
+        Params:
+            key (str): The checkpoint key.
+
+        """
+        checkpoint: dict[str, t.Any] | None = self.get_checkpoint(key)
+        if checkpoint is None:
+            return
+
+        for page in range(1, checkpoint["page_count"] + 1):
+            yield self.get_page(key, page)
+
+    def save_page(
+        self,
+        key: str,
+        page: int,
+        data: list[dict[str, t.Any]],
+        next_url: str | None,
+        last_url: str | None,
+    ) -> None:
+        """Save a completed page & advance the checkpoint.
+
+        Params:
+            key (str): The checkpoint key.
+            page (int): The page number, starting at 1.
+            data (list[dict]): The decoded page.
+            next_url (str | None): URL of the next page to request, or `None` if this was the last page.
+            last_url (str | None): The `rel="last"` URL of the paginated request.
+
+        """
+        now: float = time.time()
+
+        with self._lock:
+            with self._conn:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO checkpoint_pages (key, page, data) VALUES (?, ?, ?)",
+                    (key, page, json.dumps(data)),
+                )
+                self._conn.execute(
+                    """INSERT INTO checkpoints (key, next_url, last_url, page_count, created_at, updated_at)
+                    VALUES (?, ?, ?, ?, ?, ?)
+                    ON CONFLICT (key) DO UPDATE SET
+                        next_url = excluded.next_url,
+                        last_url = excluded.last_url,
+                        page_count = excluded.page_count,
+                        updated_at = excluded.updated_at""",
+                    (key, next_url, last_url, page, now, now),
+                )
+
+    def clear(self, key: str) -> None:
+        """Delete a checkpoint & its saved pages.
+
+        Params:
+            key (str): The checkpoint key.
+
+        """
+        with self._lock:
+            with self._conn:
+                self._conn.execute("DELETE FROM checkpoint_pages WHERE key = ?", (key,))
+                self._conn.execute("DELETE FROM checkpoints WHERE key = ?", (key,))
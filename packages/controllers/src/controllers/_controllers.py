@@ -1,14 +1,19 @@
 from __future__ import annotations
 
-from contextlib import AbstractContextManager
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import AbstractContextManager, closing
 import json
 from pathlib import Path
 import typing as t
 
+from ._rate_limit import GithubRateLimiter
+from ._star_pages import OrderedPageWindow, StarPageProgress, build_star_params
+
 import core_utils
 import db_lib
 import depends
 import http_lib
+import httpx
 from loguru import logger as log
 import settings
 
@@ -21,24 +26,44 @@ class GithubAPIController(AbstractContextManager):
         use_cache: bool = True,
         follow_redirects: bool = False,
         cache_ttl: int = 900,
+        use_etags: bool = True,
+        rate_limiter: GithubRateLimiter | None = None,
+        transport: httpx.BaseTransport | None = None,
     ):
         self.api_token = api_token
         self.github_api_version = github_api_version
         self.use_cache = use_cache
         self.follow_redirects = follow_redirects
         self.cache_ttl = cache_ttl
+        self.use_etags = use_etags
+        ## Rate limits are per token, share a limiter only between controllers using the same token
+        self.rate_limiter: GithubRateLimiter = (
+            rate_limiter if rate_limiter is not None else GithubRateLimiter()
+        )
+        ## Transport for the HTTP client, i.e. a local stand-in for the Github API
+        self.transport: httpx.BaseTransport | None = transport
 
         self.base_url = "https://api.github.com"
         self.http_controller: http_lib.HttpxController | None = None
+        self.etag_store: http_lib.ETagStore | None = None
 
     def __enter__(self) -> t.Self:
         self.http_controller = self._get_http_controller()
 
+        if self.use_etags:
+            self.etag_store = http_lib.get_etag_store()
+
         return self
 
     def __exit__(self, exc_type, exc_val, exc_tb):
+        if self.etag_store:
+            self.etag_store.close()
+            self.etag_store = None
+
         if exc_type:
-            log.error(f"({exc_type}) {exc_val}")
+            ## Closing a page iterator early (i.e. an incremental sync) is not an error
+            if not issubclass(exc_type, GeneratorExit):
+                log.error(f"({exc_type}) {exc_val}")
             return False
 
         return True
@@ -56,74 +81,286 @@ class GithubAPIController(AbstractContextManager):
             use_cache=self.use_cache,
             follow_redirects=self.follow_redirects,
             cache_ttl=self.cache_ttl,
+            transport=self.transport,
         )
 
         return http_controller
 
-    def get_user_stars(
+    def _send_request(
+        self, http_ctl: http_lib.HttpxController, req: httpx.Request
+    ) -> httpx.Response:
+        """Send a request through the rate limiter, making it conditional when a response for it was stored by a previous run.
+
+        Description:
+            The request waits for a token from `self.rate_limiter`, and is retried with backoff when it is
+            rate limited (403/429) or fails with a transient error.
+
+            When `use_etags=True`, the stored `ETag`/`Last-Modified` values are sent as `If-None-Match`/
+            `If-Modified-Since`. A `304 Not Modified` response is replaced with the stored response, and
+            new `200` responses are stored for the next run.
+
+        Params:
+            http_ctl (http_lib.HttpxController): An open HttpxController to send the request with.
+            req (httpx.Request): The request to send.
+
+        Returns:
+            (httpx.Response): The response.
+
+        """
+        if self.etag_store:
+            req = self.etag_store.add_conditional_headers(req)
+
+        res = self.rate_limiter.send(
+            lambda: http_ctl.send_request(req), description=f"request to '{req.url}'"
+        )
+
+        if self.etag_store:
+            res = self.etag_store.handle_response(req, res)
+
+        return res
+
+    def _get_star_page(
+        self,
+        http_ctl: http_lib.HttpxController,
+        url: str,
+        headers: dict[str, str],
+        params: dict | None = None,
+    ) -> tuple[httpx.Response, list[dict[str, t.Any]]]:
+        """Request a single page of starred repositories.
+
+        Params:
+            http_ctl (http_lib.HttpxController): An open HttpxController to send the request with.
+            url (str): The URL of the page to request.
+            headers (dict[str, str]): Headers to send with the request.
+            params (dict | None): Optional URL params. Only the first page needs these, later page
+                URLs already include them.
+
+        Returns:
+            (tuple[httpx.Response, list[dict]]): The response, and the decoded page of repositories.
+
+        Raises:
+            httpx.HTTPStatusError: When the request is not successful.
+
+        """
+        req = http_lib.build_request(url=url, headers=headers, params=params)
+        res = self._send_request(http_ctl, req)
+
+        if res.status_code != 200:
+            msg = f"Failed to get user's starred repositories. [{res.status_code}: {res.reason_phrase}] {res.text}"
+            log.error(msg)
+
+            raise httpx.HTTPStatusError(msg, request=res.request, response=res)
+
+        try:
+            res_data = http_lib.decode_response(res)
+        except Exception as exc:
+            msg = f"({type(exc)}) Error decoding user's starred repositories. Details: {exc}"
+            log.error(msg)
+            raise exc
+
+        return res, res_data
+
+    def iter_user_stars(
         self,
         results_per_page: int = 30,
         sort_by: str = "created",
         sort_direction: str = "desc",
-    ) -> t.Optional[list[dict[str, t.Any]]]:
-        """Fetch all starred repositories of the authenticated user, handling pagination."""
-        if results_per_page < 1 or results_per_page > 100:
-            raise ValueError(
-                f"results_per_page must be between 1 and 100. Default is 30. Got [{results_per_page}]"
-            )
+        parallel: bool = False,
+        max_concurrency: int = 4,
+        checkpoint: bool = False,
+        checkpoint_max_age: int | None = 86400,
+    ) -> t.Generator[list[dict[str, t.Any]], None, None]:
+        """Iterate over pages of the authenticated user's starred repositories.
 
-        if sort_by not in ["created", "updated"]:
-            raise ValueError(f"sort_by must be 'created' or 'updated'. Got [{sort_by}]")
+        Description:
+            Yields one decoded page (a list of repository dicts) at a time, so callers can process
+            results incrementally. Memory use depends on the page size, not the total number of stars.
 
-        if sort_direction not in ["asc", "desc"]:
-            raise ValueError(
-                f"sort_direction must be 'asc' or 'desc'. Got [{sort_direction}]"
-            )
+            By default, pages are requested one at a time by following each response's `rel="next"` link.
+
+            When `parallel=True`, the first page is requested, then the `rel="last"` link is used to compute
+            the URL of every remaining page. Those pages are requested concurrently, with at most `max_concurrency`
+            requests in flight at once. Pages are still yielded in order, and at most `max_concurrency` pages
+            are held in memory while waiting to be yielded.
+
+            When `checkpoint=True`, each completed page is saved to a `PaginationCheckpointStore` before it is
+            yielded. If the run is interrupted, the next run with the same token & params yields the saved pages,
+            then continues requesting from the first page that was not completed. The checkpoint is kept when a page
+            request fails or the consumer raises, and deleted once the last page has been yielded. Stars added or removed between the two runs shift page boundaries,
+            so a resumed run can contain duplicates; `checkpoint_max_age` limits how stale a resumed run can be.
+
+        Params:
+            results_per_page (int): (default: 30) Number of repositories per page, between 1 and 100.
+            sort_by (str): (default: "created") Sort by "created" or "updated".
+            sort_direction (str): (default: "desc") Sort "asc" or "desc".
+            parallel (bool): (default: False) Request pages concurrently using the `rel="last"` link.
+            max_concurrency (int): (default: 4) Max number of concurrent page requests when `parallel=True`.
+            checkpoint (bool): (default: False) Save completed pages to disk, and resume from a previous
+                interrupted run.
+            checkpoint_max_age (int | None): (default: 86400) Max age, in seconds, of a checkpoint to resume from.
+
+        Yields:
+            (list[dict]): A page of starred repository dicts.
+
+        Raises:
+            httpx.HTTPStatusError: When a page request is not successful.
+
+        """
+        params = build_star_params(
+            results_per_page=results_per_page,
+            sort_by=sort_by,
+            sort_direction=sort_direction,
+            max_concurrency=max_concurrency,
+        )
 
         url: str = f"{self.base_url}/user/starred"
-        all_stars = []
 
         headers = self._default_headers()
 
-        params = {
-            "sort": sort_by,
-            "direction": sort_direction,
-            "per_page": results_per_page,
-        }
-
         log.info("Getting user's starred repositories.")
 
+        progress: StarPageProgress = StarPageProgress.for_request(
+            checkpoint, api_token=self.api_token, url=url, params=params
+        )
+
         try:
-            with self.http_controller as http_ctl:
-                while url:
-                    # Only use params for the first request, after that, use direct URLs from pagination
-                    req = http_lib.build_request(
-                        url=url,
-                        headers=headers,
-                        params=params
-                        if url == f"{self.base_url}/user/starred"
-                        else None,
+            with closing(
+                self._iter_star_pages(
+                    progress,
+                    url=url,
+                    headers=headers,
+                    params=params,
+                    parallel=parallel,
+                    max_concurrency=max_concurrency,
+                    checkpoint_max_age=checkpoint_max_age,
+                )
+            ) as pages:
+                yield from pages
+
+            ## Every page was requested, the checkpoint is no longer needed
+            progress.clear()
+
+        finally:
+            progress.close()
+
+    def _iter_star_pages(
+        self,
+        progress: StarPageProgress,
+        url: str,
+        headers: dict[str, str],
+        params: dict[str, t.Any],
+        parallel: bool,
+        max_concurrency: int,
+        checkpoint_max_age: int | None,
+    ) -> t.Generator[list[dict[str, t.Any]], None, None]:
+        """Request the pages of `iter_user_stars()`, recording each completed page in `progress`."""
+        with self.http_controller as http_ctl:
+            if progress.resume(max_age=checkpoint_max_age):
+                for page in range(1, progress.completed_pages + 1):
+                    yield progress.get_saved_page(page)
+
+            else:
+                ## Only use params for the first request, after that, use direct URLs from pagination
+                res, res_data = self._get_star_page(
+                    http_ctl, url=url, headers=headers, params=params
+                )
+
+                progress.response_page_done(res, res_data)
+                yield res_data
+
+            if parallel:
+                page_urls: list[str] = progress.get_remaining_page_urls()
+                log.debug(
+                    f"Requesting [{len(page_urls)}] remaining page(s) with max_concurrency={max_concurrency}"
+                )
+
+                for res_data, next_page_url in self._iter_star_pages_concurrently(
+                    http_ctl,
+                    page_urls=page_urls,
+                    headers=headers,
+                    max_concurrency=max_concurrency,
+                ):
+                    progress.page_done(res_data, next_url=next_page_url)
+                    yield res_data
+
+            else:
+                while progress.next_url:
+                    res, res_data = self._get_star_page(
+                        http_ctl, url=progress.next_url, headers=headers
                     )
-                    res = http_ctl.send_request(req)
-                    log.debug(f"Next page links: {res.links}")
-
-                    if res.status_code != 200:
-                        log.error(
-                            f"Failed to get user's starred repositories. [{res.status_code}: {res.reason_phrase}] {res.text}"
-                        )
-                        return None
-
-                    try:
-                        res_data = http_lib.decode_response(res)
-                        all_stars.extend(res_data)
-                    except Exception as exc:
-                        msg = f"({type(exc)}) Error decoding user's starred repositories. Details: {exc}"
-                        log.error(msg)
-                        raise exc
-
-                    # Get the next page URL from the response links
-                    url = res.links.get("next", {}).get("url")
 
+                    progress.response_page_done(res, res_data)
+                    yield res_data
+
+    def _iter_star_pages_concurrently(
+        self,
+        http_ctl: http_lib.HttpxController,
+        page_urls: list[str],
+        headers: dict[str, str],
+        max_concurrency: int,
+    ) -> t.Generator[tuple[list[dict[str, t.Any]], str | None], None, None]:
+        """Request pages on a thread pool and yield them in order.
+
+        Description:
+            Keeps a window of at most `max_concurrency` requests in flight, see `OrderedPageWindow`.
+
+        Yields:
+            (tuple[list[dict], str | None]): A page of starred repository dicts, and the URL of the page after it.
+
+        """
+        with ThreadPoolExecutor(max_workers=max_concurrency) as executor:
+            window: OrderedPageWindow[Future] = OrderedPageWindow(
+                page_urls,
+                submit=lambda page_url: executor.submit(
+                    self._get_star_page, http_ctl, url=page_url, headers=headers
+                ),
+                max_concurrency=max_concurrency,
+            )
+
+            try:
+                while window:
+                    future, next_page_url = window.pop()
+                    _, page_data = future.result()
+                    window.submit_next()
+
+                    yield page_data, next_page_url
+            finally:
+                ## Don't start requests for pages that will not be consumed
+                window.cancel()
+
+    def get_user_stars(
+        self,
+        results_per_page: int = 30,
+        sort_by: str = "created",
+        sort_direction: str = "desc",
+        parallel: bool = False,
+        max_concurrency: int = 4,
+        checkpoint: bool = False,
+        checkpoint_max_age: int | None = 86400,
+    ) -> t.Optional[list[dict[str, t.Any]]]:
+        """Fetch all starred repositories of the authenticated user, handling pagination.
+
+        Description:
+            Collects every page from `iter_user_stars()` into a single list. See `iter_user_stars()`
+            for a description of the params. Prefer `iter_user_stars()` for large accounts.
+
+        Returns:
+            (list[dict] | None): A list of starred repository dicts, or `None` if no repositories were found.
+
+        """
+        all_stars = []
+
+        try:
+            for page in self.iter_user_stars(
+                results_per_page=results_per_page,
+                sort_by=sort_by,
+                sort_direction=sort_direction,
+                parallel=parallel,
+                max_concurrency=max_concurrency,
+                checkpoint=checkpoint,
+                checkpoint_max_age=checkpoint_max_age,
+            ):
+                all_stars.extend(page)
         except Exception as exc:
             msg = f"({type(exc)}) Error getting user's starred repositories. Details: {exc}"
             log.error(msg)
@@ -0,0 +1,492 @@
+from __future__ import annotations
+
+from contextlib import AbstractContextManager
+import typing as t
+
+from ._rate_limit import GithubRateLimiter
+
+import http_lib
+import httpx
+from loguru import logger as log
+
+__all__ = ["GithubGraphQLController", "convert_graphql_starred_repo"]
+
+## Only request the fields the starred repository & owner schemas need. The REST payload's
+#  `*_url` templates are not requested, they are built locally from the owner & repository name.
+STARRED_REPOS_QUERY: str = """
+query ($first: Int!, $after: String, $direction: OrderDirection!) {
+  viewer {
+    starredRepositories(first: $first, after: $after, orderBy: {field: STARRED_AT, direction: $direction}) {
+      pageInfo {
+        hasNextPage
+        endCursor
+      }
+      nodes {
+        databaseId
+        id
+        name
+        nameWithOwner
+        isPrivate
+        description
+        isFork
+        url
+        sshUrl
+        homepageUrl
+        mirrorUrl
+        createdAt
+        updatedAt
+        pushedAt
+        diskUsage
+        stargazerCount
+        forkCount
+        primaryLanguage { name }
+        hasIssuesEnabled
+        hasProjectsEnabled
+        hasWikiEnabled
+        hasDiscussionsEnabled
+        isArchived
+        isDisabled
+        isTemplate
+        forkingAllowed
+        webCommitSignoffRequired
+        visibility
+        viewerPermission
+        defaultBranchRef { name }
+        licenseInfo { id key name spdxId }
+        repositoryTopics(first: 20) { nodes { topic { name } } }
+        issues(states: OPEN) { totalCount }
+        pullRequests(states: OPEN) { totalCount }
+        owner {
+          __typename
+          id
+          login
+          avatarUrl
+          ... on User { databaseId isSiteAdmin }
+          ... on Organization { databaseId }
+        }
+      }
+    }
+  }
+}
+"""
+
+## REST `*_url` fields of a repository, relative to the repository's API URL
+REPO_URL_TEMPLATES: dict[str, str] = {
+    "forks_url": "/forks",
+    "keys_url": "/keys{/key_id}",
+    "collaborators_url": "/collaborators{/collaborator}",
+    "teams_url": "/teams",
+    "hooks_url": "/hooks",
+    "issue_events_url": "/issues/events{/number}",
+    "events_url": "/events",
+    "assignees_url": "/assignees{/user}",
+    "branches_url": "/branches{/branch}",
+    "tags_url": "/tags",
+    "blobs_url": "/git/blobs{/sha}",
+    "git_tags_url": "/git/tags{/sha}",
+    "git_refs_url": "/git/refs{/sha}",
+    "trees_url": "/git/trees{/sha}",
+    "statuses_url": "/statuses/{sha}",
+    "languages_url": "/languages",
+    "stargazers_url": "/stargazers",
+    "contributors_url": "/contributors",
+    "subscribers_url": "/subscribers",
+    "subscription_url": "/subscription",
+    "commits_url": "/commits{/sha}",
+    "git_commits_url": "/git/commits{/sha}",
+    "comments_url": "/comments{/number}",
+    "issue_comment_url": "/issues/comments{/number}",
+    "contents_url": "/contents/{+path}",
+    "compare_url": "/compare/{base}...{head}",
+    "merges_url": "/merges",
+    "archive_url": "/{archive_format}{/ref}",
+    "downloads_url": "/downloads",
+    "issues_url": "/issues{/number}",
+    "pulls_url": "/pulls{/number}",
+    "milestones_url": "/milestones{/number}",
+    "notifications_url": "/notifications{?since,all,participating}",
+    "labels_url": "/labels{/name}",
+    "releases_url": "/releases{/id}",
+    "deployments_url": "/deployments",
+}
+
+## REST `*_url` fields of a repository owner, relative to the owner's API URL
+OWNER_URL_TEMPLATES: dict[str, str] = {
+    "followers_url": "/followers",
+    "following_url": "/following{/other_user}",
+    "gists_url": "/gists{/gist_id}",
+    "starred_url": "/starred{/owner}{/repo}",
+    "subscriptions_url": "/subscriptions",
+    "organizations_url": "/orgs",
+    "repos_url": "/repos",
+    "events_url": "/events{/privacy}",
+    "received_events_url": "/received_events",
+}
+
+## Permissions granted by each GraphQL `RepositoryPermission`, as a REST `permissions` dict
+PERMISSION_LEVELS: list[str] = ["pull", "triage", "push", "maintain", "admin"]
+VIEWER_PERMISSIONS: dict[str, str] = {
+    "READ": "pull",
+    "TRIAGE": "triage",
+    "WRITE": "push",
+    "MAINTAIN": "maintain",
+    "ADMIN": "admin",
+}
+
+
+def _get_permissions(viewer_permission: str | None) -> dict[str, bool]:
+    granted: str | None = VIEWER_PERMISSIONS.get(viewer_permission)
+    granted_level: int = PERMISSION_LEVELS.index(granted) if granted is not None else -1
+
+    ## REST returns permissions in descending order, i.e. {"admin": ..., "pull": ...}
+    return {
+        permission: PERMISSION_LEVELS.index(permission) <= granted_level
+        for permission in reversed(PERMISSION_LEVELS)
+    }
+
+
+def convert_graphql_starred_repo(
+    node: dict[str, t.Any],
+    api_base_url: str = "https://api.github.com",
+    html_base_url: str = "https://github.com",
+) -> dict[str, t.Any]:
+    """Convert a GraphQL starred repository node to the shape of a REST `/user/starred` item.
+
+    Description:
+        GraphQL does not return the REST `*_url` templates, they are built from the owner login &
+        repository name. A license's `url` is built from its key, and a license with no SPDX ID gets
+        REST's `"NOASSERTION"`.
+
+        Limitation: GraphQL does not expose `has_downloads` or `has_pages`, so they are always `True` &
+        `False`, the REST defaults for a public repository, even when REST returns another value. These
+        fields are left out of the repository's content hash, so switching between the REST & GraphQL
+        APIs does not rewrite unchanged repositories, but a change to them alone is not detected.
+
+    Params:
+        node (dict): A repository node from the `STARRED_REPOS_QUERY` response.
+        api_base_url (str): Base URL of the REST API.
+        html_base_url (str): Base URL of the Github website.
+
+    Returns:
+        (dict): A dict with the same keys as a REST starred repository.
+
+    """
+    owner_node: dict[str, t.Any] = node["owner"]
+    owner_login: str = owner_node["login"]
+    owner_api_url: str = f"{api_base_url}/users/{owner_login}"
+
+    owner: dict[str, t.Any] = {
+        "login": owner_login,
+        "id": owner_node.get("databaseId"),
+        "node_id": owner_node["id"],
+        "avatar_url": owner_node["avatarUrl"],
+        "gravatar_id": "",
+        "url": owner_api_url,
+        "html_url": f"{html_base_url}/{owner_login}",
+        **{k: f"{owner_api_url}{v}" for k, v in OWNER_URL_TEMPLATES.items()},
+        "type": owner_node["__typename"],
+        "user_view_type": "public",
+        "site_admin": owner_node.get("isSiteAdmin", False),
+    }
+
+    full_name: str = node["nameWithOwner"]
+    repo_api_url: str = f"{api_base_url}/repos/{full_name}"
+
+    license_info: dict[str, t.Any] | None = node.get("licenseInfo")
+    repo_license: dict[str, t.Any] | None = (
+        {
+            "key": license_info["key"],
+            "name": license_info["name"],
+            "spdx_id": license_info["spdxId"] or "NOASSERTION",
+            "url": f"{api_base_url}/licenses/{license_info['key']}"
+            if license_info["key"] != "other"
+            else None,
+            "node_id": license_info["id"],
+        }
+        if license_info
+        else None
+    )
+
+    open_issues_count: int = (
+        node["issues"]["totalCount"] + node["pullRequests"]["totalCount"]
+    )
+    default_branch: dict[str, t.Any] | None = node.get("defaultBranchRef")
+    primary_language: dict[str, t.Any] | None = node.get("primaryLanguage")
+
+    return {
+        "id": node["databaseId"],
+        "node_id": node["id"],
+        "name": node["name"],
+        "full_name": full_name,
+        "private": node["isPrivate"],
+        "owner": owner,
+        "html_url": node["url"],
+        "description": node.get("description"),
+        "fork": node["isFork"],
+        "url": repo_api_url,
+        **{k: f"{repo_api_url}{v}" for k, v in REPO_URL_TEMPLATES.items()},
+        "created_at": node["createdAt"],
+        "updated_at": node["updatedAt"],
+        "pushed_at": node.get("pushedAt"),
+        "git_url": f"git://{html_base_url.split('://', 1)[-1]}/{full_name}.git",
+        "ssh_url": node["sshUrl"],
+        "clone_url": f"{node['url']}.git",
+        "svn_url": node["url"],
+        "homepage": node.get("homepageUrl") or None,
+        "size": node["diskUsage"] or 0,
+        "stargazers_count": node["stargazerCount"],
+        "watchers_count": node["stargazerCount"],
+        "language": primary_language["name"] if primary_language else None,
+        "has_issues": node["hasIssuesEnabled"],
+        "has_projects": node["hasProjectsEnabled"],
+        "has_downloads": True,
+        "has_wiki": node["hasWikiEnabled"],
+        "has_pages": False,
+        "has_discussions": node["hasDiscussionsEnabled"],
+        "forks_count": node["forkCount"],
+        "mirror_url": node.get("mirrorUrl"),
+        "archived": node["isArchived"],
+        "disabled": node["isDisabled"],
+        "open_issues_count": open_issues_count,
+        "license": repo_license,
+        "allow_forking": node["forkingAllowed"],
+        "is_template": node["isTemplate"],
+        "web_commit_signoff_required": node["webCommitSignoffRequired"],
+        "topics": [
+            topic_node["topic"]["name"]
+            for topic_node in node["repositoryTopics"]["nodes"]
+        ],
+        "visibility": node["visibility"].lower(),
+        "forks": node["forkCount"],
+        "open_issues": open_issues_count,
+        "watchers": node["stargazerCount"],
+        "default_branch": default_branch["name"] if default_branch else "",
+        "permissions": _get_permissions(node.get("viewerPermission")),
+    }
+
+
+class GithubGraphQLController(AbstractContextManager):
+    """Fetch starred repositories from Github's GraphQL API.
+
+    Description:
+        An alternative to `GithubAPIController` that only requests the fields the database stores,
+        up to 100 repositories per request. Items are converted to the REST `/user/starred` shape
+        with `convert_graphql_starred_repo()`, so they can be saved with the same code.
+
+        GraphQL pagination uses cursors, so pages can only be requested one after another.
+
+    Usage:
+        with GithubGraphQLController(api_token=...) as gh:
+            for page in gh.iter_user_stars():
+                ...
+    """
+
+    def __init__(
+        self,
+        api_token: str,
+        github_api_version: str = "2022-11-28",
+        follow_redirects: bool = False,
+        rate_limiter: GithubRateLimiter | None = None,
+    ):
+        self.api_token = api_token
+        self.github_api_version = github_api_version
+        self.follow_redirects = follow_redirects
+        ## The GraphQL API has its own rate limit, separate from the REST API
+        self.rate_limiter: GithubRateLimiter = (
+            rate_limiter if rate_limiter is not None else GithubRateLimiter()
+        )
+
+        self.base_url = "https://api.github.com"
+        self.graphql_url = f"{self.base_url}/graphql"
+        self.http_controller: http_lib.HttpxController | None = None
+
+    def __enter__(self) -> t.Self:
+        self.http_controller = self._get_http_controller()
+
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        if exc_type:
+            ## Closing a page iterator early is not an error
+            if not issubclass(exc_type, GeneratorExit):
+                log.error(f"({exc_type}) {exc_val}")
+            return False
+
+        return True
+
+    def _default_headers(self) -> dict[str, str]:
+        return {
+            "Accept": "application/vnd.github+json",
+            "Authorization": f"Bearer {self.api_token}",
+            "X-GitHub-Api-Version": self.github_api_version,
+            "User-Agent": "mygh-python",
+        }
+
+    def _get_http_controller(self) -> http_lib.HttpxController:
+        ## GraphQL queries are POST requests, which are not cached
+        http_controller: http_lib.HttpxController = http_lib.get_http_controller(
+            use_cache=False,
+            follow_redirects=self.follow_redirects,
+        )
+
+        return http_controller
+
+    def _get_star_page(
+        self,
+        http_ctl: http_lib.HttpxController,
+        headers: dict[str, str],
+        results_per_page: int,
+        sort_direction: str,
+        cursor: str | None = None,
+    ) -> tuple[dict[str, t.Any], list[dict[str, t.Any]]]:
+        """Request a single page of starred repositories.
+
+        Params:
+            http_ctl (http_lib.HttpxController): An open HttpxController to send the request with.
+            headers (dict[str, str]): Headers to send with the request.
+            results_per_page (int): Number of repositories per page, between 1 and 100.
+            sort_direction (str): Sort "asc" or "desc".
+            cursor (str | None): The `endCursor` of the previous page, or `None` for the first page.
+
+        Returns:
+            (tuple[dict, list[dict]]): The page's `pageInfo`, and the page of repositories converted to
+                the REST shape.
+
+        Raises:
+            httpx.HTTPStatusError: When the request is not successful.
+            RuntimeError: When the GraphQL response contains errors.
+
+        """
+        req: httpx.Request = http_lib.build_request(
+            method="POST",
+            url=self.graphql_url,
+            headers=headers,
+            json={
+                "query": STARRED_REPOS_QUERY,
+                "variables": {
+                    "first": results_per_page,
+                    "after": cursor,
+                    "direction": sort_direction.upper(),
+                },
+            },
+        )
+        res: httpx.Response = self.rate_limiter.send(
+            lambda: http_ctl.send_request(req),
+            description="GraphQL starred repositories query",
+        )
+
+        if res.status_code != 200:
+            msg = f"Failed to get user's starred repositories. [{res.status_code}: {res.reason_phrase}] {res.text}"
+            log.error(msg)
+
+            raise httpx.HTTPStatusError(msg, request=res.request, response=res)
+
+        try:
+            res_data: dict[str, t.Any] = http_lib.decode_response(res)
+        except Exception as exc:
+            msg = f"({type(exc)}) Error decoding user's starred repositories. Details: {exc}"
+            log.error(msg)
+            raise exc
+
+        if res_data.get("errors"):
+            msg = f"GraphQL query for user's starred repositories returned errors. Details: {res_data['errors']}"
+            log.error(msg)
+
+            raise RuntimeError(msg)
+
+        starred: dict[str, t.Any] = res_data["data"]["viewer"]["starredRepositories"]
+        page_data: list[dict[str, t.Any]] = [
+            convert_graphql_starred_repo(node, api_base_url=self.base_url)
+            for node in starred["nodes"]
+        ]
+
+        return starred["pageInfo"], page_data
+
+    def iter_user_stars(
+        self,
+        results_per_page: int = 100,
+        sort_by: str = "created",
+        sort_direction: str = "desc",
+    ) -> t.Generator[list[dict[str, t.Any]], None, None]:
+        """Iterate over pages of the authenticated user's starred repositories.
+
+        Params:
+            results_per_page (int): (default: 100) Number of repositories per page, between 1 and 100.
+            sort_by (str): (default: "created") Only "created" (when the repository was starred) is
+                supported by the GraphQL API.
+            sort_direction (str): (default: "desc") Sort "asc" or "desc".
+
+        Yields:
+            (list[dict]): A page of starred repository dicts, in the same shape as the REST API.
+
+        Raises:
+            httpx.HTTPStatusError: When a page request is not successful.
+            RuntimeError: When a GraphQL response contains errors.
+
+        """
+        if results_per_page < 1 or results_per_page > 100:
+            raise ValueError(
+                f"results_per_page must be between 1 and 100. Got: {results_per_page}"
+            )
+        if sort_by != "created":
+            raise ValueError(
+                f"The GraphQL API can only sort starred repositories by 'created'. Got: {sort_by}"
+            )
+        if sort_direction not in ["asc", "desc"]:
+            raise ValueError(
+                f"sort_direction must be 'asc' or 'desc'. Got: {sort_direction}"
+            )
+
+        headers = self._default_headers()
+
+        log.info("Getting user's starred repositories from the GraphQL API.")
+
+        with self.http_controller as http_ctl:
+            cursor: str | None = None
+
+            while True:
+                page_info, page_data = self._get_star_page(
+                    http_ctl,
+                    headers=headers,
+                    results_per_page=results_per_page,
+                    sort_direction=sort_direction,
+                    cursor=cursor,
+                )
+
+                yield page_data
+
+                if not page_info["hasNextPage"]:
+                    break
+
+                cursor = page_info["endCursor"]
+
+    def get_user_stars(
+        self,
+        results_per_page: int = 100,
+        sort_by: str = "created",
+        sort_direction: str = "desc",
+    ) -> t.Optional[list[dict[str, t.Any]]]:
+        """Fetch all starred repositories of the authenticated user, handling pagination.
+
+        Description:
+            Collects every page from `iter_user_stars()` into a single list.
+
+        Returns:
+            (list[dict] | None): A list of starred repository dicts, or `None` if no repositories were found.
+
+        """
+        all_stars = []
+
+        try:
+            for page in self.iter_user_stars(
+                results_per_page=results_per_page,
+                sort_by=sort_by,
+                sort_direction=sort_direction,
+            ):
+                all_stars.extend(page)
+        except Exception as exc:
+            msg = f"({type(exc)}) Error getting user's starred repositories. Details: {exc}"
+            log.error(msg)
+            raise exc
+
+        return all_stars if all_stars else None
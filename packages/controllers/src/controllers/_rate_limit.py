@@ -0,0 +1,351 @@
+from __future__ import annotations
+
+import asyncio
+from email.utils import parsedate_to_datetime
+import random
+import threading
+import time
+import typing as t
+
+import httpx
+from loguru import logger as log
+
+__all__ = ["GithubRateLimiter"]
+
+## Status codes Github uses for primary & secondary rate limits
+RATE_LIMIT_STATUS_CODES: set[int] = {403, 429}
+## Transient server errors that are safe to retry for idempotent requests
+RETRY_STATUS_CODES: set[int] = {500, 502, 503, 504}
+
+
+def _get_int_header(res: httpx.Response, header: str) -> int | None:
+    value: str | None = res.headers.get(header)
+    if value is None:
+        return None
+
+    try:
+        return int(value)
+    except ValueError:
+        return None
+
+
+def _get_retry_after(res: httpx.Response) -> float | None:
+    """Parse a `Retry-After` header, which is either a number of seconds or an HTTP date."""
+    value: str | None = res.headers.get("Retry-After")
+    if value is None:
+        return None
+
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class GithubRateLimiter:
+    """Token bucket that paces requests using Github's rate limit headers.
+
+    Description:
+        The bucket holds the number of requests left in the current rate limit window. It starts empty
+        of information, and is refilled from the `X-RateLimit-Limit`, `X-RateLimit-Remaining` & `X-RateLimit-Reset`
+        headers of every response passed to `update()`.
+
+        Each request takes a token with `acquire()` (or `acquire_async()`), which returns once the request
+        may be sent. Callers are given time slots in the order they ask for them, so concurrent requests
+        are queued instead of all being sent at once:
+
+        - While plenty of the budget is left, requests are sent immediately.
+        - When less than `pace_threshold` of the budget is left, the remaining tokens are spread evenly
+          over the time left until the window resets.
+        - When the bucket is empty, requests wait for the window to reset.
+        - A `Retry-After` header, or a rate limited response, pauses every request until it has passed.
+
+        Github rate limits are per account, so share one limiter between controllers using the same token,
+        and use a separate limiter for each token.
+
+    Params:
+        max_retries (int): (default: 5) Number of times a rate limited or failed request is retried.
+        backoff_base (float): (default: 1.0) Seconds to wait before the first retry of a failed request.
+            The wait doubles with each attempt.
+        max_backoff (float): (default: 60.0) Max number of seconds to wait between retries.
+        secondary_rate_limit_wait (float): (default: 60.0) Seconds to wait after a secondary rate limit
+            response that has no `Retry-After` header, as recommended by Github.
+        pace_threshold (float): (default: 0.1) Fraction of the rate limit below which requests are paced.
+
+    Usage:
+        limiter.acquire()
+        res = client.send(req)
+        limiter.update(res)
+
+    """
+
+    def __init__(
+        self,
+        max_retries: int = 5,
+        backoff_base: float = 1.0,
+        max_backoff: float = 60.0,
+        secondary_rate_limit_wait: float = 60.0,
+        pace_threshold: float = 0.1,
+    ):
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.max_backoff = max_backoff
+        self.secondary_rate_limit_wait = secondary_rate_limit_wait
+        self.pace_threshold = pace_threshold
+
+        self.limit: int | None = None
+        self.tokens: int | None = None
+        self.reset_at: float | None = None
+        self.blocked_until: float = 0.0
+
+        ## The earliest time the next request may be sent
+        self._next_slot: float = 0.0
+        self._lock: threading.Lock = threading.Lock()
+
+    def _reserve(self) -> float:
+        """Take a token, and return the number of seconds to wait before using it."""
+        with self._lock:
+            now: float = time.time()
+            slot: float = max(now, self._next_slot, self.blocked_until)
+            interval: float = 0.0
+
+            if self.tokens is not None and self.reset_at is not None:
+                if slot >= self.reset_at:
+                    ## The window has reset, assume the full limit is available again
+                    self.tokens = self.limit
+                    self.reset_at = None
+
+                elif self.tokens <= 0:
+                    ## Wait for the window to reset. A second is added for clock skew.
+                    slot = self.reset_at + 1
+                    self.tokens = self.limit
+                    self.reset_at = None
+
+                elif self.limit and self.tokens < self.limit * self.pace_threshold:
+                    interval = (self.reset_at - slot) / self.tokens
+
+            if self.tokens is not None:
+                self.tokens -= 1
+
+            self._next_slot = slot + interval
+
+            return slot - now
+
+    def acquire(self) -> float:
+        """Block until a request may be sent.
+
+        Returns:
+            (float): The number of seconds spent waiting.
+
+        """
+        delay: float = self._reserve()
+
+        if delay > 0:
+            log.debug(f"Rate limiter waiting {delay:.2f}s before sending request")
+            time.sleep(delay)
+
+        return delay
+
+    async def acquire_async(self) -> float:
+        """Wait until a request may be sent, without blocking the event loop.
+
+        Returns:
+            (float): The number of seconds spent waiting.
+
+        """
+        delay: float = self._reserve()
+
+        if delay > 0:
+            log.debug(f"Rate limiter waiting {delay:.2f}s before sending request")
+            await asyncio.sleep(delay)
+
+        return delay
+
+    def update(self, res: httpx.Response) -> None:
+        """Refill the bucket from a response's rate limit headers.
+
+        Params:
+            res (httpx.Response): A response from the Github API.
+
+        """
+        limit: int | None = _get_int_header(res, "X-RateLimit-Limit")
+        remaining: int | None = _get_int_header(res, "X-RateLimit-Remaining")
+        reset: int | None = _get_int_header(res, "X-RateLimit-Reset")
+
+        with self._lock:
+            if limit is not None:
+                self.limit = limit
+
+            if remaining is not None:
+                if self.tokens is None or reset is None or reset != self.reset_at:
+                    ## First response, or a new window
+                    self.tokens = remaining
+                else:
+                    ## Requests reserved since this one was sent have already taken tokens
+                    self.tokens = min(self.tokens, remaining)
+
+            if reset is not None:
+                self.reset_at = float(reset)
+
+    def block(self, seconds: float) -> None:
+        """Pause every request for a number of seconds.
+
+        Params:
+            seconds (float): Number of seconds from now before the next request may be sent.
+
+        """
+        with self._lock:
+            self.blocked_until = max(self.blocked_until, time.time() + seconds)
+
+    def is_rate_limited(self, res: httpx.Response) -> bool:
+        """Return `True` if a response was rejected by a primary or secondary rate limit."""
+        if res.status_code not in RATE_LIMIT_STATUS_CODES:
+            return False
+
+        if res.status_code == 429:
+            return True
+
+        ## A 403 is also returned for permission errors, which should not be retried
+        if (
+            "Retry-After" in res.headers
+            or res.headers.get("X-RateLimit-Remaining") == "0"
+        ):
+            return True
+
+        try:
+            return "rate limit" in res.text.lower()
+        except Exception:
+            return False
+
+    def should_retry(self, res: httpx.Response) -> bool:
+        """Return `True` if a request that got this response should be sent again."""
+        return self.is_rate_limited(res) or res.status_code in RETRY_STATUS_CODES
+
+    def get_retry_delay(self, attempt: int, res: httpx.Response | None = None) -> float:
+        """Get the number of seconds to wait before retrying a request.
+
+        Description:
+            Follows Github's guidance for rate limited responses: use `Retry-After` if it is set, otherwise
+            wait until `X-RateLimit-Reset` if no requests are remaining, otherwise wait at least
+            `secondary_rate_limit_wait` seconds. Other failures use exponential backoff with jitter.
+
+        Params:
+            attempt (int): The number of the retry, starting at 0.
+            res (httpx.Response | None): The failed response, or `None` if the request raised a transport error.
+
+        Returns:
+            (float): Number of seconds to wait.
+
+        """
+        backoff: float = min(self.max_backoff, self.backoff_base * (2**attempt))
+        backoff = backoff * random.uniform(0.5, 1.0)
+
+        if res is None or not self.is_rate_limited(res):
+            return backoff
+
+        retry_after: float | None = _get_retry_after(res)
+        if retry_after is not None:
+            return retry_after
+
+        reset: int | None = _get_int_header(res, "X-RateLimit-Reset")
+        if res.headers.get("X-RateLimit-Remaining") == "0" and reset is not None:
+            return max(0.0, reset - time.time()) + 1
+
+        return max(self.secondary_rate_limit_wait, backoff)
+
+    def send(
+        self, send_fn: t.Callable[[], httpx.Response], description: str = "request"
+    ) -> httpx.Response:
+        """Send a request through the limiter, retrying rate limited & failed requests.
+
+        Params:
+            send_fn (Callable[[], httpx.Response]): Function that sends the request & returns the response.
+            description (str): Description of the request used in log messages.
+
+        Returns:
+            (httpx.Response): The first successful response, or the last failed response once
+                `max_retries` is exhausted.
+
+        Raises:
+            httpx.TransportError: When the request fails on the last attempt.
+
+        """
+        for attempt in range(self.max_retries + 1):
+            self.acquire()
+
+            try:
+                res: httpx.Response = send_fn()
+            except httpx.TransportError as exc:
+                if attempt >= self.max_retries:
+                    raise
+
+                delay: float = self.get_retry_delay(attempt)
+                log.warning(
+                    f"({type(exc)}) Error sending {description}, retrying in {delay:.1f}s [attempt {attempt + 1}/{self.max_retries}]. Details: {exc}"
+                )
+                self.block(delay)
+
+                continue
+
+            self.update(res)
+
+            if not self.should_retry(res) or attempt >= self.max_retries:
+                return res
+
+            delay: float = self.get_retry_delay(attempt, res)
+            log.warning(
+                f"[{res.status_code}: {res.reason_phrase}] Rate limited or failed {description}, retrying in {delay:.1f}s [attempt {attempt + 1}/{self.max_retries}]"
+            )
+            self.block(delay)
+
+        return res
+
+    async def send_async(
+        self,
+        send_fn: t.Callable[[], t.Awaitable[httpx.Response]],
+        description: str = "request",
+    ) -> httpx.Response:
+        """The asyncio counterpart of `send()`.
+
+        Params:
+            send_fn (Callable[[], Awaitable[httpx.Response]]): Coroutine function that sends the request.
+            description (str): Description of the request used in log messages.
+
+        Returns:
+            (httpx.Response): The first successful response, or the last failed response once
+                `max_retries` is exhausted.
+
+        """
+        for attempt in range(self.max_retries + 1):
+            await self.acquire_async()
+
+            try:
+                res: httpx.Response = await send_fn()
+            except httpx.TransportError as exc:
+                if attempt >= self.max_retries:
+                    raise
+
+                delay: float = self.get_retry_delay(attempt)
+                log.warning(
+                    f"({type(exc)}) Error sending {description}, retrying in {delay:.1f}s [attempt {attempt + 1}/{self.max_retries}]. Details: {exc}"
+                )
+                self.block(delay)
+
+                continue
+
+            self.update(res)
+
+            if not self.should_retry(res) or attempt >= self.max_retries:
+                return res
+
+            delay: float = self.get_retry_delay(attempt, res)
+            log.warning(
+                f"[{res.status_code}: {res.reason_phrase}] Rate limited or failed {description}, retrying in {delay:.1f}s [attempt {attempt + 1}/{self.max_retries}]"
+            )
+            self.block(delay)
+
+        return res
@@ -0,0 +1,313 @@
+from __future__ import annotations
+
+from collections import deque
+import typing as t
+
+from ._checkpoint import PaginationCheckpointStore, get_checkpoint_key
+
+import httpx
+from loguru import logger as log
+
+__all__ = [
+    "build_star_params",
+    "get_star_page_urls",
+    "get_link_url",
+    "StarPageProgress",
+    "OrderedPageWindow",
+]
+
+T = t.TypeVar("T")
+
+
+def build_star_params(
+    results_per_page: int = 30,
+    sort_by: str = "created",
+    sort_direction: str = "desc",
+    max_concurrency: int = 4,
+) -> dict[str, t.Any]:
+    """Validate inputs & build the URL params for a `/user/starred` request.
+
+    Params:
+        results_per_page (int): (default: 30) Number of repositories per page, between 1 and 100.
+        sort_by (str): (default: "created") Sort by "created" or "updated".
+        sort_direction (str): (default: "desc") Sort "asc" or "desc".
+        max_concurrency (int): (default: 4) Max number of concurrent page requests.
+
+    Returns:
+        (dict[str, Any]): URL params for the first page of starred repositories.
+
+    Raises:
+        ValueError: When an input is out of range.
+
+    """
+    if results_per_page < 1 or results_per_page > 100:
+        raise ValueError(
+            f"results_per_page must be between 1 and 100. Default is 30. Got [{results_per_page}]"
+        )
+
+    if sort_by not in ["created", "updated"]:
+        raise ValueError(f"sort_by must be 'created' or 'updated'. Got [{sort_by}]")
+
+    if sort_direction not in ["asc", "desc"]:
+        raise ValueError(
+            f"sort_direction must be 'asc' or 'desc'. Got [{sort_direction}]"
+        )
+
+    if max_concurrency < 1:
+        raise ValueError(f"max_concurrency must be at least 1. Got [{max_concurrency}]")
+
+    params = {
+        "sort": sort_by,
+        "direction": sort_direction,
+        "per_page": results_per_page,
+    }
+
+    return params
+
+
+def get_star_page_urls(last_page_url: str) -> list[str]:
+    """Build the URL of every page after the first from the `rel="last"` link.
+
+    Params:
+        last_page_url (str): The URL from the response's `rel="last"` Link header.
+
+    Returns:
+        (list[str]): URLs for pages 2 through the last page, in order.
+
+    """
+    last_url: httpx.URL = httpx.URL(last_page_url)
+    last_page: int = int(last_url.params.get("page", 1))
+
+    return [
+        str(last_url.copy_set_param("page", page)) for page in range(2, last_page + 1)
+    ]
+
+
+def get_link_url(res: httpx.Response, rel: str) -> str | None:
+    """Get a URL from a response's Link header, i.e. the `rel="next"` page.
+
+    Params:
+        res (httpx.Response): The response.
+        rel (str): The link relation, i.e. "next" or "last".
+
+    Returns:
+        (str | None): The link's URL, or `None` if the response has no link with that relation.
+
+    """
+    return res.links.get(rel, {}).get("url")
+
+
+class StarPageProgress:
+    """Track progress through the pages of a `/user/starred` request, & its checkpoint.
+
+    Description:
+        Holds the paging & checkpoint logic shared by `GithubAPIController.iter_user_stars()` and
+        `AsyncGithubAPIController.iter_user_stars()`. The controllers only send requests & yield pages.
+
+        Methods that read or write the checkpoint store are blocking, the async controller calls them
+        with `asyncio.to_thread()`. Without a checkpoint store, they only update the progress.
+
+    Params:
+        checkpoint_store (PaginationCheckpointStore | None): Store to save completed pages to. When `None`,
+            progress is not saved.
+        checkpoint_key (str | None): The key the request's checkpoint is saved under.
+
+    """
+
+    def __init__(
+        self,
+        checkpoint_store: PaginationCheckpointStore | None = None,
+        checkpoint_key: str | None = None,
+    ):
+        self.checkpoint_store: PaginationCheckpointStore | None = checkpoint_store
+        self.checkpoint_key: str | None = checkpoint_key
+
+        self.completed_pages: int = 0
+        self.next_url: str | None = None
+        self.last_url: str | None = None
+
+    @classmethod
+    def for_request(
+        cls, checkpoint: bool, api_token: str, url: str, params: dict[str, t.Any]
+    ) -> StarPageProgress:
+        """Create the progress of a request, opening a checkpoint store when `checkpoint=True`.
+
+        Params:
+            checkpoint (bool): Save completed pages to disk.
+            api_token (str): The API token, part of the checkpoint key so accounts do not share checkpoints.
+            url (str): The URL of the first page.
+            params (dict): URL params of the first page.
+
+        Returns:
+            (StarPageProgress): The request's progress, starting before the first page.
+
+        """
+        if not checkpoint:
+            return cls()
+
+        return cls(
+            checkpoint_store=PaginationCheckpointStore(),
+            checkpoint_key=get_checkpoint_key(api_token, url, params),
+        )
+
+    def resume(self, max_age: int | None = None) -> bool:
+        """Load the progress of a previous run from its checkpoint.
+
+        Params:
+            max_age (int | None): Max age, in seconds, of a checkpoint to resume from.
+
+        Returns:
+            (bool): `True` if there was a checkpoint to resume from.
+
+        """
+        if self.checkpoint_store is None:
+            return False
+
+        saved_checkpoint: dict[str, t.Any] | None = (
+            self.checkpoint_store.get_checkpoint(self.checkpoint_key, max_age=max_age)
+        )
+        if saved_checkpoint is None:
+            return False
+
+        log.info(
+            f"Resuming from checkpoint after page [{saved_checkpoint['page_count']}]"
+        )
+        self.completed_pages = saved_checkpoint["page_count"]
+        self.next_url = saved_checkpoint["next_url"]
+        self.last_url = saved_checkpoint["last_url"]
+
+        return True
+
+    def get_saved_page(self, page: int) -> list[dict[str, t.Any]]:
+        """Get a page completed before resuming from the checkpoint.
+
+        Params:
+            page (int): The page number, starting at 1.
+
+        Returns:
+            (list[dict]): The decoded page.
+
+        """
+        return self.checkpoint_store.get_page(self.checkpoint_key, page)
+
+    def response_page_done(self, res: httpx.Response, page_data: list[dict]) -> None:
+        """Record a page requested by following links, using the `rel="next"` & `rel="last"` links of its response.
+
+        Params:
+            res (httpx.Response): The page's response.
+            page_data (list[dict]): The decoded page.
+
+        """
+        log.debug(f"Next page links: {res.links}")
+
+        ## The last page does not link to itself, keep the URL from an earlier page
+        self.last_url = get_link_url(res, "last") or self.last_url
+        self.page_done(page_data, next_url=get_link_url(res, "next"))
+
+    def page_done(self, page_data: list[dict], next_url: str | None) -> None:
+        """Record a completed page & save it to the checkpoint.
+
+        Params:
+            page_data (list[dict]): The decoded page.
+            next_url (str | None): URL of the next page to request, or `None` if this was the last page.
+
+        """
+        self.completed_pages += 1
+        self.next_url = next_url
+
+        if self.checkpoint_store:
+            self.checkpoint_store.save_page(
+                self.checkpoint_key,
+                page=self.completed_pages,
+                data=page_data,
+                next_url=self.next_url,
+                last_url=self.last_url,
+            )
+
+    def get_remaining_page_urls(self) -> list[str]:
+        """Build the URL of every page that has not been completed, from the `rel="last"` link.
+
+        Returns:
+            (list[str]): URLs of the remaining pages, in order. Empty when there is only 1 page.
+
+        """
+        if not (self.last_url and self.next_url):
+            return []
+
+        ## Skip pages that were completed before resuming from a checkpoint
+        return get_star_page_urls(self.last_url)[self.completed_pages - 1 :]
+
+    def clear(self) -> None:
+        """Delete the checkpoint, i.e. once the last page has been yielded."""
+        if self.checkpoint_store:
+            self.checkpoint_store.clear(self.checkpoint_key)
+
+    def close(self) -> None:
+        if self.checkpoint_store:
+            self.checkpoint_store.close()
+
+
+class OrderedPageWindow(t.Generic[T]):
+    """Keep a window of at most `max_concurrency` page requests in flight, and hand them back in page order.
+
+    Description:
+        `submit` starts the request for a page URL & returns a handle to wait on, i.e. a `Future` or an
+        `asyncio.Task`. Call `pop()` to get the oldest request, wait for it, then call `submit_next()`,
+        so completed pages do not pile up in memory ahead of a slow consumer.
+
+    Params:
+        page_urls (list[str]): URLs of the pages to request, in order.
+        submit (Callable[[str], T]): Start the request for a page URL.
+        max_concurrency (int): Max number of requests in flight.
+
+    """
+
+    def __init__(
+        self,
+        page_urls: list[str],
+        submit: t.Callable[[str], T],
+        max_concurrency: int,
+    ):
+        self.submit: t.Callable[[str], T] = submit
+        self.pending: deque[tuple[T, str | None]] = deque()
+
+        ## Pair each page with the URL of the page after it, to save to the checkpoint
+        self._pages: t.Iterator[tuple[str, str | None]] = zip(
+            page_urls, [*page_urls[1:], None]
+        )
+
+        for _ in range(max_concurrency):
+            self.submit_next()
+
+    def __bool__(self) -> bool:
+        return bool(self.pending)
+
+    def submit_next(self) -> None:
+        page: tuple[str, str | None] | None = next(self._pages, None)
+        if page is not None:
+            page_url, next_url = page
+            self.pending.append((self.submit(page_url), next_url))
+
+    def pop(self) -> tuple[T, str | None]:
+        """Get the oldest request in flight.
+
+        Returns:
+            (tuple[T, str | None]): The request, and the URL of the page after it.
+
+        """
+        return self.pending.popleft()
+
+    def cancel(self) -> list[T]:
+        """Cancel requests for pages that will not be consumed.
+
+        Returns:
+            (list[T]): The cancelled requests.
+
+        """
+        cancelled: list[T] = [request for request, _ in self.pending]
+        for request in cancelled:
+            request.cancel()
+
+        self.pending.clear()
+
+        return cancelled
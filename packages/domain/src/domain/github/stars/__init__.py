@@ -1,20 +1,31 @@
 from __future__ import annotations
 
-from . import converters
+from . import converters, search
 from .models import (
     GithubRepositoryOwnerModel,
+    GithubRepoTopicModel,
     GithubStarredRepositoryModel,
+    GithubStarsAPIResponseBodyModel,
     GithubStarsAPIResponseModel,
 )
 from .repository import (
+    STARRED_REPO_FIELDS,
+    STARRED_REPO_SORT_COLUMNS,
     GithubStarredRepositoryDBRepository,
     GithubStarsAPIResponseRepository,
+    get_model_row,
+    get_sort_key,
 )
 from .schemas import (
+    BatchValidationResult,
     GithubRepositoryOwnerIn,
     GithubRepositoryOwnerOut,
     GithubStarredRepoIn,
     GithubStarredRepoOut,
     GithubStarsAPIResponseIn,
     GithubStarsAPIResponseOut,
+    InvalidItem,
+    validate_batch,
+    validate_repository_owners,
+    validate_starred_repos,
 )
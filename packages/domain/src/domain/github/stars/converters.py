@@ -1,10 +1,16 @@
 from __future__ import annotations
 
+from datetime import datetime, timezone
+from functools import lru_cache
+import hashlib
 import json
+import typing as t
+import zlib
 
 from .models import (
     GithubRepositoryOwnerModel,
     GithubStarredRepositoryModel,
+    GithubStarsAPIResponseBodyModel,
     GithubStarsAPIResponseModel,
 )
 from .schemas import (
@@ -19,6 +25,7 @@ from .schemas import (
 import db_lib
 from depends import db_depends
 from loguru import logger as log
+from pydantic import BaseModel
 import settings
 
 
@@ -35,13 +42,145 @@ def convert_github_stars_api_response_schema_to_db_model(
 def convert_github_stars_api_response_db_model_to_schema(
     api_response_model: GithubStarsAPIResponseModel,
 ) -> GithubStarsAPIResponseOut:
-    api_response: GithubStarsAPIResponseOut = GithubStarsAPIResponseOut.model_validate(
-        api_response_model.__dict__
+    json_data: list[dict] | None = api_response_model.json_data
+    if json_data is None and api_response_model.body is not None:
+        json_data = decode_api_response_body(api_response_model.body)
+
+    api_response: GithubStarsAPIResponseOut = GithubStarsAPIResponseOut(
+        id=api_response_model.id,
+        json_data=json_data or [],
+        created_at=api_response_model.created_at,
+        updated_at=api_response_model.updated_at,
     )
 
     return api_response
 
 
+def encode_api_response_page(
+    starred_repos: list[dict], compression_level: int = 6
+) -> tuple[str, bytes, int]:
+    """Serialize a page of starred repositories for content-addressed storage.
+
+    Description:
+        The page is dumped to canonical JSON, with sorted keys & no whitespace, so identical pages always
+        have the same hash no matter the order the API returned fields in. The hash is computed from the
+        uncompressed JSON, & the body is compressed with zlib.
+
+    Params:
+        starred_repos (list[dict]): A page of starred repositories from the Github API.
+        compression_level (int): (default: 6) zlib compression level, from 1 (fastest) to 9 (smallest).
+
+    Returns:
+        (tuple[str, bytes, int]): The sha256 hex digest of the JSON, the compressed JSON, & the size of the
+            uncompressed JSON in bytes.
+
+    """
+    data: bytes = json.dumps(
+        starred_repos, sort_keys=True, separators=(",", ":")
+    ).encode("utf-8")
+
+    return (
+        hashlib.sha256(data).hexdigest(),
+        zlib.compress(data, compression_level),
+        len(data),
+    )
+
+
+def decode_api_response_body(body: GithubStarsAPIResponseBodyModel) -> list[dict]:
+    """Decompress & parse a stored page of starred repositories.
+
+    Raises:
+        ValueError: When the body was stored with an unsupported compression.
+
+    """
+    if body.compression != "zlib":
+        raise ValueError(
+            f"Unsupported API response body compression: '{body.compression}'"
+        )
+
+    return json.loads(zlib.decompress(body.body))
+
+
+def to_utc_timestamp(value: datetime | None) -> datetime | None:
+    """Convert a datetime to a naive UTC datetime for a `TIMESTAMP` column.
+
+    Description:
+        `TIMESTAMP` columns have no time zone. Postgres would shift an aware datetime to the session's time
+        zone before dropping it, so Github's timestamps are always stored as UTC. Naive values are assumed
+        to already be in UTC.
+
+    Params:
+        value (datetime | None): The datetime to convert.
+
+    Returns:
+        (datetime | None): The datetime in UTC without `tzinfo`, or `None`.
+
+    """
+    if value is None or value.tzinfo is None:
+        return value
+
+    return value.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+def get_github_starred_repo_topics(starred_repo: GithubStarredRepoIn) -> list[str]:
+    """Return a starred repository's topics as a list without duplicates, for the `gh_repo_topic` table.
+
+    Description:
+        Topics that were serialized to a JSON string, like the old `topics` column, are parsed back to a list.
+
+    Params:
+        starred_repo (GithubStarredRepoIn): A validated starred repository.
+
+    Returns:
+        (list[str]): The repository's topics, in their original order.
+
+    """
+    topics: list[str] | str | None = starred_repo.topics
+    if not topics:
+        return []
+    if isinstance(topics, str):
+        topics = json.loads(topics)
+
+    return list(dict.fromkeys(topics))
+
+
+## Fields left out of a starred repository's content hash. The owner is saved to its own table. The GraphQL
+#  API does not return `has_pages`, `has_downloads` or a license's API `url`, so `convert_graphql_starred_repo()`
+#  fills them with defaults. Hashing them would make a repository look changed whenever it is synced with the
+#  other API.
+CONTENT_HASH_EXCLUDE_FIELDS: dict[str, t.Any] = {
+    "owner": True,
+    "has_pages": True,
+    "has_downloads": True,
+    "license": {"url"},
+}
+
+
+def get_github_starred_repo_content_hash(starred_repo: GithubStarredRepoIn) -> str:
+    """Return a hash of a starred repository's normalized content.
+
+    Description:
+        Hashes every field of the validated schema except the fields in `CONTENT_HASH_EXCLUDE_FIELDS`, so the
+        REST & GraphQL APIs produce the same hash for an unchanged repository. The owner's ID is included, so a transferred repository gets a new hash. Keys are sorted, so the hash
+        does not depend on the order fields are returned in by the API.
+
+    Params:
+        starred_repo (GithubStarredRepoIn): A validated starred repository.
+
+    Returns:
+        (str): A sha256 hex digest of the repository's content.
+
+    """
+    content: dict = starred_repo.model_dump(
+        mode="json", exclude=CONTENT_HASH_EXCLUDE_FIELDS
+    )
+    content["owner_id"] = starred_repo.owner.id if starred_repo.owner else None
+
+    return hashlib.sha256(
+        json.dumps(content, sort_keys=True, separators=(",", ":")).encode("utf-8")
+    ).hexdigest()
+
+
 def convert_github_starred_repo_schema_to_db_model(
     starred_repo: GithubStarredRepoIn,
 ) -> GithubStarredRepositoryModel:
@@ -52,6 +191,7 @@ def convert_github_starred_repo_schema_to_db_model(
         description=starred_repo.description,
         html_url=starred_repo.html_url,
         stargazers_count=starred_repo.stargazers_count,
+        watchers_count=starred_repo.watchers_count,
         language=starred_repo.language,
         private=starred_repo.private,
         fork=starred_repo.fork,
@@ -92,39 +232,137 @@ def convert_github_starred_repo_schema_to_db_model(
         labels_url=starred_repo.labels_url,
         releases_url=starred_repo.releases_url,
         deployments_url=starred_repo.deployments_url,
-        created_at=starred_repo.created_at,
-        updated_at=starred_repo.updated_at,
-        pushed_at=starred_repo.pushed_at,
+        gh_created_at=to_utc_timestamp(starred_repo.created_at),
+        gh_updated_at=to_utc_timestamp(starred_repo.updated_at),
+        gh_pushed_at=to_utc_timestamp(starred_repo.pushed_at),
         git_url=starred_repo.git_url,
         has_issues=starred_repo.has_issues,
+        has_projects=starred_repo.has_projects,
+        has_downloads=starred_repo.has_downloads,
+        has_wiki=starred_repo.has_wiki,
+        has_pages=starred_repo.has_pages,
+        has_discussions=starred_repo.has_discussions,
         ssh_url=starred_repo.ssh_url,
         clone_url=starred_repo.clone_url,
         svn_url=starred_repo.svn_url,
         homepage=starred_repo.homepage,
         size=starred_repo.size,
         forks_count=starred_repo.forks_count,
+        mirror_url=starred_repo.mirror_url,
+        archived=starred_repo.archived,
+        disabled=starred_repo.disabled,
         open_issues_count=starred_repo.open_issues_count,
         license=starred_repo.license,
         allow_forking=starred_repo.allow_forking,
         is_template=starred_repo.is_template,
         web_commit_signoff_required=starred_repo.web_commit_signoff_required,
-        topics=json.dumps(starred_repo.topics),
+        topics=get_github_starred_repo_topics(starred_repo),
         visibility=starred_repo.visibility,
         forks=starred_repo.forks,
         open_issues=starred_repo.open_issues,
         watchers=starred_repo.watchers,
         default_branch=starred_repo.default_branch,
         permissions=starred_repo.permissions,
+        content_hash=get_github_starred_repo_content_hash(starred_repo),
     )
 
     return starred_repo_model
 
 
+@lru_cache(maxsize=None)
+def get_row_columns(
+    model: type[db_lib.base.Base], schema: type[BaseModel]
+) -> tuple[tuple[str, t.Any], ...]:
+    """Return the columns of a model's table that are copied from a schema field with the same name.
+
+    Description:
+        Generated from the table's column list, so new columns are picked up by the row converters without
+        listing them by hand. Columns with a `server_default`, like a row's `created_at`, are filled in by
+        the database & left out. Computed once per model & schema.
+
+    Params:
+        model (type[db_lib.base.Base]): The ORM model whose table the rows are for.
+        schema (type[BaseModel]): The Pydantic schema the values are read from.
+
+    Returns:
+        (tuple[tuple[str, Any], ...]): Each column's name, & its scalar Python-side default or `None`.
+
+    """
+    return tuple(
+        (
+            column.name,
+            column.default.arg
+            if column.default is not None and column.default.is_scalar
+            else None,
+        )
+        for column in model.__table__.columns
+        if column.name in schema.model_fields and column.server_default is None
+    )
+
+
+def convert_schema_to_db_row(
+    model: type[db_lib.base.Base], schema_instance: BaseModel
+) -> dict[str, t.Any]:
+    """Copy a schema's values into a dict of column values for a model's table, without building an ORM instance.
+
+    Description:
+        Unset values are replaced with the column's scalar default, like `repository.get_model_row()`.
+        Columns without a matching schema field are left out, the caller adds them.
+
+    Params:
+        model (type[db_lib.base.Base]): The ORM model whose table the row is for.
+        schema_instance (BaseModel): A validated schema.
+
+    Returns:
+        (dict[str, Any]): Column values keyed by column name, for a Core `insert()` or `executemany`.
+
+    """
+    values: dict[str, t.Any] = schema_instance.__dict__
+    row: dict[str, t.Any] = {}
+
+    for column_name, default in get_row_columns(model, type(schema_instance)):
+        value: t.Any = values[column_name]
+        row[column_name] = default if value is None else value
+
+    return row
+
+
+def convert_github_starred_repo_schema_to_db_row(
+    starred_repo: GithubStarredRepoIn,
+) -> dict[str, t.Any]:
+    """Convert a starred repository schema to a dict of `gh_starred_repo` column values.
+
+    Description:
+        Produces the same values as `convert_github_starred_repo_schema_to_db_model()`, without the cost of
+        an ORM instance. Use it for bulk writes with `bulk_upsert_rows()` & `bulk_update_rows()`.
+
+        The row's `topics` is a list of strings, not a column. The bulk writers save it to `gh_repo_topic`.
+
+    Params:
+        starred_repo (GithubStarredRepoIn): A validated starred repository.
+
+    Returns:
+        (dict[str, Any]): Column values keyed by column name.
+
+    """
+    row: dict[str, t.Any] = convert_schema_to_db_row(
+        GithubStarredRepositoryModel, starred_repo
+    )
+    row["gh_created_at"] = to_utc_timestamp(starred_repo.created_at)
+    row["gh_updated_at"] = to_utc_timestamp(starred_repo.updated_at)
+    row["gh_pushed_at"] = to_utc_timestamp(starred_repo.pushed_at)
+    row["topics"] = get_github_starred_repo_topics(starred_repo)
+    row["owner_id"] = starred_repo.owner.id if starred_repo.owner else None
+    row["content_hash"] = get_github_starred_repo_content_hash(starred_repo)
+
+    return row
+
+
 def convert_github_starred_repo_db_model_to_schema(
     starred_repo_model: GithubStarredRepositoryModel,
 ) -> GithubStarredRepoOut:
     starred_repo: GithubStarredRepoOut = GithubStarredRepoOut.model_validate(
-        starred_repo_model.__dict__
+        {**starred_repo_model.__dict__, "topics": list(starred_repo_model.topics)}
     )
     if starred_repo_model.repo_id is None:
         starred_repo.repo_id = starred_repo_model.repo_id
@@ -132,6 +370,31 @@ def convert_github_starred_repo_db_model_to_schema(
     return starred_repo
 
 
+def convert_github_starred_repo_db_model_to_dict(
+    starred_repo_model: GithubStarredRepositoryModel, fields: t.Sequence[str]
+) -> dict[str, t.Any]:
+    """Return only the requested fields of a repository, for a sparse fieldset response.
+
+    Description:
+        Only reads the attributes in `fields`, so a model loaded with `load_only()` does not lazy load
+        the columns that were left out. The values are not validated with `GithubStarredRepoOut`.
+
+    Params:
+        starred_repo_model (GithubStarredRepositoryModel): The repository, loaded with at least `fields`.
+        fields (Sequence[str]): Fields of `GithubStarredRepoOut`, in the order they are returned.
+
+    Returns:
+        (dict[str, Any]): The repository's value for each field.
+
+    """
+    return {
+        field: list(starred_repo_model.topics)
+        if field == "topics"
+        else getattr(starred_repo_model, field)
+        for field in fields
+    }
+
+
 def convert_github_repository_owner_schema_to_db_model(
     owner: GithubRepositoryOwnerIn,
 ) -> GithubRepositoryOwnerModel:
@@ -153,12 +416,20 @@ def convert_github_repository_owner_schema_to_db_model(
         events_url=owner.events_url,
         received_events_url=owner.received_events_url,
         type=owner.type,
+        user_view_type=owner.user_view_type,
         site_admin=owner.site_admin,
     )
 
     return owner_model
 
 
+def convert_github_repository_owner_schema_to_db_row(
+    owner: GithubRepositoryOwnerIn,
+) -> dict[str, t.Any]:
+    """Convert a repository owner schema to a dict of `gh_repo_owner` column values, without an ORM instance."""
+    return convert_schema_to_db_row(GithubRepositoryOwnerModel, owner)
+
+
 def convert_github_repository_owner_db_model_to_schema(
     owner_model: GithubRepositoryOwnerModel,
 ) -> GithubRepositoryOwnerOut:
@@ -7,16 +7,48 @@ import db_lib
 from depends import db_depends
 import sqlalchemy as sa
 import sqlalchemy.exc as sa_exc
+from sqlalchemy.ext.associationproxy import AssociationProxy, association_proxy
 import sqlalchemy.orm as so
 from sqlalchemy.types import JSON
 
 
+## A compressed page of starred repositories, stored once per distinct content
+class GithubStarsAPIResponseBodyModel(db_lib.base.Base):
+    __tablename__ = "gh_stars_api_response_body"
+
+    ## sha256 of the page's canonical JSON, identical pages share a body
+    content_hash: so.Mapped[str] = so.mapped_column(sa.String(64), primary_key=True)
+    compression: so.Mapped[str] = so.mapped_column(
+        sa.String(16), nullable=False, default="zlib"
+    )
+    body: so.Mapped[bytes] = so.mapped_column(sa.LargeBinary, nullable=False)
+    ## Size of the uncompressed JSON, in bytes
+    size: so.Mapped[int] = so.mapped_column(sa.Integer, nullable=False)
+
+    created_at: so.Mapped[datetime] = so.mapped_column(
+        sa.TIMESTAMP, server_default=sa.func.now()
+    )
+
+
 class GithubStarsAPIResponseModel(db_lib.base.Base):
     __tablename__ = "gh_stars_api_response"
 
     id: so.Mapped[db_lib.annotated.INT_PK]
 
-    json_data: so.Mapped[list[dict]] = so.mapped_column(JSON, nullable=False)
+    ## Only set on responses saved before bodies were stored in gh_stars_api_response_body
+    json_data: so.Mapped[list[dict] | None] = so.mapped_column(JSON, nullable=True)
+
+    ## Pages saved by the same sync share a snapshot_id
+    snapshot_id: so.Mapped[str | None] = so.mapped_column(
+        sa.String(36), nullable=True, index=True
+    )
+    page: so.Mapped[int | None] = so.mapped_column(sa.Integer, nullable=True)
+    content_hash: so.Mapped[str | None] = so.mapped_column(
+        sa.String(64),
+        sa.ForeignKey("gh_stars_api_response_body.content_hash"),
+        nullable=True,
+        index=True,
+    )
 
     created_at: so.Mapped[datetime] = so.mapped_column(
         sa.TIMESTAMP, server_default=sa.func.now(), index=True
@@ -25,10 +57,21 @@ class GithubStarsAPIResponseModel(db_lib.base.Base):
         sa.TIMESTAMP, server_default=sa.func.now(), onupdate=sa.func.now(), index=True
     )
 
+    body: so.Mapped["GithubStarsAPIResponseBodyModel | None"] = so.relationship()
+
 
 class GithubStarredRepositoryModel(db_lib.base.Base):
     __tablename__ = "gh_starred_repo"
-    __table_args__ = (sa.UniqueConstraint("node_id", "name", "url"),)
+    __table_args__ = (
+        sa.UniqueConstraint("node_id", "name", "url"),
+        ## Serves "most starred repositories in language X" pages in index order, without sorting the language
+        sa.Index(
+            "ix_gh_starred_repo_language_stargazers_count",
+            "language",
+            "stargazers_count",
+            "repo_id",
+        ),
+    )
 
     # id: so.Mapped[db_lib.annotated.INT_PK]
 
@@ -48,7 +91,8 @@ class GithubStarredRepositoryModel(db_lib.base.Base):
         index=True,
     )
 
-    id: so.Mapped[int] = so.mapped_column(sa.NUMERIC, nullable=False, default=0)
+    ## Github's repository ID, past the 32-bit range on newer repositories
+    id: so.Mapped[int] = so.mapped_column(sa.BigInteger, nullable=False, default=0)
     node_id: so.Mapped[str] = so.mapped_column(sa.TEXT, nullable=False)
     name: so.Mapped[str] = so.mapped_column(sa.TEXT, nullable=False, index=True)
     private: so.Mapped[bool] = so.mapped_column(
@@ -94,22 +138,30 @@ class GithubStarredRepositoryModel(db_lib.base.Base):
     labels_url: so.Mapped[str] = so.mapped_column(sa.TEXT, nullable=False)
     releases_url: so.Mapped[str] = so.mapped_column(sa.TEXT, nullable=False)
     deployments_url: so.Mapped[str] = so.mapped_column(sa.TEXT, nullable=False)
-    created_at: so.Mapped[str] = so.mapped_column(sa.TEXT, nullable=False)
-    updated_at: so.Mapped[str] = so.mapped_column(sa.TEXT, nullable=False)
-    pushed_at: so.Mapped[str] = so.mapped_column(sa.TEXT, nullable=False)
+    ## Github's created_at, updated_at & pushed_at, in UTC. Prefixed so they do not collide with the
+    #  row's own created_at & updated_at
+    gh_created_at: so.Mapped[datetime] = so.mapped_column(
+        sa.TIMESTAMP, nullable=False, index=True
+    )
+    gh_updated_at: so.Mapped[datetime] = so.mapped_column(
+        sa.TIMESTAMP, nullable=False, index=True
+    )
+    gh_pushed_at: so.Mapped[datetime | None] = so.mapped_column(
+        sa.TIMESTAMP, nullable=True, index=True
+    )
     git_url: so.Mapped[str] = so.mapped_column(sa.TEXT, nullable=False)
     ssh_url: so.Mapped[str] = so.mapped_column(sa.TEXT, nullable=False)
     clone_url: so.Mapped[str] = so.mapped_column(sa.TEXT, nullable=False)
     svn_url: so.Mapped[str] = so.mapped_column(sa.TEXT, nullable=False)
     homepage: so.Mapped[str] = so.mapped_column(sa.TEXT, nullable=True, default=None)
     size: so.Mapped[int] = so.mapped_column(
-        sa.NUMERIC, nullable=False, default=0, index=True
+        sa.Integer, nullable=False, default=0, index=True
     )
     stargazers_count: so.Mapped[int] = so.mapped_column(
-        sa.NUMERIC, nullable=False, default=0, index=True
+        sa.Integer, nullable=False, default=0, index=True
     )
     watchers_count: so.Mapped[int] = so.mapped_column(
-        sa.NUMERIC, nullable=False, default=0, index=True
+        sa.Integer, nullable=False, default=0, index=True
     )
     language: so.Mapped[str] = so.mapped_column(sa.TEXT, nullable=True, index=True)
     has_issues: so.Mapped[bool] = so.mapped_column(
@@ -131,7 +183,7 @@ class GithubStarredRepositoryModel(db_lib.base.Base):
         sa.BOOLEAN, nullable=True, default=False
     )
     forks_count: so.Mapped[int] = so.mapped_column(
-        sa.NUMERIC, nullable=False, default=0, index=True
+        sa.Integer, nullable=False, default=0, index=True
     )
     mirror_url: so.Mapped[str] = so.mapped_column(sa.TEXT, nullable=True, default=None)
     archived: so.Mapped[bool] = so.mapped_column(
@@ -141,7 +193,7 @@ class GithubStarredRepositoryModel(db_lib.base.Base):
         sa.BOOLEAN, nullable=True, default=False, index=True
     )
     open_issues_count: so.Mapped[int] = so.mapped_column(
-        sa.NUMERIC, nullable=False, default=0, index=True
+        sa.Integer, nullable=False, default=0, index=True
     )
     license: so.Mapped[dict] = so.mapped_column(JSON, nullable=True, index=True)
     allow_forking: so.Mapped[bool] = so.mapped_column(
@@ -153,32 +205,63 @@ class GithubStarredRepositoryModel(db_lib.base.Base):
     web_commit_signoff_required: so.Mapped[bool] = so.mapped_column(
         sa.BOOLEAN, nullable=True, default=False
     )
-    ## Storing a list of strings as JSON for cross-database support
-    topics: so.Mapped[list[str]] = so.mapped_column(
-        ## Store as TEXT in SQLite, JSON elsewhere
-        sa.JSON().with_variant(sa.Text, "sqlite"),
-        index=True,
-    )
     visibility: so.Mapped[str] = so.mapped_column(sa.TEXT, nullable=False, index=True)
     forks: so.Mapped[int] = so.mapped_column(
-        sa.NUMERIC, nullable=False, default=0, index=True
+        sa.Integer, nullable=False, default=0, index=True
     )
     open_issues: so.Mapped[int] = so.mapped_column(
-        sa.NUMERIC, nullable=False, default=0, index=True
+        sa.Integer, nullable=False, default=0, index=True
     )
     watchers: so.Mapped[int] = so.mapped_column(
-        sa.NUMERIC, nullable=False, default=0, index=True
+        sa.Integer, nullable=False, default=0, index=True
     )
     default_branch: so.Mapped[str] = so.mapped_column(
         sa.TEXT, nullable=False, index=True
     )
     permissions: so.Mapped[dict] = so.mapped_column(JSON, nullable=False)
+    ## sha256 of the normalized API payload, compared on sync to skip unchanged repositories
+    content_hash: so.Mapped[str | None] = so.mapped_column(
+        sa.String(64), nullable=True, default=None
+    )
 
     ## Relationship: Each repository has one owner
     owner: so.Mapped["GithubRepositoryOwnerModel"] = so.relationship(
         "GithubRepositoryOwnerModel", back_populates="repositories"
     )
 
+    ## Relationship: Each repository has many topics, loaded with one query per batch of repositories
+    repo_topics: so.Mapped[list["GithubRepoTopicModel"]] = so.relationship(
+        "GithubRepoTopicModel",
+        back_populates="repository",
+        cascade="all, delete-orphan",
+        lazy="selectin",
+        order_by="GithubRepoTopicModel.topic",
+    )
+    ## The repository's topics as a list of strings, i.e. `repo.topics = ["cli", "python"]`
+    topics: AssociationProxy[list[str]] = association_proxy(
+        "repo_topics",
+        "topic",
+        creator=lambda topic: GithubRepoTopicModel(topic=topic),
+    )
+
+
+## One row per topic of a starred repository, so repositories can be looked up & counted by topic
+class GithubRepoTopicModel(db_lib.base.Base):
+    __tablename__ = "gh_repo_topic"
+    ## Covers "repositories tagged X" lookups & topic counts without reading the table
+    __table_args__ = (sa.Index("ix_gh_repo_topic_topic", "topic", "repo_id"),)
+
+    repo_id: so.Mapped[int] = so.mapped_column(
+        sa.Integer,
+        sa.ForeignKey("gh_starred_repo.repo_id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    topic: so.Mapped[str] = so.mapped_column(sa.String(255), primary_key=True)
+
+    repository: so.Mapped["GithubStarredRepositoryModel"] = so.relationship(
+        "GithubStarredRepositoryModel", back_populates="repo_topics"
+    )
+
 
 class GithubRepositoryOwnerModel(db_lib.base.Base):
     __tablename__ = "gh_repo_owner"
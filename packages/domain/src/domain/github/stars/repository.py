@@ -1,19 +1,276 @@
 from __future__ import annotations
 
+from datetime import datetime
 import typing as t
 
+from .converters import decode_api_response_body, encode_api_response_page
 from .models import (
     GithubRepositoryOwnerModel,
+    GithubRepoTopicModel,
     GithubStarredRepositoryModel,
+    GithubStarsAPIResponseBodyModel,
     GithubStarsAPIResponseModel,
 )
+from .schemas import GithubStarredRepoOut
+from .search import build_search_stmt
 
 import db_lib
 from loguru import logger as log
 import sqlalchemy as sa
+from sqlalchemy.dialects import mysql, postgresql, sqlite
 import sqlalchemy.exc as sa_exc
 import sqlalchemy.orm as so
 
+## Max bound parameters in one statement. SQLite's default limit is 32766, Postgres' is 65535.
+MAX_BIND_PARAMS: int = 32_000
+
+## Columns starred repositories can be sorted by. Each is indexed & NOT NULL, so a page is a seek on its index.
+#  Ties are broken by repo_id in the same direction, the rowid SQLite stores at the end of every index.
+STARRED_REPO_SORT_COLUMNS: dict[str, so.InstrumentedAttribute] = {
+    "repo_id": GithubStarredRepositoryModel.repo_id,
+    "stars": GithubStarredRepositoryModel.stargazers_count,
+    "forks": GithubStarredRepositoryModel.forks_count,
+    "name": GithubStarredRepositoryModel.name,
+    "created": GithubStarredRepositoryModel.gh_created_at,
+    "updated": GithubStarredRepositoryModel.gh_updated_at,
+}
+
+
+def get_model_row(model: db_lib.base.Base) -> dict[str, t.Any]:
+    """Return a dict of a model's column values, keyed by column name, for a Core insert.
+
+    Description:
+        Unset autoincrement primary keys, & unset columns with a `server_default`, are left out so the
+        database assigns them. Unset values for columns with a scalar Python-side `default` are replaced
+        with the default, because defaults are not applied to multi-row `VALUES` statements.
+
+    Params:
+        model (db_lib.base.Base): An ORM model instance.
+
+    Returns:
+        (dict[str, Any]): The model's column values.
+
+    """
+    row: dict[str, t.Any] = {}
+
+    for column_attr in sa.inspect(type(model)).column_attrs:
+        column: sa.Column = column_attr.columns[0]
+        value: t.Any = getattr(model, column_attr.key)
+
+        if value is None:
+            if column.primary_key and column.autoincrement in (True, "auto"):
+                continue
+            if column.server_default is not None:
+                continue
+
+            if column.default is not None and column.default.is_scalar:
+                value = column.default.arg
+
+        row[column.name] = value
+
+    return row
+
+
+def get_upsert_stmt(
+    session: so.Session,
+    table: sa.Table,
+    index_elements: list[str],
+    update_columns: list[str] | None = None,
+) -> sa.Insert:
+    """Build an INSERT that skips or updates rows that already exist.
+
+    Description:
+        Uses `INSERT ... ON CONFLICT` on SQLite & Postgres, and `INSERT ... ON DUPLICATE KEY UPDATE`
+        on MySQL/MariaDB.
+
+        Execute the statement with a list of rows, i.e. `session.execute(stmt, rows)`. SQLAlchemy sends
+        the rows as multi-row `VALUES` batches, and the compiled statement is cached, so it is not
+        recompiled for every batch.
+
+    Params:
+        session (so.Session): The session the statement will be executed with, used to detect the dialect.
+        table (sa.Table): The table to insert into.
+        index_elements (list[str]): Columns of the unique index that identifies an existing row.
+        update_columns (list[str] | None): Columns to overwrite when a row already exists. When `None`,
+            existing rows are left unchanged.
+
+    Returns:
+        (sa.Insert): The dialect-specific insert statement.
+
+    Raises:
+        ValueError: When the session's database dialect does not support upserts.
+
+    """
+    dialect: str = session.get_bind().dialect.name
+
+    if dialect in ("sqlite", "postgresql"):
+        insert: t.Callable = sqlite.insert if dialect == "sqlite" else postgresql.insert
+        stmt = insert(table)
+
+        if not update_columns:
+            return stmt.on_conflict_do_nothing(index_elements=index_elements)
+
+        return stmt.on_conflict_do_update(
+            index_elements=index_elements,
+            set_={col: stmt.excluded[col] for col in update_columns},
+        )
+
+    if dialect in ("mysql", "mariadb"):
+        stmt = mysql.insert(table)
+
+        if not update_columns:
+            ## Assigning a column to itself leaves the existing row unchanged
+            return stmt.on_duplicate_key_update(
+                {col: table.c[col] for col in index_elements}
+            )
+
+        return stmt.on_duplicate_key_update(
+            {col: stmt.inserted[col] for col in update_columns}
+        )
+
+    raise ValueError(f"Bulk upsert is not supported for database dialect '{dialect}'")
+
+
+## Fields of GithubStarredRepoOut a sparse fieldset can request. Each is a column, except topics. The owner
+#  is left out, it is not loaded with the repositories.
+STARRED_REPO_FIELDS: tuple[str, ...] = tuple(
+    field for field in GithubStarredRepoOut.model_fields if field != "owner"
+)
+
+
+def get_field_load_options(
+    fields: t.Sequence[str], sort: str = "repo_id"
+) -> list[so.interfaces.LoaderOption]:
+    """Return loader options that only select the columns of a sparse fieldset.
+
+    Description:
+        The columns are pushed down into the SELECT with `load_only()`. The primary key & the sort columns
+        are always loaded, so the next page's key can be read without another query. Topics are only
+        loaded when they are requested.
+
+    Params:
+        fields (Sequence[str]): Fields in `STARRED_REPO_FIELDS`, i.e. `["name", "html_url"]`.
+        sort (str): (default: "repo_id") The sort the repositories are loaded with.
+
+    Returns:
+        (list[LoaderOption]): Options for `Select.options()`.
+
+    Raises:
+        ValueError: When a field is not in `STARRED_REPO_FIELDS`.
+
+    """
+    invalid_fields: list[str] = [
+        field for field in fields if field not in STARRED_REPO_FIELDS
+    ]
+    if invalid_fields:
+        raise ValueError(
+            f"Invalid fields: {invalid_fields}. Must be in: {list(STARRED_REPO_FIELDS)}"
+        )
+
+    columns: dict[str, so.InstrumentedAttribute] = {
+        field: getattr(GithubStarredRepositoryModel, field)
+        for field in fields
+        if field != "topics"
+    }
+    for column in get_sort_columns(sort):
+        columns.setdefault(column.key, column)
+
+    return [
+        so.load_only(*columns.values()),
+        so.selectinload(GithubStarredRepositoryModel.repo_topics)
+        if "topics" in fields
+        else so.noload(GithubStarredRepositoryModel.repo_topics),
+    ]
+
+
+def get_sort_columns(sort: str) -> list[so.InstrumentedAttribute]:
+    """Return the columns repositories are ordered by for a sort in `STARRED_REPO_SORT_COLUMNS`.
+
+    Raises:
+        ValueError: When `sort` is not in `STARRED_REPO_SORT_COLUMNS`.
+
+    """
+    if sort not in STARRED_REPO_SORT_COLUMNS:
+        raise ValueError(
+            f"Invalid sort '{sort}'. Must be one of: {list(STARRED_REPO_SORT_COLUMNS)}"
+        )
+
+    sort_column: so.InstrumentedAttribute = STARRED_REPO_SORT_COLUMNS[sort]
+    if sort_column is GithubStarredRepositoryModel.repo_id:
+        return [sort_column]
+
+    return [sort_column, GithubStarredRepositoryModel.repo_id]
+
+
+def get_sort_key(repo: GithubStarredRepositoryModel, sort: str) -> list[t.Any]:
+    """Return a repository's values for the columns of a sort, i.e. the `after` key of the next page.
+
+    Params:
+        repo (GithubStarredRepositoryModel): The last repository of a page.
+        sort (str): A sort in `STARRED_REPO_SORT_COLUMNS`.
+
+    Returns:
+        (list[Any]): The repository's sort column values, then its `repo_id`.
+
+    """
+    return [getattr(repo, column.key) for column in get_sort_columns(sort)]
+
+
+def iter_chunks(
+    rows: list[dict[str, t.Any]], chunk_size: int
+) -> t.Generator[list[dict[str, t.Any]], None, None]:
+    """Yield chunks of rows small enough to stay under the database's bound parameter limit."""
+    if not rows:
+        return
+
+    max_rows: int = max(1, MAX_BIND_PARAMS // len(rows[0]))
+    chunk_size = max(1, min(chunk_size, max_rows))
+
+    for start in range(0, len(rows), chunk_size):
+        yield rows[start : start + chunk_size]
+
+
+def split_repo_topics(
+    repo_rows: list[dict[str, t.Any]],
+) -> tuple[list[dict[str, t.Any]], dict[str, list[str]]]:
+    """Take the `topics` key out of repository rows, which is saved to `gh_repo_topic` instead of a column.
+
+    Returns:
+        (tuple[list[dict[str, Any]], dict[str, list[str]]]): Copies of the rows without `topics`, & each
+            repository's topics keyed by `node_id`. The rows are returned as they are when they have no topics.
+
+    """
+    if not repo_rows or "topics" not in repo_rows[0]:
+        return repo_rows, {}
+
+    topics_by_node_id: dict[str, list[str]] = {
+        row["node_id"]: row["topics"] for row in repo_rows
+    }
+    rows: list[dict[str, t.Any]] = [
+        {col: value for col, value in row.items() if col != "topics"}
+        for row in repo_rows
+    ]
+
+    return rows, topics_by_node_id
+
+
+def get_saved_repo_topics(
+    batch: list[dict[str, t.Any]],
+    skipped_rows: list[dict[str, t.Any]],
+    topics_by_node_id: dict[str, list[str]],
+) -> dict[str, list[str]]:
+    """Return the topics of the repositories in a batch that were written, leaving out skipped rows."""
+    if not topics_by_node_id:
+        return {}
+
+    skipped_node_ids: set[str] = {row["node_id"] for row in skipped_rows}
+
+    return {
+        row["node_id"]: topics_by_node_id[row["node_id"]]
+        for row in batch
+        if row["node_id"] not in skipped_node_ids
+    }
+
 
 class GithubStarsAPIResponseRepository(
     db_lib.base.BaseRepository[GithubStarsAPIResponseModel]
@@ -21,6 +278,143 @@ class GithubStarsAPIResponseRepository(
     def __init__(self, session: so.Session):
         super().__init__(session, GithubStarsAPIResponseModel)
 
+    def save_page(
+        self,
+        starred_repos: list[dict],
+        snapshot_id: str,
+        page: int | None = None,
+        compression_level: int = 6,
+    ) -> GithubStarsAPIResponseModel:
+        """Save a page of a raw API response, storing its body once per distinct content.
+
+        Description:
+            The page is stored compressed in `gh_stars_api_response_body`, keyed by the hash of its content.
+            A page identical to one that is already stored, i.e. an unchanged page from an hourly sync, only
+            adds a small `gh_stars_api_response` row pointing at the existing body.
+
+        Params:
+            starred_repos (list[dict]): A page of starred repositories from the Github API.
+            snapshot_id (str): ID shared by every page saved during the same sync.
+            page (int | None): The page's number in the sync.
+            compression_level (int): (default: 6) zlib compression level, from 1 (fastest) to 9 (smallest).
+
+        Returns:
+            (GithubStarsAPIResponseModel): The saved response row.
+
+        """
+        content_hash, body, size = encode_api_response_page(
+            starred_repos, compression_level=compression_level
+        )
+
+        body_stmt: sa.Insert = get_upsert_stmt(
+            self.session,
+            GithubStarsAPIResponseBodyModel.__table__,
+            index_elements=["content_hash"],
+        )
+        api_response: GithubStarsAPIResponseModel = GithubStarsAPIResponseModel(
+            snapshot_id=snapshot_id, page=page, content_hash=content_hash
+        )
+
+        try:
+            self.session.execute(
+                body_stmt,
+                [
+                    {
+                        "content_hash": content_hash,
+                        "compression": "zlib",
+                        "body": body,
+                        "size": size,
+                    }
+                ],
+            )
+            self.session.add(api_response)
+            self.session.commit()
+        except Exception as exc:
+            msg = f"({type(exc)}) Error saving API response page. Details: {exc}"
+            log.error(msg)
+            self.session.rollback()
+
+            raise
+
+        return api_response
+
+    def get_page_data(self, api_response: GithubStarsAPIResponseModel) -> list[dict]:
+        """Return the starred repositories of a saved API response, decompressing its body if needed."""
+        if api_response.content_hash is None:
+            return api_response.json_data or []
+
+        body: GithubStarsAPIResponseBodyModel | None = self.session.get(
+            GithubStarsAPIResponseBodyModel, api_response.content_hash
+        )
+        if body is None:
+            raise ValueError(
+                f"API response body '{api_response.content_hash}' does not exist"
+            )
+
+        return decode_api_response_body(body)
+
+    def prune_snapshots(self, keep: int) -> int:
+        """Delete all but the newest `keep` snapshots, & the bodies no snapshot refers to anymore.
+
+        Params:
+            keep (int): Number of snapshots to keep, newest first.
+
+        Returns:
+            (int): The number of snapshots deleted.
+
+        Raises:
+            ValueError: When `keep` is less than 1.
+
+        """
+        if keep < 1:
+            raise ValueError(f"keep must be at least 1. Got: {keep}")
+
+        response_table: sa.Table = GithubStarsAPIResponseModel.__table__
+        body_table: sa.Table = GithubStarsAPIResponseBodyModel.__table__
+
+        ## Snapshots are ordered by their newest page, IDs increase with insertion order
+        stale_snapshot_ids: list[str] = list(
+            self.session.scalars(
+                sa.select(response_table.c.snapshot_id)
+                .where(response_table.c.snapshot_id.is_not(None))
+                .group_by(response_table.c.snapshot_id)
+                .order_by(sa.func.max(response_table.c.id).desc())
+                .offset(keep)
+            )
+        )
+
+        if not stale_snapshot_ids:
+            return 0
+
+        try:
+            for start in range(0, len(stale_snapshot_ids), 500):
+                self.session.execute(
+                    sa.delete(response_table).where(
+                        response_table.c.snapshot_id.in_(
+                            stale_snapshot_ids[start : start + 500]
+                        )
+                    )
+                )
+
+            self.session.execute(
+                sa.delete(body_table).where(
+                    ~sa.exists().where(
+                        response_table.c.content_hash == body_table.c.content_hash
+                    )
+                )
+            )
+            self.session.commit()
+        except Exception as exc:
+            msg = f"({type(exc)}) Error pruning API response snapshots. Details: {exc}"
+            log.error(msg)
+            self.session.rollback()
+
+            raise
+
+        log.debug(f"Pruned [{len(stale_snapshot_ids)}] API response snapshot(s)")
+
+        return len(stale_snapshot_ids)
+
 
 class GithubStarredRepositoryDBRepository(
     db_lib.base.BaseRepository[GithubStarredRepositoryModel]
@@ -41,6 +435,551 @@ class GithubStarredRepositoryDBRepository(
             .one_or_none()
         )
 
+    def _select_by_node_ids(
+        self,
+        entities: tuple[t.Any, ...],
+        node_ids: t.Iterable[str],
+        chunk_size: int = 500,
+        temp_table_threshold: int = 10_000,
+    ) -> list[sa.Row]:
+        """Select `entities` for every repository with a `node_id` in `node_ids`.
+
+        Description:
+            Up to `temp_table_threshold` IDs are looked up with chunked `WHERE node_id IN (...)` queries.
+            Larger sets are written to a temporary table & joined in a single query, instead of sending
+            thousands of IN lists.
+
+        """
+        node_ids: list[str] = list(dict.fromkeys(node_ids))
+        if not node_ids:
+            return []
+
+        if chunk_size < 1:
+            raise ValueError(f"chunk_size must be at least 1. Got: {chunk_size}")
+
+        if len(node_ids) <= temp_table_threshold:
+            results: list[sa.Row] = []
+
+            for start in range(0, len(node_ids), chunk_size):
+                stmt = sa.select(*entities).where(
+                    GithubStarredRepositoryModel.node_id.in_(
+                        node_ids[start : start + chunk_size]
+                    )
+                )
+                results.extend(self.session.execute(stmt).all())
+
+            return results
+
+        log.debug(f"Looking up [{len(node_ids)}] node IDs with a temporary table")
+
+        tmp_table: sa.Table = sa.Table(
+            "tmp_lookup_node_ids",
+            sa.MetaData(),
+            sa.Column("node_id", sa.TEXT, primary_key=True),
+            prefixes=["TEMPORARY"],
+        )
+        conn: sa.Connection = self.session.connection()
+
+        tmp_table.create(bind=conn, checkfirst=True)
+        try:
+            conn.execute(sa.delete(tmp_table))
+            conn.execute(
+                sa.insert(tmp_table), [{"node_id": node_id} for node_id in node_ids]
+            )
+
+            stmt = sa.select(*entities).join(
+                tmp_table, tmp_table.c.node_id == GithubStarredRepositoryModel.node_id
+            )
+
+            return list(self.session.execute(stmt).all())
+        finally:
+            tmp_table.drop(bind=conn, checkfirst=True)
+
+    def get_by_node_ids(
+        self,
+        node_ids: t.Iterable[str],
+        chunk_size: int = 500,
+        temp_table_threshold: int = 10_000,
+    ) -> dict[str, GithubStarredRepositoryModel]:
+        """Load every repository with a `node_id` in `node_ids`, in one set-based lookup.
+
+        Description:
+            Replaces calling `get_by_node_id()` once per ID. Lookups use chunked `WHERE node_id IN (...)`
+            queries, or a temporary table join when there are more than `temp_table_threshold` IDs.
+
+        Params:
+            node_ids (Iterable[str]): Github node IDs to look up.
+            chunk_size (int): (default: 500) Max number of IDs per IN list.
+            temp_table_threshold (int): (default: 10000) Number of IDs above which a temporary table is used.
+
+        Returns:
+            (dict[str, GithubStarredRepositoryModel]): The repositories that exist, keyed by `node_id`. IDs
+                with no matching repository are left out.
+
+        """
+        rows: list[sa.Row] = self._select_by_node_ids(
+            (GithubStarredRepositoryModel,),
+            node_ids,
+            chunk_size=chunk_size,
+            temp_table_threshold=temp_table_threshold,
+        )
+
+        return {repo.node_id: repo for (repo,) in rows}
+
+    def get_existing_node_ids(
+        self,
+        node_ids: t.Iterable[str],
+        chunk_size: int = 500,
+        temp_table_threshold: int = 10_000,
+    ) -> set[str]:
+        """Return the subset of `node_ids` that already exist in the database.
+
+        Description:
+            Like `get_by_node_ids()`, but only the `node_id` column is selected & no models are loaded.
+
+        Params:
+            node_ids (Iterable[str]): Github node IDs to look up.
+            chunk_size (int): (default: 500) Max number of IDs per IN list.
+            temp_table_threshold (int): (default: 10000) Number of IDs above which a temporary table is used.
+
+        Returns:
+            (set[str]): The node IDs that have a matching row in the database.
+
+        """
+        rows: list[sa.Row] = self._select_by_node_ids(
+            (GithubStarredRepositoryModel.node_id,),
+            node_ids,
+            chunk_size=chunk_size,
+            temp_table_threshold=temp_table_threshold,
+        )
+
+        return {node_id for (node_id,) in rows}
+
+    def get_content_hashes(
+        self,
+        node_ids: t.Iterable[str],
+        chunk_size: int = 500,
+        temp_table_threshold: int = 10_000,
+    ) -> dict[str, str | None]:
+        """Return the stored content hash of every repository with a `node_id` in `node_ids`.
+
+        Description:
+            Only the `node_id` & `content_hash` columns are selected, so a batch can be compared with what
+            is stored without loading any models.
+
+        Params:
+            node_ids (Iterable[str]): Github node IDs to look up.
+            chunk_size (int): (default: 500) Max number of IDs per IN list.
+            temp_table_threshold (int): (default: 10000) Number of IDs above which a temporary table is used.
+
+        Returns:
+            (dict[str, str | None]): Content hashes keyed by `node_id`. The hash is `None` for rows saved
+                before hashes were stored. IDs with no matching repository are left out.
+
+        """
+        rows: list[sa.Row] = self._select_by_node_ids(
+            (
+                GithubStarredRepositoryModel.node_id,
+                GithubStarredRepositoryModel.content_hash,
+            ),
+            node_ids,
+            chunk_size=chunk_size,
+            temp_table_threshold=temp_table_threshold,
+        )
+
+        return {node_id: content_hash for node_id, content_hash in rows}
+
+    def _execute_in_savepoints(
+        self,
+        stmt: sa.Executable,
+        rows: list[dict[str, t.Any]],
+        chunk_size: int,
+    ) -> list[dict[str, t.Any]]:
+        """Execute a statement for each chunk of rows, isolating each chunk in a SAVEPOINT.
+
+        Description:
+            When a chunk fails with an integrity or data error, only that chunk is rolled back, & its rows
+            are retried one at a time, each in its own SAVEPOINT. Rows that still fail are skipped. The
+            outer transaction is left open, the caller commits it.
+
+        Params:
+            stmt (sqlalchemy.Executable): The statement to execute with each chunk of rows.
+            rows (list[dict[str, Any]]): Parameters for each row.
+            chunk_size (int): Max number of rows per chunk.
+
+        Returns:
+            (list[dict[str, Any]]): The rows that were skipped.
+
+        """
+        skipped_rows: list[dict[str, t.Any]] = []
+
+        for chunk in iter_chunks(rows, chunk_size):
+            try:
+                with self.session.begin_nested():
+                    self.session.execute(stmt, chunk)
+
+                continue
+            except (sa_exc.IntegrityError, sa_exc.DataError) as exc:
+                log.warning(
+                    f"({type(exc)}) Chunk of [{len(chunk)}] row(s) failed, retrying one row at a time. Details: {exc.orig}"
+                )
+
+            for row in chunk:
+                try:
+                    with self.session.begin_nested():
+                        self.session.execute(stmt, [row])
+                except (sa_exc.IntegrityError, sa_exc.DataError) as exc:
+                    log.warning(
+                        f"({type(exc)}) Skipping row that could not be written. Details: {exc.orig}"
+                    )
+                    skipped_rows.append(row)
+
+        return skipped_rows
+
+    def _write_topics(
+        self,
+        topics_by_node_id: dict[str, list[str]],
+        replace: bool,
+        chunk_size: int,
+    ) -> int:
+        """Write the topics of repositories that were just saved to `gh_repo_topic`, in chunked statements.
+
+        Description:
+            Repositories are matched by `node_id` to get their `repo_id`. With `replace=True`, each repository's
+            existing topics are deleted first, otherwise topics that already exist are left as they are. The
+            outer transaction is left open, the caller commits it.
+
+        Params:
+            topics_by_node_id (dict[str, list[str]]): Each repository's topics, keyed by `node_id`.
+            replace (bool): Delete the repositories' existing topics before writing the new ones.
+            chunk_size (int): Max number of rows per statement.
+
+        Returns:
+            (int): The number of topic rows written.
+
+        """
+        if not topics_by_node_id:
+            return 0
+
+        repo_ids: dict[str, int] = {
+            node_id: repo_id
+            for node_id, repo_id in self._select_by_node_ids(
+                (
+                    GithubStarredRepositoryModel.node_id,
+                    GithubStarredRepositoryModel.repo_id,
+                ),
+                topics_by_node_id,
+                chunk_size=chunk_size,
+            )
+        }
+        topic_table: sa.Table = GithubRepoTopicModel.__table__
+
+        if replace:
+            replaced_repo_ids: list[int] = list(repo_ids.values())
+
+            for start in range(0, len(replaced_repo_ids), chunk_size):
+                self.session.execute(
+                    sa.delete(topic_table).where(
+                        topic_table.c.repo_id.in_(
+                            replaced_repo_ids[start : start + chunk_size]
+                        )
+                    )
+                )
+
+        topic_rows: list[dict[str, t.Any]] = [
+            {"repo_id": repo_ids[node_id], "topic": topic}
+            for node_id, topics in topics_by_node_id.items()
+            if node_id in repo_ids
+            for topic in topics
+        ]
+
+        topic_stmt: sa.Insert = get_upsert_stmt(
+            self.session, topic_table, index_elements=["repo_id", "topic"]
+        )
+        for chunk in iter_chunks(topic_rows, chunk_size):
+            self.session.execute(topic_stmt, chunk)
+
+        return len(topic_rows)
+
+    def bulk_upsert_rows(
+        self,
+        repo_rows: list[dict[str, t.Any]],
+        owner_rows: list[dict[str, t.Any]],
+        chunk_size: int = 500,
+        update_existing: bool = False,
+        batch_size: int = 2000,
+    ) -> list[str]:
+        """Insert repository & owner rows with chunked statements, committing once per batch.
+
+        Description:
+            Replaces calling `create_or_get_repo()` once per repository, which costs a SELECT, a commit &
+            a refresh for each one. Owners are written first, then repositories, in chunks of `chunk_size`
+            rows. The transaction is committed once every `batch_size` repositories.
+
+            Each chunk runs in a SAVEPOINT. A chunk that fails is retried one row at a time, & rows that
+            still fail are logged & skipped, so one bad row does not roll back the rest of the batch. Any
+            other error rolls back the current batch & is raised, batches that were already committed are kept.
+
+            Owners that already exist are always updated. Repositories that already exist (by `node_id`,
+            `name` & `url`) are left unchanged, unless `update_existing=True`.
+
+            Rows may have a `topics` key with a list of the repository's topics. They are written to
+            `gh_repo_topic` in the same batch as their repositories.
+
+        Params:
+            repo_rows (list[dict[str, Any]]): Repository column values, keyed by column name, with `owner_id`
+                set to their owner's Github ID. Every row must have the same keys.
+            owner_rows (list[dict[str, Any]]): Owner column values for the repositories. Duplicates are written
+                once. Owners are written even when `repo_rows` is empty, i.e. the owners of repositories being updated.
+            chunk_size (int): (default: 500) Max number of rows per statement & SAVEPOINT. Chunks are made
+                smaller if needed to stay under the database's bound parameter limit.
+            update_existing (bool): (default: False) Overwrite repositories that already exist with the new values.
+            batch_size (int): (default: 2000) Number of repositories written per commit.
+
+        Returns:
+            (list[str]): The `node_id` of each repository that was written. Skipped repositories are not included.
+
+        Raises:
+            ValueError: When a repository has no `owner_id`, or the database does not support upserts.
+
+        """
+        if chunk_size < 1:
+            raise ValueError(f"chunk_size must be at least 1. Got: {chunk_size}")
+        if batch_size < 1:
+            raise ValueError(f"batch_size must be at least 1. Got: {batch_size}")
+
+        if not repo_rows and not owner_rows:
+            return []
+
+        ## De-duplicate by Github ID, the last owner in the batch wins
+        owner_rows = list({row["id"]: row for row in owner_rows}.values())
+        ## De-duplicate by node_id, so a chunk never conflicts with itself
+        repo_rows = list({row["node_id"]: row for row in repo_rows}.values())
+
+        if any(row.get("owner_id") is None for row in repo_rows):
+            raise ValueError("Every repository must have an owner_id to bulk upsert")
+
+        topics_by_node_id: dict[str, list[str]]
+        repo_rows, topics_by_node_id = split_repo_topics(repo_rows)
+
+        owner_table: sa.Table = GithubRepositoryOwnerModel.__table__
+        repo_table: sa.Table = GithubStarredRepositoryModel.__table__
+
+        owner_update_columns: list[str] = (
+            [col for col in owner_rows[0] if col != "id"] if owner_rows else []
+        )
+        repo_update_columns: list[str] | None = (
+            [col for col in repo_rows[0] if col != "repo_id"]
+            if update_existing and repo_rows
+            else None
+        )
+
+        owner_stmt: sa.Insert = get_upsert_stmt(
+            self.session,
+            owner_table,
+            index_elements=["id"],
+            update_columns=owner_update_columns,
+        )
+        repo_stmt: sa.Insert = get_upsert_stmt(
+            self.session,
+            repo_table,
+            index_elements=["node_id", "name", "url"],
+            update_columns=repo_update_columns,
+        )
+
+        log.debug(
+            f"Bulk upserting [{len(owner_rows)}] owner(s) & [{len(repo_rows)}] repositor(y/ies)"
+        )
+
+        skipped_owner_rows: list[dict[str, t.Any]] = []
+        skipped_repo_rows: list[dict[str, t.Any]] = []
+
+        try:
+            skipped_owner_rows += self._execute_in_savepoints(
+                owner_stmt, owner_rows, chunk_size
+            )
+            ## Commit the owners with the first batch of repositories
+            if not repo_rows:
+                self.session.commit()
+
+            for start in range(0, len(repo_rows), batch_size):
+                batch: list[dict[str, t.Any]] = repo_rows[start : start + batch_size]
+                skipped_batch_rows: list[dict[str, t.Any]] = (
+                    self._execute_in_savepoints(repo_stmt, batch, chunk_size)
+                )
+                skipped_repo_rows += skipped_batch_rows
+
+                self._write_topics(
+                    get_saved_repo_topics(batch, skipped_batch_rows, topics_by_node_id),
+                    replace=update_existing,
+                    chunk_size=chunk_size,
+                )
+                self.session.commit()
+        except Exception as exc:
+            msg = f"({type(exc)}) Error bulk upserting starred repositories. Details: {exc}"
+            log.error(msg)
+            self.session.rollback()
+
+            raise
+
+        if skipped_owner_rows or skipped_repo_rows:
+            log.warning(
+                f"Skipped [{len(skipped_owner_rows) + len(skipped_repo_rows)}] row(s) that could not be saved"
+            )
+
+        skipped_node_ids: set[str] = {row["node_id"] for row in skipped_repo_rows}
+
+        return [
+            row["node_id"]
+            for row in repo_rows
+            if row["node_id"] not in skipped_node_ids
+        ]
+
+    def bulk_upsert(
+        self,
+        repos: list[GithubStarredRepositoryModel],
+        owners: list[GithubRepositoryOwnerModel],
+        chunk_size: int = 500,
+        update_existing: bool = False,
+        batch_size: int = 2000,
+    ) -> list[GithubStarredRepositoryModel]:
+        """Insert repository & owner models with `bulk_upsert_rows()`, then load the saved repositories.
+
+        Params:
+            repos (list[GithubStarredRepositoryModel]): Repository models, with `owner_id` set to their owner's Github ID.
+            owners (list[GithubRepositoryOwnerModel]): Owner models for the repositories.
+            chunk_size (int): (default: 500) Max number of rows per statement & SAVEPOINT.
+            update_existing (bool): (default: False) Overwrite repositories that already exist with the new values.
+            batch_size (int): (default: 2000) Number of repositories written per commit.
+
+        Returns:
+            (list[GithubStarredRepositoryModel]): The saved repositories, loaded from the database. Skipped
+                repositories are not included.
+
+        Raises:
+            ValueError: When a repository has no `owner_id`, or the database does not support upserts.
+
+        """
+        saved_node_ids: list[str] = self.bulk_upsert_rows(
+            repo_rows=[
+                {**get_model_row(repo), "topics": list(repo.topics)} for repo in repos
+            ],
+            owner_rows=[get_model_row(owner) for owner in owners],
+            chunk_size=chunk_size,
+            update_existing=update_existing,
+            batch_size=batch_size,
+        )
+
+        saved_repos: dict[str, GithubStarredRepositoryModel] = self.get_by_node_ids(
+            saved_node_ids, chunk_size=chunk_size
+        )
+
+        return list(saved_repos.values())
+
+    def bulk_update_rows(
+        self,
+        repo_rows: list[dict[str, t.Any]],
+        chunk_size: int = 500,
+        batch_size: int = 2000,
+    ) -> int:
+        """Overwrite existing repositories with new column values, using chunked UPDATE statements.
+
+        Description:
+            Rows are matched by `node_id`, so renamed repositories are updated instead of duplicated. Every
+            column in the rows is overwritten, the `repo_id` primary key should be left out. Each chunk runs
+            in a SAVEPOINT & the transaction is committed once every `batch_size` rows, like `bulk_upsert_rows()`.
+
+            When rows have a `topics` key, each updated repository's topics in `gh_repo_topic` are replaced.
+
+        Params:
+            repo_rows (list[dict[str, Any]]): Repository column values, keyed by column name. Rows for
+                repositories that do not exist are ignored.
+            chunk_size (int): (default: 500) Max number of rows per statement & SAVEPOINT.
+            batch_size (int): (default: 2000) Number of rows written per commit.
+
+        Returns:
+            (int): The number of repositories updated, not counting skipped rows.
+
+        """
+        if chunk_size < 1:
+            raise ValueError(f"chunk_size must be at least 1. Got: {chunk_size}")
+        if batch_size < 1:
+            raise ValueError(f"batch_size must be at least 1. Got: {batch_size}")
+
+        if not repo_rows:
+            return 0
+
+        repo_table: sa.Table = GithubStarredRepositoryModel.__table__
+        ## The bound parameter for the WHERE clause cannot share a name with a column being SET
+        stmt: sa.Update = sa.update(repo_table).where(
+            repo_table.c.node_id == sa.bindparam("match_node_id")
+        )
+        topics_by_node_id: dict[str, list[str]]
+        repo_rows, topics_by_node_id = split_repo_topics(
+            list({row["node_id"]: row for row in repo_rows}.values())
+        )
+        rows: list[dict[str, t.Any]] = [
+            {**row, "match_node_id": row["node_id"]} for row in repo_rows
+        ]
+
+        log.debug(f"Updating [{len(rows)}] changed repositor(y/ies)")
+
+        skipped_rows: list[dict[str, t.Any]] = []
+
+        try:
+            for start in range(0, len(rows), batch_size):
+                batch: list[dict[str, t.Any]] = rows[start : start + batch_size]
+                skipped_batch_rows: list[dict[str, t.Any]] = (
+                    self._execute_in_savepoints(stmt, batch, chunk_size)
+                )
+                skipped_rows += skipped_batch_rows
+
+                self._write_topics(
+                    get_saved_repo_topics(batch, skipped_batch_rows, topics_by_node_id),
+                    replace=True,
+                    chunk_size=chunk_size,
+                )
+                self.session.commit()
+        except Exception as exc:
+            msg = f"({type(exc)}) Error updating starred repositories. Details: {exc}"
+            log.error(msg)
+            self.session.rollback()
+
+            raise
+
+        if skipped_rows:
+            log.warning(
+                f"Skipped [{len(skipped_rows)}] repositor(y/ies) that could not be updated"
+            )
+
+        return len(rows) - len(skipped_rows)
+
+    def bulk_update(
+        self,
+        repos: list[GithubStarredRepositoryModel],
+        chunk_size: int = 500,
+        batch_size: int = 2000,
+    ) -> int:
+        """Overwrite existing repositories with the values of repository models, with `bulk_update_rows()`.
+
+        Params:
+            repos (list[GithubStarredRepositoryModel]): Repository models with the new values. Models for
+                repositories that do not exist are ignored.
+            chunk_size (int): (default: 500) Max number of rows per statement & SAVEPOINT.
+            batch_size (int): (default: 2000) Number of rows written per commit.
+
+        Returns:
+            (int): The number of repositories updated, not counting skipped rows.
+
+        """
+        return self.bulk_update_rows(
+            repo_rows=[
+                {**get_model_row(repo), "topics": list(repo.topics)} for repo in repos
+            ],
+            chunk_size=chunk_size,
+            batch_size=batch_size,
+        )
+
     def create_or_get_repo(
         self,
         github_repo: GithubStarredRepositoryModel,
@@ -48,7 +987,7 @@ class GithubStarredRepositoryDBRepository(
     ) -> GithubStarredRepositoryModel:
         """Creates a new repository and owner if they don't exist.
         If a repository already exists, return it.
-        If an owner exists but the repository does not, update the owner.
+        If an owner exists but the repository does not, link the repository to the owner.
         """
         try:
             existing_repo: GithubStarredRepositoryModel | None = (
@@ -69,46 +1008,18 @@ class GithubStarredRepositoryDBRepository(
             log.debug(
                 f"Existing repository found with repo_id '{github_repo.repo_id}'. Returning model"
             )
-            return self.session.get(existing_repo)
+            return existing_repo
 
-        ## Check if owner exists
-        existing_repo_owner: GithubRepositoryOwnerModel | None = (
-            self.session.query(GithubRepositoryOwnerModel)
-            .filter(GithubRepositoryOwnerModel.id == repo_owner.id)
-            .one_or_none()
+        ## Check if owner exists. The owner's repositories collection is never loaded, the repository
+        #  is linked to its owner by owner_id.
+        existing_repo_owner: GithubRepositoryOwnerModel | None = self.session.get(
+            GithubRepositoryOwnerModel, repo_owner.id
         )
 
         if existing_repo_owner:
             log.debug(
-                f"Existing owner found with owner_id '{repo_owner.id}'. Checking if repository '{github_repo.name}' is already linked to this owner"
+                f"Existing owner found with owner_id '{repo_owner.id}', linking repository '{github_repo.name}' to owner."
             )
-
-            # Check if repository exists in owner's .repositories
-            for repo in existing_repo_owner.repositories:
-                if repo.repo_id == github_repo.repo_id:
-                    log.info(
-                        f"Repository '{github_repo.repo_id}' is already linked to owner '{repo_owner.id}'. Returning existing repository."
-                    )
-
-                    return self.session.get(repo)
-
-            # Repository does not exist, add it to the owner's repositories
-            log.debug(
-                f"Repository '{github_repo.repo_id}' not found under owner '{repo_owner.id}', linking repository to owner."
-            )
-
-            try:
-                existing_repo_owner.repositories.append(github_repo)
-                self.session.add(existing_repo_owner)
-
-                repo_owner = existing_repo_owner
-            except Exception as exc:
-                msg = f"({type(exc)}) Unhandled exception adding repository to owner. Details: {exc}"
-                log.error(msg)
-                self.session.rollback()
-
-                raise
-
         else:
             ## Owner does not exist, create new owner and repository
             log.debug(
@@ -123,8 +1034,8 @@ class GithubStarredRepositoryDBRepository(
 
                 raise exc
 
-        ## Add repository owner to repository entity
-        github_repo.owner = repo_owner
+        ## Link repository to its owner
+        github_repo.owner_id = repo_owner.id
         log.debug(f"Adding repository '{github_repo.name}'")
 
         ## Add and commit repository
@@ -169,6 +1080,214 @@ class GithubStarredRepositoryDBRepository(
             .all()
         )
 
-    def count(self) -> int:
-        """Get the total count of all starred repositories in the database."""
-        return self.session.query(GithubStarredRepositoryModel).count()
+    def _filter_stmt(
+        self,
+        stmt: sa.Select,
+        language: str | None = None,
+        min_stars: int | None = None,
+        archived: bool | None = None,
+        topic: str | None = None,
+    ) -> sa.Select:
+        """Add a WHERE clause for each filter that is set. Every filter is on an indexed column."""
+        if language is not None:
+            stmt = stmt.where(GithubStarredRepositoryModel.language == language)
+        if min_stars is not None:
+            stmt = stmt.where(
+                GithubStarredRepositoryModel.stargazers_count >= min_stars
+            )
+        if archived is not None:
+            stmt = stmt.where(GithubStarredRepositoryModel.archived == archived)
+        if topic is not None:
+            ## A correlated EXISTS lets the database walk the sort column's index & probe each repository's
+            #  (repo_id, topic) key, instead of collecting & sorting every repository with the topic per page
+            stmt = stmt.where(
+                sa.exists().where(
+                    GithubRepoTopicModel.repo_id
+                    == GithubStarredRepositoryModel.repo_id,
+                    GithubRepoTopicModel.topic == topic,
+                )
+            )
+
+        return stmt
+
+    def get_page(
+        self,
+        limit: int,
+        after: t.Sequence[t.Any] | None = None,
+        sort: str = "repo_id",
+        descending: bool = False,
+        language: str | None = None,
+        min_stars: int | None = None,
+        archived: bool | None = None,
+        topic: str | None = None,
+        fields: t.Sequence[str] | None = None,
+    ) -> list[GithubStarredRepositoryModel]:
+        """Load one page of filtered & sorted repositories, starting after the last repository of the previous page.
+
+        Description:
+            Keyset pagination: the page is found by seeking the sort column's index past the previous page's
+            sort key, so every page costs the same. `get_all_paginated()` reads & discards every row before
+            `offset`.
+
+        Params:
+            limit (int): Max number of repositories to return.
+            after (Sequence[Any] | None): (default: None) The sort key of the previous page's last repository,
+                from `get_sort_key()`. `None` returns the first page.
+            sort (str): (default: "repo_id") A key of `STARRED_REPO_SORT_COLUMNS`.
+            descending (bool): (default: False) Sort from the highest value to the lowest.
+            language (str | None): (default: None) Only repositories with this primary language, i.e. `"Python"`.
+            min_stars (int | None): (default: None) Only repositories with at least this many stars.
+            archived (bool | None): (default: None) Only archived (`True`) or active (`False`) repositories.
+            topic (str | None): (default: None) Only repositories tagged with this topic.
+            fields (Sequence[str] | None): (default: None) Only load these fields of each repository, see
+                `get_field_load_options()`. Other attributes are not loaded. `None` loads every column.
+
+        Returns:
+            (list[GithubStarredRepositoryModel]): The page of repositories. Fewer than `limit` on the last page.
+
+        Raises:
+            ValueError: When `sort` is not in `STARRED_REPO_SORT_COLUMNS`, `after` does not match its columns,
+                or a field is not in `STARRED_REPO_FIELDS`.
+
+        """
+        order_columns: list[so.InstrumentedAttribute] = get_sort_columns(sort)
+
+        stmt = self._filter_stmt(
+            sa.select(GithubStarredRepositoryModel),
+            language=language,
+            min_stars=min_stars,
+            archived=archived,
+            topic=topic,
+        )
+        if fields is not None:
+            stmt = stmt.options(*get_field_load_options(fields, sort=sort))
+
+        if after is not None:
+            if len(after) != len(order_columns):
+                raise ValueError(
+                    f"Sort key {list(after)} does not match the columns of sort '{sort}'"
+                )
+
+            ## Keys of timestamp columns arrive as ISO 8601 strings from API cursors
+            after_values: list[t.Any] = [
+                datetime.fromisoformat(value)
+                if isinstance(value, str) and column.type.python_type is datetime
+                else value
+                for column, value in zip(order_columns, after)
+            ]
+
+            sort_key = sa.tuple_(*order_columns)
+            stmt = stmt.where(
+                sort_key < sa.tuple_(*after_values)
+                if descending
+                else sort_key > sa.tuple_(*after_values)
+            )
+
+        stmt = stmt.order_by(
+            *[column.desc() if descending else column.asc() for column in order_columns]
+        ).limit(limit)
+
+        return list(self.session.execute(stmt).scalars().all())
+
+    def count(
+        self,
+        language: str | None = None,
+        min_stars: int | None = None,
+        archived: bool | None = None,
+        topic: str | None = None,
+    ) -> int:
+        """Get the total count of starred repositories in the database, matching the filters of `get_page()`."""
+        stmt = self._filter_stmt(
+            sa.select(sa.func.count()).select_from(GithubStarredRepositoryModel),
+            language=language,
+            min_stars=min_stars,
+            archived=archived,
+            topic=topic,
+        )
+
+        return self.session.scalar(stmt)
+
+    def get_by_topic(
+        self, topic: str, limit: int | None = None
+    ) -> list[GithubStarredRepositoryModel]:
+        """Load the repositories tagged with a topic, found with the `gh_repo_topic` topic index.
+
+        Params:
+            topic (str): The topic to look up, i.e. `"python"`.
+            limit (int | None): (default: None) Max number of repositories to return.
+
+        Returns:
+            (list[GithubStarredRepositoryModel]): The repositories tagged with `topic`.
+
+        """
+        stmt = (
+            sa.select(GithubStarredRepositoryModel)
+            .join(
+                GithubRepoTopicModel,
+                GithubRepoTopicModel.repo_id == GithubStarredRepositoryModel.repo_id,
+            )
+            .where(GithubRepoTopicModel.topic == topic)
+            .order_by(GithubStarredRepositoryModel.repo_id)
+            .limit(limit)
+        )
+
+        return list(self.session.execute(stmt).scalars().all())
+
+    def search(
+        self,
+        query: str,
+        limit: int = 20,
+        offset: int = 0,
+        fields: t.Sequence[str] | None = None,
+    ) -> list[tuple[GithubStarredRepositoryModel, float]]:
+        """Find repositories by name, topic & description with the full-text search index.
+
+        Description:
+            Every term in `query` must match the start of a word in the repository's name, topics or
+            description. See `search.build_search_stmt()`.
+
+        Params:
+            query (str): The text to search for, i.e. `"json pars"`.
+            limit (int): (default: 20) Max number of results.
+            offset (int): (default: 0) Number of results to skip, for paging.
+            fields (Sequence[str] | None): (default: None) Only load these fields of each repository, see
+                `get_field_load_options()`. `None` loads every column.
+
+        Returns:
+            (list[tuple[GithubStarredRepositoryModel, float]]): The matching repositories & their rank, best
+                match first. Empty when the query has no searchable terms.
+
+        Raises:
+            ValueError: When the database does not support full-text search, or a field is not in
+                `STARRED_REPO_FIELDS`.
+
+        """
+        stmt: sa.Select | None = build_search_stmt(
+            self.session.get_bind().dialect.name, query, limit=limit, offset=offset
+        )
+        if stmt is None:
+            return []
+        if fields is not None:
+            stmt = stmt.options(*get_field_load_options(fields))
+
+        return [(repo, rank) for repo, rank in self.session.execute(stmt).all()]
+
+    def get_topic_counts(self, limit: int | None = None) -> list[tuple[str, int]]:
+        """Count the repositories tagged with each topic, from the `gh_repo_topic` topic index.
+
+        Params:
+            limit (int | None): (default: None) Max number of topics to return.
+
+        Returns:
+            (list[tuple[str, int]]): Each topic & its number of repositories, most used first.
+
+        """
+        repo_count = sa.func.count(GithubRepoTopicModel.repo_id).label("repo_count")
+        stmt = (
+            sa.select(GithubRepoTopicModel.topic, repo_count)
+            .group_by(GithubRepoTopicModel.topic)
+            .order_by(repo_count.desc(), GithubRepoTopicModel.topic)
+            .limit(limit)
+        )
+
+        return [(topic, count) for topic, count in self.session.execute(stmt).all()]
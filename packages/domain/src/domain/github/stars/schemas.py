@@ -1,10 +1,20 @@
 from __future__ import annotations
 
 from datetime import datetime
+from functools import lru_cache
 import typing as t
 
 from loguru import logger as log
-from pydantic import BaseModel, Field, ValidationError, computed_field, field_validator
+from pydantic import (
+    BaseModel,
+    Field,
+    TypeAdapter,
+    ValidationError,
+    computed_field,
+    field_validator,
+)
+
+SchemaT = t.TypeVar("SchemaT", bound=BaseModel)
 
 
 class GithubStarsAPIResponseBase(BaseModel):
@@ -106,9 +116,6 @@ class GithubStarredRepoBase(BaseModel):
     labels_url: str
     releases_url: str
     deployments_url: str
-    created_at: str
-    updated_at: str
-    pushed_at: str
     git_url: str
     ssh_url: str
     clone_url: str
@@ -143,11 +150,165 @@ class GithubStarredRepoBase(BaseModel):
 
 
 class GithubStarredRepoIn(GithubStarredRepoBase):
-    pass
+    ## Github's timestamps, saved to the gh_created_at, gh_updated_at & gh_pushed_at columns
+    created_at: datetime
+    updated_at: datetime
+    pushed_at: datetime | None = Field(default=None)
 
 
 class GithubStarredRepoOut(GithubStarredRepoBase):
     repo_id: int
 
+    gh_created_at: datetime
+    gh_updated_at: datetime
+    gh_pushed_at: datetime | None = Field(default=None)
+
     created_at: datetime
     updated_at: datetime
+
+
+class InvalidItem(BaseModel):
+    """An item that failed batch validation.
+
+    Attributes:
+        index (int): Position of the item in the validated batch.
+        identifier (str | None): The item's `node_id`, or `login` for owners, when it has one.
+        errors (list[dict[str, Any]]): Pydantic's errors for the item, with `loc` relative to the item.
+        item (Any): The item as it was passed in, so it can be quarantined or inspected.
+
+    """
+
+    index: int
+    identifier: str | None = Field(default=None)
+    errors: t.List[t.Dict[str, t.Any]]
+    item: t.Any = Field(default=None, repr=False)
+
+
+class BatchValidationResult(BaseModel, t.Generic[SchemaT]):
+    """The result of validating a batch of items with `validate_batch()`.
+
+    Attributes:
+        valid (list[SchemaT]): The items that passed validation, in their original order.
+        valid_indexes (list[int]): Position of each valid item in the validated batch.
+        invalid (list[InvalidItem]): A report of the items that failed validation.
+
+    """
+
+    valid: t.List[SchemaT] = Field(default_factory=list, repr=False)
+    valid_indexes: t.List[int] = Field(default_factory=list, repr=False)
+    invalid: t.List[InvalidItem] = Field(default_factory=list)
+
+    @computed_field
+    @property
+    def valid_count(self) -> int:
+        return len(self.valid)
+
+    @computed_field
+    @property
+    def invalid_count(self) -> int:
+        return len(self.invalid)
+
+    def error_report(self) -> list[dict[str, t.Any]]:
+        """Return a JSON-serializable report of the invalid items, without the items themselves."""
+        return [
+            invalid_item.model_dump(mode="json", exclude={"item"})
+            for invalid_item in self.invalid
+        ]
+
+
+@lru_cache(maxsize=None)
+def _get_list_adapter(schema: type[SchemaT]) -> TypeAdapter[list[SchemaT]]:
+    ## Building a TypeAdapter compiles a validator, only do it once per schema
+    return TypeAdapter(t.List[schema])
+
+
+def validate_batch(
+    schema: type[SchemaT], items: t.Sequence[t.Any]
+) -> BatchValidationResult[SchemaT]:
+    """Validate a batch of items against a schema with a single `TypeAdapter` call.
+
+    Description:
+        The whole batch is validated at once with a `TypeAdapter(list[schema])`, which is much faster than
+        calling `schema.model_validate()` on each item. When some items are invalid, their errors are grouped
+        into an `InvalidItem` report, & the remaining items are validated again in one call. An invalid item
+        never stops the rest of the batch from being validated.
+
+    Params:
+        schema (type[BaseModel]): The Pydantic schema to validate each item against, i.e. `GithubStarredRepoIn`.
+        items (Sequence[Any]): The items to validate, i.e. a page of starred repositories from the Github API.
+
+    Returns:
+        (BatchValidationResult): The valid items, & a report of the invalid ones.
+
+    Usage:
+        result = validate_batch(GithubStarredRepoIn, starred_repos)
+        if result.invalid:
+            log.warning(f"Skipping [{result.invalid_count}] invalid repositories: {result.error_report()}")
+
+    """
+    adapter: TypeAdapter[list[SchemaT]] = _get_list_adapter(schema)
+    items = list(items)
+
+    try:
+        return BatchValidationResult[schema](
+            valid=adapter.validate_python(items),
+            valid_indexes=list(range(len(items))),
+        )
+    except ValidationError as exc:
+        item_errors: dict[int, list[dict[str, t.Any]]] = {}
+
+        for error in exc.errors(include_url=False, include_context=False):
+            index, *loc = error["loc"]
+            item_errors.setdefault(index, []).append(
+                {
+                    "loc": tuple(loc),
+                    "type": error["type"],
+                    "msg": error["msg"],
+                }
+            )
+
+    invalid: list[InvalidItem] = []
+    for index, errors in sorted(item_errors.items()):
+        item: t.Any = items[index]
+        identifier: t.Any = (
+            item.get("node_id") or item.get("login") if isinstance(item, dict) else None
+        )
+
+        invalid.append(
+            InvalidItem(
+                index=index,
+                identifier=str(identifier) if identifier is not None else None,
+                errors=errors,
+                item=item,
+            )
+        )
+
+    valid_indexes: list[int] = [
+        index for index in range(len(items)) if index not in item_errors
+    ]
+    ## Errors are reported per item, so the rest of the batch is valid
+    valid: list[SchemaT] = adapter.validate_python(
+        [items[index] for index in valid_indexes]
+    )
+
+    log.debug(
+        f"Validated batch of [{len(items)}] {schema.__name__} item(s), [{len(invalid)}] invalid"
+    )
+
+    return BatchValidationResult[schema](
+        valid=valid, valid_indexes=valid_indexes, invalid=invalid
+    )
+
+
+def validate_starred_repos(
+    starred_repos: t.Sequence[t.Any],
+) -> BatchValidationResult[GithubStarredRepoIn]:
+    """Validate a page of starred repositories from the Github API with `validate_batch()`."""
+    return validate_batch(GithubStarredRepoIn, starred_repos)
+
+
+def validate_repository_owners(
+    owners: t.Sequence[t.Any],
+) -> BatchValidationResult[GithubRepositoryOwnerIn]:
+    """Validate a batch of repository owners from the Github API with `validate_batch()`."""
+    return validate_batch(GithubRepositoryOwnerIn, owners)
@@ -0,0 +1,320 @@
+"""Full-text search over starred repositories' names, topics & descriptions.
+
+The index is a SQLite FTS5 table, or a table of Postgres `tsvector` documents with a GIN index. It is not part
+of the ORM metadata, it is created & dropped with the other tables by the `after_create` & `before_drop`
+metadata events below, or by the Alembic migration that added it. Database triggers keep it up to date when
+repositories & topics are inserted, updated or deleted, whether they are written by the ORM or bulk statements.
+
+SQLite drops a table's triggers when Alembic recreates the table in batch mode. A migration that alters
+`gh_starred_repo` or `gh_repo_topic` on SQLite must create the triggers again.
+"""
+
+from __future__ import annotations
+
+import re
+import typing as t
+
+from .models import GithubStarredRepositoryModel
+
+import db_lib
+from loguru import logger as log
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import TSVECTOR
+
+__all__ = [
+    "SEARCH_TABLE_NAME",
+    "build_search_stmt",
+    "create_search_index",
+    "drop_search_index",
+    "get_search_terms",
+    "include_search_index_name",
+    "rebuild_search_index",
+]
+
+## Name of the search index table. SQLite's FTS5 also creates shadow tables named with this prefix.
+SEARCH_TABLE_NAME: str = "gh_starred_repo_search"
+
+## Search terms are split like SQLite's unicode61 tokenizer splits text, on anything that is not a letter or number
+SEARCH_TERM_PATTERN: re.Pattern = re.compile(r"[^\W_]+")
+
+## bm25() weights of the name, topics & description columns. A match in the name ranks highest.
+SQLITE_COLUMN_WEIGHTS: tuple[float, float, float] = (10.0, 5.0, 1.0)
+
+SQLITE_SEARCH_DDL: list[str] = [
+    f"""CREATE VIRTUAL TABLE IF NOT EXISTS {SEARCH_TABLE_NAME}
+    USING fts5(name, topics, description, tokenize = 'unicode61 remove_diacritics 2')""",
+    f"""CREATE TRIGGER IF NOT EXISTS gh_starred_repo_search_insert AFTER INSERT ON gh_starred_repo BEGIN
+        INSERT INTO {SEARCH_TABLE_NAME} (rowid, name, topics, description)
+        VALUES (new.repo_id, new.name, '', coalesce(new.description, ''));
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS gh_starred_repo_search_update
+    AFTER UPDATE OF name, description ON gh_starred_repo BEGIN
+        UPDATE {SEARCH_TABLE_NAME} SET name = new.name, description = coalesce(new.description, '')
+        WHERE rowid = new.repo_id;
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS gh_starred_repo_search_delete AFTER DELETE ON gh_starred_repo BEGIN
+        DELETE FROM {SEARCH_TABLE_NAME} WHERE rowid = old.repo_id;
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS gh_repo_topic_search_insert AFTER INSERT ON gh_repo_topic BEGIN
+        UPDATE {SEARCH_TABLE_NAME}
+        SET topics = (SELECT group_concat(topic, ' ') FROM gh_repo_topic WHERE repo_id = new.repo_id)
+        WHERE rowid = new.repo_id;
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS gh_repo_topic_search_delete AFTER DELETE ON gh_repo_topic BEGIN
+        UPDATE {SEARCH_TABLE_NAME}
+        SET topics = coalesce((SELECT group_concat(topic, ' ') FROM gh_repo_topic WHERE repo_id = old.repo_id), '')
+        WHERE rowid = old.repo_id;
+    END""",
+]
+SQLITE_REBUILD_SQL: list[str] = [
+    f"DELETE FROM {SEARCH_TABLE_NAME}",
+    f"""INSERT INTO {SEARCH_TABLE_NAME} (rowid, name, topics, description)
+    SELECT
+        r.repo_id,
+        r.name,
+        coalesce((SELECT group_concat(t.topic, ' ') FROM gh_repo_topic t WHERE t.repo_id = r.repo_id), ''),
+        coalesce(r.description, '')
+    FROM gh_starred_repo r""",
+]
+SQLITE_DROP_DDL: list[str] = [
+    "DROP TRIGGER IF EXISTS gh_repo_topic_search_delete",
+    "DROP TRIGGER IF EXISTS gh_repo_topic_search_insert",
+    "DROP TRIGGER IF EXISTS gh_starred_repo_search_delete",
+    "DROP TRIGGER IF EXISTS gh_starred_repo_search_update",
+    "DROP TRIGGER IF EXISTS gh_starred_repo_search_insert",
+    f"DROP TABLE IF EXISTS {SEARCH_TABLE_NAME}",
+]
+
+## Names & topics are indexed with the 'simple' configuration, so they are not stemmed like English words.
+#  Weights A, B & C rank a match in the name highest, then topics, then the description.
+POSTGRES_SEARCH_DDL: list[str] = [
+    f"""CREATE TABLE IF NOT EXISTS {SEARCH_TABLE_NAME} (
+        repo_id INTEGER PRIMARY KEY REFERENCES gh_starred_repo (repo_id) ON DELETE CASCADE,
+        document TSVECTOR NOT NULL
+    )""",
+    f"""CREATE INDEX IF NOT EXISTS ix_{SEARCH_TABLE_NAME}_document
+    ON {SEARCH_TABLE_NAME} USING GIN (document)""",
+    f"""CREATE OR REPLACE FUNCTION gh_starred_repo_search_refresh(p_repo_id INTEGER) RETURNS VOID AS $$
+        INSERT INTO {SEARCH_TABLE_NAME} (repo_id, document)
+        SELECT
+            r.repo_id,
+            setweight(to_tsvector('simple', coalesce(r.name, '')), 'A')
+            || setweight(to_tsvector('simple', coalesce(
+                (SELECT string_agg(t.topic, ' ') FROM gh_repo_topic t WHERE t.repo_id = r.repo_id), ''
+            )), 'B')
+            || setweight(to_tsvector('simple', coalesce(r.description, '')), 'C')
+        FROM gh_starred_repo r
+        WHERE r.repo_id = p_repo_id
+        ON CONFLICT (repo_id) DO UPDATE SET document = excluded.document
+    $$ LANGUAGE sql""",
+    """CREATE OR REPLACE FUNCTION gh_starred_repo_search_trigger() RETURNS TRIGGER AS $$
+    BEGIN
+        PERFORM gh_starred_repo_search_refresh(NEW.repo_id);
+        RETURN NULL;
+    END
+    $$ LANGUAGE plpgsql""",
+    """CREATE OR REPLACE FUNCTION gh_repo_topic_search_trigger() RETURNS TRIGGER AS $$
+    BEGIN
+        IF TG_OP = 'DELETE' THEN
+            PERFORM gh_starred_repo_search_refresh(OLD.repo_id);
+        ELSE
+            PERFORM gh_starred_repo_search_refresh(NEW.repo_id);
+        END IF;
+        RETURN NULL;
+    END
+    $$ LANGUAGE plpgsql""",
+    "DROP TRIGGER IF EXISTS gh_starred_repo_search_update ON gh_starred_repo",
+    """CREATE TRIGGER gh_starred_repo_search_update
+    AFTER INSERT OR UPDATE OF name, description ON gh_starred_repo
+    FOR EACH ROW EXECUTE FUNCTION gh_starred_repo_search_trigger()""",
+    "DROP TRIGGER IF EXISTS gh_repo_topic_search_update ON gh_repo_topic",
+    """CREATE TRIGGER gh_repo_topic_search_update
+    AFTER INSERT OR DELETE ON gh_repo_topic
+    FOR EACH ROW EXECUTE FUNCTION gh_repo_topic_search_trigger()""",
+]
+POSTGRES_REBUILD_SQL: list[str] = [
+    f"DELETE FROM {SEARCH_TABLE_NAME}",
+    "SELECT gh_starred_repo_search_refresh(repo_id) FROM gh_starred_repo",
+]
+POSTGRES_DROP_DDL: list[str] = [
+    "DROP FUNCTION IF EXISTS gh_repo_topic_search_trigger() CASCADE",
+    "DROP FUNCTION IF EXISTS gh_starred_repo_search_trigger() CASCADE",
+    "DROP FUNCTION IF EXISTS gh_starred_repo_search_refresh(INTEGER)",
+    f"DROP TABLE IF EXISTS {SEARCH_TABLE_NAME}",
+]
+
+SEARCH_DDL: dict[str, list[str]] = {
+    "sqlite": SQLITE_SEARCH_DDL,
+    "postgresql": POSTGRES_SEARCH_DDL,
+}
+REBUILD_SQL: dict[str, list[str]] = {
+    "sqlite": SQLITE_REBUILD_SQL,
+    "postgresql": POSTGRES_REBUILD_SQL,
+}
+DROP_DDL: dict[str, list[str]] = {
+    "sqlite": SQLITE_DROP_DDL,
+    "postgresql": POSTGRES_DROP_DDL,
+}
+
+
+def get_search_terms(query: str) -> list[str]:
+    """Split a search query into lowercase terms, dropping punctuation & search syntax.
+
+    Description:
+        User input is never passed to the database's query parser as-is, so quotes, dashes or operators like
+        `NOT` in a query are searched for as plain words instead of raising a syntax error.
+
+    Params:
+        query (str): The text to search for, i.e. `"fast json parser"`.
+
+    Returns:
+        (list[str]): The query's terms, in order.
+
+    """
+    return SEARCH_TERM_PATTERN.findall(query.lower())
+
+
+def create_search_index(connection: sa.Connection, rebuild: bool = False) -> bool:
+    """Create the full-text search index & the triggers that keep it up to date.
+
+    Description:
+        Safe to call on a database that already has the index. When the index table is created, or
+        `rebuild=True`, it is filled from the repositories already in the database.
+
+    Params:
+        connection (sa.Connection): Connection to the database to create the index in.
+        rebuild (bool): (default: False) Re-index every repository, even if the index already existed.
+
+    Returns:
+        (bool): `True` if the database supports the index, `False` if it was skipped.
+
+    """
+    dialect: str = connection.dialect.name
+    if dialect not in SEARCH_DDL:
+        log.warning(
+            f"Full-text search is not supported for database dialect '{dialect}', skipping search index"
+        )
+        return False
+
+    index_exists: bool = sa.inspect(connection).has_table(SEARCH_TABLE_NAME)
+
+    for statement in SEARCH_DDL[dialect]:
+        connection.exec_driver_sql(statement)
+
+    if rebuild or not index_exists:
+        rebuild_search_index(connection)
+
+    return True
+
+
+def rebuild_search_index(connection: sa.Connection) -> None:
+    """Re-index every starred repository from the `gh_starred_repo` & `gh_repo_topic` tables."""
+    log.debug("Rebuilding starred repository search index")
+
+    for statement in REBUILD_SQL[connection.dialect.name]:
+        connection.exec_driver_sql(statement)
+
+
+def drop_search_index(connection: sa.Connection) -> None:
+    """Drop the full-text search index & its triggers."""
+    for statement in DROP_DDL.get(connection.dialect.name, []):
+        connection.exec_driver_sql(statement)
+
+
+def build_search_stmt(
+    dialect: str, query: str, limit: int = 20, offset: int = 0
+) -> sa.Select | None:
+    """Build a ranked full-text search query over starred repositories.
+
+    Description:
+        Every term in the query must match the start of a word, so a half-remembered name like `"fastap"`
+        still finds `fastapi`. Results are ordered by relevance, best match first. A
+        match in the name ranks above a match in the topics, which ranks above a match in the description.
+
+    Params:
+        dialect (str): Name of the database dialect, i.e. `session.get_bind().dialect.name`.
+        query (str): The text to search for.
+        limit (int): (default: 20) Max number of results.
+        offset (int): (default: 0) Number of results to skip, for paging.
+
+    Returns:
+        (sa.Select | None): A select of `(GithubStarredRepositoryModel, rank)` rows, with a higher rank for a
+            better match. `None` when the query has no searchable terms.
+
+    Raises:
+        ValueError: When the database dialect does not support full-text search.
+
+    """
+    terms: list[str] = get_search_terms(query)
+    if not terms:
+        return None
+
+    ## Matches are ranked & paged in the index first, so only one page of repositories is loaded & joined
+    if dialect == "sqlite":
+        search_table = sa.table(SEARCH_TABLE_NAME, sa.column("rowid"))
+        match_query: str = " ".join(f'"{term}"*' for term in terms)
+
+        ## bm25() is lower for better matches, it is negated so a higher rank is better on every database
+        rank = (
+            -sa.func.bm25(sa.literal_column(SEARCH_TABLE_NAME), *SQLITE_COLUMN_WEIGHTS)
+        ).label("rank")
+        search_repo_id = search_table.c.rowid.label("repo_id")
+        match_clause = sa.literal_column(SEARCH_TABLE_NAME).op("MATCH")(match_query)
+
+    elif dialect == "postgresql":
+        search_table = sa.table(
+            SEARCH_TABLE_NAME, sa.column("repo_id"), sa.column("document", TSVECTOR)
+        )
+        ts_query = sa.func.to_tsquery(
+            "simple", " & ".join(f"{term}:*" for term in terms)
+        )
+
+        rank = sa.func.ts_rank_cd(search_table.c.document, ts_query).label("rank")
+        search_repo_id = search_table.c.repo_id.label("repo_id")
+        match_clause = search_table.c.document.op("@@")(ts_query)
+
+    else:
+        raise ValueError(
+            f"Full-text search is not supported for database dialect '{dialect}'"
+        )
+
+    ranked = (
+        sa.select(search_repo_id, rank)
+        .where(match_clause)
+        .order_by(rank.desc(), search_repo_id)
+        .limit(limit)
+        .offset(offset)
+        .subquery("ranked")
+    )
+
+    return (
+        sa.select(GithubStarredRepositoryModel, ranked.c.rank)
+        .join(ranked, ranked.c.repo_id == GithubStarredRepositoryModel.repo_id)
+        .order_by(ranked.c.rank.desc(), GithubStarredRepositoryModel.repo_id)
+    )
+
+
+def include_search_index_name(
+    name: str | None, type_: str, parent_names: dict[str, t.Any]
+) -> bool:
+    """Alembic `include_name` hook that leaves the search index out of autogenerated migrations."""
+    if type_ == "table" and name and name.startswith(SEARCH_TABLE_NAME):
+        return False
+
+    return True
+
+
+@sa.event.listens_for(db_lib.base.Base.metadata, "after_create")
+def _create_search_index_after_create(
+    target: sa.MetaData, connection: sa.Connection, **kw: t.Any
+) -> None:
+    ## Only when the tables the index is built from were created with this metadata
+    if GithubStarredRepositoryModel.__tablename__ in target.tables:
+        create_search_index(connection)
+
+
+@sa.event.listens_for(db_lib.base.Base.metadata, "before_drop")
+def _drop_search_index_before_drop(
+    target: sa.MetaData, connection: sa.Connection, **kw: t.Any
+) -> None:
+    drop_search_index(connection)
@@ -1,3 +1,16 @@
 from __future__ import annotations
 
-from .stars import get_starred_repos, save_github_stars
+from .accounts import iter_starred_repos_for_accounts, sync_starred_repos_for_accounts
+from .pipeline import (
+    convert_starred_repos_page,
+    ingest_starred_repo_pages,
+    prune_api_response_snapshots,
+    write_converted_page,
+)
+from .stars import (
+    get_starred_repos,
+    iter_new_starred_repos,
+    iter_starred_repos,
+    iter_starred_repos_graphql,
+    save_github_stars,
+)
@@ -0,0 +1,251 @@
+from __future__ import annotations
+
+import asyncio
+import typing as t
+import uuid
+
+from .pipeline import prune_api_response_snapshots
+from .stars import save_github_stars
+
+from controllers import AsyncGithubAPIController
+import http_lib
+from loguru import logger as log
+import settings
+
+__all__ = ["iter_starred_repos_for_accounts", "sync_starred_repos_for_accounts"]
+
+
+async def iter_starred_repos_for_accounts(
+    api_tokens: list[str],
+    use_cache: bool = True,
+    cache_ttl: int = 900,
+    results_per_page: int = 100,
+    parallel: bool = False,
+    max_concurrency: int = 4,
+    use_etags: bool = True,
+    queue_size: int = 16,
+) -> t.AsyncIterator[tuple[str, list[dict]]]:
+    """Yield pages of starred repositories for multiple Github accounts, fetched concurrently.
+
+    Description:
+        Every account's requests are sent through one `http_lib.AsyncHttpxController`, so all accounts share
+        a connection pool & HTTP cache. Each account has its own rate limiter, because Github rate limits are
+        per account. The login of each token's account is looked up with the `/user` endpoint, & every page is
+        yielded with the login it belongs to.
+
+        Pages are passed through a queue of `queue_size` pages, so fetching pauses when the consumer falls behind.
+        An account that fails is logged & skipped, the other accounts keep syncing.
+
+    Params:
+        api_tokens (list[str]): Github PATs, one per account.
+        use_cache (bool): (default: True) Use the shared HTTP cache.
+        cache_ttl (int): (default: 900) Time to live for cached responses.
+        results_per_page (int): (default: 100) Number of repositories per page, between 1 and 100.
+        parallel (bool): (default: False) Request each account's pages concurrently using the `rel="last"` link.
+        max_concurrency (int): (default: 4) Max number of concurrent page requests per account when `parallel=True`.
+        use_etags (bool): (default: True) Send conditional requests using stored `ETag`/`Last-Modified` values.
+        queue_size (int): (default: 16) Max number of fetched pages waiting to be consumed.
+
+    Yields:
+        (tuple[str, list[dict]]): The account's login, and a page of starred repository dicts.
+
+    """
+    queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+    ## Put on the queue by each account's task when it finishes
+    account_done: object = object()
+
+    async def _fetch_account(
+        account_num: int, api_token: str, http_ctl: http_lib.AsyncHttpxController
+    ) -> None:
+        try:
+            async with AsyncGithubAPIController(
+                api_token=api_token,
+                use_cache=use_cache,
+                cache_ttl=cache_ttl,
+                use_etags=use_etags,
+                http_controller=http_ctl,
+            ) as gh:
+                user: dict[str, t.Any] = await gh.get_authenticated_user()
+                login: str = user["login"]
+                log.info(f"Syncing starred repositories for account '{login}'")
+
+                async for page in gh.iter_user_stars(
+                    results_per_page=results_per_page,
+                    parallel=parallel,
+                    max_concurrency=max_concurrency,
+                ):
+                    await queue.put((login, page))
+        except Exception as exc:
+            ## Tokens are secrets, identify the account by its position in the list
+            msg = f"({type(exc)}) Error syncing starred repositories for account #{account_num}. Details: {exc}"
+            log.error(msg)
+        finally:
+            await queue.put(account_done)
+
+    http_controller: http_lib.AsyncHttpxController = http_lib.get_async_http_controller(
+        use_cache=use_cache, cache_ttl=cache_ttl
+    )
+
+    async with http_controller as http_ctl:
+        tasks: list[asyncio.Task] = [
+            asyncio.create_task(_fetch_account(account_num, api_token, http_ctl))
+            for account_num, api_token in enumerate(api_tokens, start=1)
+        ]
+        remaining: int = len(tasks)
+
+        try:
+            while remaining:
+                item = await queue.get()
+
+                if item is account_done:
+                    remaining -= 1
+                    continue
+
+                yield item
+        finally:
+            for task in tasks:
+                task.cancel()
+
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+
+async def _sync_starred_repos_for_accounts(
+    api_tokens: list[str],
+    save_db: bool,
+    batch_size: int,
+    **fetch_kwargs,
+) -> dict[str, list[str]]:
+    starred_node_ids: dict[str, list[str]] = {}
+    ## Teammates often star the same repositories, only save each one once per run
+    seen_node_ids: set[str] = set()
+    ## Owners saved during this run, so each owner is only written once
+    owner_identity_map: dict[int, dict] = {}
+    ## Raw responses of every batch are saved under one snapshot
+    snapshot_id: str = str(uuid.uuid4())
+    batch_number: int = 0
+    batch: list[dict] = []
+    save_task: asyncio.Task | None = None
+
+    async def _save_batch(repos: list[dict]) -> None:
+        nonlocal save_task, batch_number
+
+        ## Wait for the previous batch, so only one batch is written at a time
+        if save_task is not None:
+            await save_task
+
+        batch_number += 1
+        log.debug(f"Saving batch of [{len(repos)}] starred repositories to database")
+        save_task = asyncio.create_task(
+            asyncio.to_thread(
+                save_github_stars,
+                repos,
+                owner_identity_map=owner_identity_map,
+                snapshot_id=snapshot_id,
+                page=batch_number,
+            )
+        )
+
+    async for login, page in iter_starred_repos_for_accounts(
+        api_tokens=api_tokens, **fetch_kwargs
+    ):
+        starred_node_ids.setdefault(login, []).extend(
+            repo_data["node_id"] for repo_data in page
+        )
+
+        if not save_db:
+            continue
+
+        for repo_data in page:
+            if repo_data["node_id"] not in seen_node_ids:
+                seen_node_ids.add(repo_data["node_id"])
+                batch.append(repo_data)
+
+        if len(batch) >= batch_size:
+            await _save_batch(batch)
+            batch = []
+
+    if batch:
+        await _save_batch(batch)
+
+    if save_task is not None:
+        await save_task
+
+    if save_db:
+        await asyncio.to_thread(prune_api_response_snapshots)
+
+    return starred_node_ids
+
+
+def sync_starred_repos_for_accounts(
+    api_tokens: list[str] | None = None,
+    save_db: bool = True,
+    batch_size: int = 500,
+    use_cache: bool = True,
+    cache_ttl: int = 900,
+    results_per_page: int = 100,
+    parallel: bool = False,
+    max_concurrency: int = 4,
+    use_etags: bool = True,
+) -> dict[str, list[str]]:
+    """Sync the starred repositories of multiple Github accounts concurrently.
+
+    Description:
+        Replaces running `get_starred_repos()` once per account. Accounts are fetched concurrently with
+        `iter_starred_repos_for_accounts()`, over one shared connection pool & HTTP cache. Repositories are
+        de-duplicated across accounts, and saved with `save_github_stars()` in batches of `batch_size`. Saving
+        runs in a worker thread, so the next batch is fetched while the previous one is written.
+
+    Params:
+        api_tokens (list[str] | None): Github PATs, one per account. When `None`, tokens are loaded from
+            the `GH_API_TOKENS` setting.
+        save_db (bool): (default: True) Save repositories to the database.
+        batch_size (int): (default: 500) Number of repositories to collect before writing them to the database.
+        use_cache (bool): (default: True) Use the shared HTTP cache.
+        cache_ttl (int): (default: 900) Time to live for cached responses.
+        results_per_page (int): (default: 100) Number of repositories per page, between 1 and 100.
+        parallel (bool): (default: False) Request each account's pages concurrently using the `rel="last"` link.
+        max_concurrency (int): (default: 4) Max number of concurrent page requests per account when `parallel=True`.
+        use_etags (bool): (default: True) Send conditional requests using stored `ETag`/`Last-Modified` values.
+
+    Returns:
+        (dict[str, list[str]]): The `node_id` of every repository each account has starred, keyed by the
+            account's login.
+
+    Raises:
+        ValueError: When no API tokens are given or configured.
+
+    """
+    if api_tokens is None:
+        api_tokens = settings.GITHUB_SETTINGS.get("GH_API_TOKENS", default=None)
+
+    if not api_tokens:
+        raise ValueError(
+            "Missing Github PATs to sync. Please set a list of tokens for gh_api_tokens in your config/.secrets.toml, or set the GH_API_TOKENS environment variable."
+        )
+
+    if batch_size < 1:
+        raise ValueError(f"batch_size must be at least 1. Got: {batch_size}")
+
+    log.info(f"Syncing starred repositories for [{len(api_tokens)}] account(s)")
+
+    try:
+        starred_node_ids: dict[str, list[str]] = asyncio.run(
+            _sync_starred_repos_for_accounts(
+                api_tokens=list(api_tokens),
+                save_db=save_db,
+                batch_size=batch_size,
+                use_cache=use_cache,
+                cache_ttl=cache_ttl,
+                results_per_page=results_per_page,
+                parallel=parallel,
+                max_concurrency=max_concurrency,
+                use_etags=use_etags,
+            )
+        )
+    except Exception as exc:
+        msg = f"({type(exc)}) Error syncing starred repositories for multiple accounts. Details: {exc}"
+        log.error(msg)
+
+        raise
+
+    return starred_node_ids
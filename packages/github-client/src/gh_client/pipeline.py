@@ -0,0 +1,330 @@
+from __future__ import annotations
+
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+import multiprocessing
+import typing as t
+import uuid
+
+from depends import db_depends
+from domain.github import stars as stars_domain
+from loguru import logger as log
+import settings
+import sqlalchemy.orm as so
+
+__all__ = [
+    "ConvertedStarsPage",
+    "convert_starred_repos_page",
+    "ingest_starred_repo_pages",
+    "prune_api_response_snapshots",
+    "write_converted_page",
+]
+
+
+class ConvertedStarsPage(t.NamedTuple):
+    """A page of starred repositories converted by `convert_starred_repos_page()`."""
+
+    ## Repository column values, ready for bulk_upsert_rows()
+    repo_rows: list[dict[str, t.Any]]
+    ## Distinct owner column values, keyed by owner ID
+    owner_rows: dict[int, dict[str, t.Any]]
+    ## Repositories that failed validation & were left out
+    invalid: list[stars_domain.InvalidItem]
+
+
+def convert_starred_repos_page(starred_repos: list[dict]) -> ConvertedStarsPage:
+    """Validate a page of starred repositories & convert it to plain column dicts.
+
+    Description:
+        Runs in the worker processes of `ingest_starred_repo_pages()`, so it does not touch the database.
+        The page is validated in one call with `validate_starred_repos()`, which also validates each owner.
+        Invalid repositories are left out of the rows & reported in `invalid`.
+
+    Params:
+        starred_repos (list[dict]): A page of starred repositories from the Github API.
+
+    Returns:
+        (ConvertedStarsPage): The repository & owner rows, & a report of the invalid repositories.
+
+    """
+    validation: stars_domain.BatchValidationResult[stars_domain.GithubStarredRepoIn] = (
+        stars_domain.validate_starred_repos(starred_repos)
+    )
+
+    repo_rows: list[dict[str, t.Any]] = []
+    owner_rows: dict[int, dict[str, t.Any]] = {}
+    invalid: list[stars_domain.InvalidItem] = list(validation.invalid)
+
+    for index, github_repo_schema in zip(validation.valid_indexes, validation.valid):
+        if github_repo_schema.owner is None:
+            invalid.append(
+                stars_domain.InvalidItem(
+                    index=index,
+                    identifier=github_repo_schema.node_id,
+                    errors=[
+                        {
+                            "loc": ("owner",),
+                            "type": "missing",
+                            "msg": "Repository has no owner",
+                        }
+                    ],
+                    item=starred_repos[index],
+                )
+            )
+            continue
+
+        ## Rows are built straight from the schemas, no ORM instances are created
+        if github_repo_schema.owner.id not in owner_rows:
+            owner_rows[github_repo_schema.owner.id] = (
+                stars_domain.converters.convert_github_repository_owner_schema_to_db_row(
+                    github_repo_schema.owner
+                )
+            )
+
+        repo_rows.append(
+            stars_domain.converters.convert_github_starred_repo_schema_to_db_row(
+                github_repo_schema
+            )
+        )
+
+    return ConvertedStarsPage(
+        repo_rows=repo_rows, owner_rows=owner_rows, invalid=invalid
+    )
+
+
+def write_converted_page(
+    session_pool: so.sessionmaker[so.Session],
+    starred_repos: list[dict],
+    converted_page: ConvertedStarsPage,
+    owner_identity_map: dict[int, dict[str, t.Any]],
+    snapshot_id: str,
+    page: int | None,
+    chunk_size: int,
+    batch_size: int,
+) -> tuple[int, int]:
+    """Save a page converted by `convert_starred_repos_page()` & its raw API response.
+
+    Description:
+        Saves the raw page, then upserts the page's owners & the repositories that are new or whose
+        content hash changed. Call it from a single writer, i.e. `ingest_starred_repo_pages()` or
+        `save_github_stars()`, so pages are not written concurrently.
+
+    Params:
+        session_pool (sessionmaker[Session]): Session factory to write the page with.
+        starred_repos (list[dict]): The raw page, saved as the API response.
+        converted_page (ConvertedStarsPage): The page converted by `convert_starred_repos_page()`.
+        owner_identity_map (dict[int, dict]): Owner rows already written, keyed by owner ID. Updated in place.
+        snapshot_id (str): ID of the run the raw page is saved under.
+        page (int | None): The page number, or `None` when the repositories are not from a single page.
+        chunk_size (int): Number of rows per statement.
+        batch_size (int): Number of rows per commit.
+
+    Returns:
+        (tuple[int, int]): The number of new & changed repositories written. Invalid repositories are logged & skipped.
+
+    """
+    repo_rows, owner_rows, invalid = converted_page
+
+    if invalid:
+        log.warning(
+            f"Skipping [{len(invalid)}] invalid starred repositor(y/ies). Errors: {[item.model_dump(exclude={'item'}) for item in invalid]}"
+        )
+
+    with session_pool() as session:
+        api_response_repo: stars_domain.GithubStarsAPIResponseRepository = (
+            stars_domain.GithubStarsAPIResponseRepository(session)
+        )
+        gh_repository_repo: stars_domain.GithubStarredRepositoryDBRepository = (
+            stars_domain.GithubStarredRepositoryDBRepository(session)
+        )
+
+        api_response_repo.save_page(starred_repos, snapshot_id=snapshot_id, page=page)
+
+        stored_hashes: dict[str, str | None] = gh_repository_repo.get_content_hashes(
+            {row["node_id"] for row in repo_rows}
+        )
+
+        new_rows: list[dict[str, t.Any]] = []
+        changed_rows: list[dict[str, t.Any]] = []
+
+        for row in repo_rows:
+            if row["node_id"] not in stored_hashes:
+                new_rows.append(row)
+            elif row["content_hash"] != stored_hashes[row["node_id"]]:
+                changed_rows.append(row)
+
+        ## Owners already written during this run with the same values are skipped
+        changed_owner_rows: dict[int, dict[str, t.Any]] = {
+            owner_id: row
+            for owner_id, row in owner_rows.items()
+            if owner_identity_map.get(owner_id) != row
+        }
+
+        gh_repository_repo.bulk_upsert_rows(
+            repo_rows=new_rows,
+            owner_rows=list(changed_owner_rows.values()),
+            chunk_size=chunk_size,
+            batch_size=batch_size,
+        )
+        gh_repository_repo.bulk_update_rows(
+            repo_rows=changed_rows, chunk_size=chunk_size, batch_size=batch_size
+        )
+
+    owner_identity_map.update(changed_owner_rows)
+
+    return len(new_rows), len(changed_rows)
+
+
+def prune_api_response_snapshots(
+    keep: int | None = settings.GITHUB_SETTINGS.get(
+        "GH_API_RESPONSE_SNAPSHOTS_KEEP", default=24
+    ),
+) -> int:
+    """Delete all but the newest `keep` snapshots of raw API responses.
+
+    Params:
+        keep (int | None): Number of sync snapshots to keep. Set the `gh_api_response_snapshots_keep` setting
+            to change the default. When `None`, nothing is pruned.
+
+    Returns:
+        (int): The number of snapshots deleted.
+
+    """
+    if keep is None:
+        return 0
+
+    session_pool = db_depends.get_session_pool()
+
+    with session_pool() as session:
+        api_response_repo: stars_domain.GithubStarsAPIResponseRepository = (
+            stars_domain.GithubStarsAPIResponseRepository(session)
+        )
+
+        try:
+            pruned: int = api_response_repo.prune_snapshots(keep=keep)
+        except Exception as exc:
+            msg = f"({type(exc)}) Error pruning API response snapshots. Details: {exc}"
+            log.error(msg)
+
+            raise
+
+    if pruned:
+        log.info(
+            f"Pruned [{pruned}] API response snapshot(s), keeping the newest {keep}"
+        )
+
+    return pruned
+
+
+def ingest_starred_repo_pages(
+    pages: t.Iterable[list[dict]],
+    workers: int = 0,
+    chunk_size: int = 500,
+    batch_size: int = 2000,
+    keep_snapshots: int | None = settings.GITHUB_SETTINGS.get(
+        "GH_API_RESPONSE_SNAPSHOTS_KEEP", default=24
+    ),
+) -> int:
+    """Validate & convert pages of starred repositories in a process pool, & save them with a single writer.
+
+    Description:
+        Pages are converted with `convert_starred_repos_page()`. Pydantic validation & conversion to column dicts
+        are CPU bound, so with `workers > 0` they are spread across worker processes. The rows are sent back to
+        this process, which is the only database writer, & saved with bulk statements while the workers convert
+        the following pages. Starting the workers costs more than converting a few pages, so by default pages
+        are converted in this process.
+
+        Pages are saved in the order they are read. At most `2 * workers` pages are queued for conversion at
+        once, so a large sync is not held in memory. New repositories are inserted, changed repositories are
+        updated, unchanged repositories are skipped, & each owner is only written once per run.
+
+        The raw pages are saved as one snapshot. Once every page is saved, snapshots older than the newest
+        `keep_snapshots` are pruned.
+
+    Params:
+        pages (Iterable[list[dict]]): Pages of starred repositories from the Github API, i.e. from `iter_starred_repos()`.
+        workers (int): (default: 0) Number of worker processes. With `0`, pages are converted in this process.
+            One less than the number of CPUs leaves one for the writer.
+        chunk_size (int): (default: 500) Max rows per bulk statement.
+        batch_size (int): (default: 2000) Number of repositories written per commit.
+        keep_snapshots (int | None): (default: 24) Number of raw API response snapshots to keep, set with the
+            `gh_api_response_snapshots_keep` setting. When `None`, old snapshots are not pruned.
+
+    Returns:
+        (int): The number of starred repositories read from `pages`.
+
+    Usage:
+        ingest_starred_repo_pages(iter_starred_repos(api_token=api_token), workers=4)
+
+    """
+    if workers < 0:
+        raise ValueError(f"workers must be 0 or greater. Got: {workers}")
+
+    session_pool: so.sessionmaker[so.Session] = db_depends.get_session_pool()
+    owner_identity_map: dict[int, dict[str, t.Any]] = {}
+    snapshot_id: str = str(uuid.uuid4())
+
+    page_count: int = 0
+    repo_count: int = 0
+    new_count: int = 0
+    changed_count: int = 0
+    invalid_count: int = 0
+
+    def _write(starred_repos: list[dict], converted_page: ConvertedStarsPage) -> None:
+        nonlocal page_count, repo_count, new_count, changed_count, invalid_count
+
+        page_count += 1
+        new, changed = write_converted_page(
+            session_pool,
+            starred_repos,
+            converted_page,
+            owner_identity_map,
+            snapshot_id=snapshot_id,
+            page=page_count,
+            chunk_size=chunk_size,
+            batch_size=batch_size,
+        )
+
+        repo_count += len(starred_repos)
+        new_count += new
+        changed_count += changed
+        invalid_count += len(converted_page.invalid)
+
+        log.debug(
+            f"Saved page of [{len(starred_repos)}] starred repositories: {new} new, {changed} changed"
+        )
+
+    if workers == 0:
+        for starred_repos in pages:
+            _write(starred_repos, convert_starred_repos_page(starred_repos))
+    else:
+        ## Spawn fresh interpreters instead of forking, the pages may be requested by a thread pool
+        #  whose locks would be copied into the workers
+        with ProcessPoolExecutor(
+            max_workers=workers, mp_context=multiprocessing.get_context("spawn")
+        ) as pool:
+            pending: deque[tuple[list[dict], Future[ConvertedStarsPage]]] = deque()
+
+            for starred_repos in pages:
+                pending.append(
+                    (
+                        starred_repos,
+                        pool.submit(convert_starred_repos_page, starred_repos),
+                    )
+                )
+
+                if len(pending) >= 2 * workers:
+                    starred_repos, future = pending.popleft()
+                    _write(starred_repos, future.result())
+
+            while pending:
+                starred_repos, future = pending.popleft()
+                _write(starred_repos, future.result())
+
+    prune_api_response_snapshots(keep=keep_snapshots)
+
+    log.info(
+        f"Ingested [{repo_count}] starred repositories: {new_count} new, {changed_count} changed, {invalid_count} invalid, {repo_count - new_count - changed_count - invalid_count} unchanged"
+    )
+
+    return repo_count
@@ -1,29 +1,42 @@
 from __future__ import annotations
 
+import itertools
 import json
 from pathlib import Path
 import typing as t
+import uuid
 
-from controllers import GithubAPIController
+from .pipeline import (
+    ConvertedStarsPage,
+    convert_starred_repos_page,
+    write_converted_page,
+)
+
+from controllers import GithubAPIController, GithubGraphQLController
 from depends import db_depends
 from domain.github import stars as stars_domain
 from loguru import logger as log
 import settings
-import sqlalchemy.exc as sa_exc
 
 
 def get_starred_repos(
     api_token: str = settings.GITHUB_SETTINGS.get("GH_API_TOKEN", default=None),
     use_cache: bool = False,
     cache_ttl: int = 900,
+    parallel: bool = False,
+    max_concurrency: int = 4,
+    use_etags: bool = True,
+    checkpoint: bool = False,
 ):
     gh_api_controller: GithubAPIController = GithubAPIController(
-        api_token=api_token, use_cache=use_cache, cache_ttl=cache_ttl
+        api_token=api_token, use_cache=use_cache, cache_ttl=cache_ttl, use_etags=use_etags
     )
 
     try:
         with gh_api_controller as gh:
-            starred_repos = gh.get_user_stars()
+            starred_repos = gh.get_user_stars(
+                parallel=parallel, max_concurrency=max_concurrency, checkpoint=checkpoint
+            )
         return starred_repos
     except Exception as exc:
         msg = f"({type(exc)}) Unhandled exception getting user's starred repositories. Details: {exc}"
@@ -31,160 +44,226 @@ def get_starred_repos(
         raise
 
 
-def save_github_stars(
-    starred_repos: list[dict],
-) -> list[stars_domain.GithubStarredRepositoryModel]:
-    session_pool = db_depends.get_session_pool()
+def iter_starred_repos(
+    api_token: str = settings.GITHUB_SETTINGS.get("GH_API_TOKEN", default=None),
+    use_cache: bool = False,
+    cache_ttl: int = 900,
+    results_per_page: int = 30,
+    parallel: bool = False,
+    max_concurrency: int = 4,
+    use_etags: bool = True,
+    checkpoint: bool = False,
+) -> t.Generator[list[dict], None, None]:
+    """Yield pages of the authenticated user's starred repositories.
 
-    existing_repos: list[stars_domain.GithubStarredRepositoryModel] | None = []
-    saved_repos: list[stars_domain.GithubStarredRepositoryModel] = []
-    existing_repos: list[stars_domain.GithubStarredRepositoryModel] | None = []
+    Description:
+        Streaming counterpart of `get_starred_repos()`. Each page is yielded as soon as it is
+        decoded, so downstream stages (saving to the database, writing JSON) can consume results
+        incrementally instead of holding every starred repository in memory.
 
-    with session_pool() as session:
-        ## Initialize DB repository classes
-        api_response_repo: stars_domain.GithubStarsAPIResponseRepository = stars_domain.GithubStarsAPIResponseRepository(session)
-        gh_repository_repo: stars_domain.GithubStarredRepositoryDBRepository = stars_domain.GithubStarredRepositoryDBRepository(session)
+    Params:
+        api_token (str): The Github PAT to use with the API.
+        use_cache (bool): (default: False) Use the HTTP cache.
+        cache_ttl (int): (default: 900) Time to live for cached responses.
+        results_per_page (int): (default: 30) Number of repositories per page, between 1 and 100.
+        parallel (bool): (default: False) Request pages concurrently using the `rel="last"` link.
+        max_concurrency (int): (default: 4) Max number of concurrent page requests when `parallel=True`.
+        use_etags (bool): (default: True) Send conditional requests using the `ETag`/`Last-Modified` values
+            stored by previous runs. Unchanged pages are served from storage.
+        checkpoint (bool): (default: False) Save completed pages to disk, so an interrupted run resumes from
+            the first page that was not completed.
 
-        ## Create DB entity for API response
-        db_api_response_model: stars_domain.GithubStarsAPIResponseModel = stars_domain.GithubStarsAPIResponseModel(
-            json_data=starred_repos
-        )
+    Yields:
+        (list[dict]): A page of starred repository dicts.
 
-        log.debug("Saving API response to database")
-        try:
-            db_api_response_model: stars_domain.GithubStarsAPIResponseModel = api_response_repo.create(db_api_response_model)
-        except Exception as e:
-            log.error(
-                f"({type(e)}) Unhandled exception saving API response. Details: {e}"
+    """
+    gh_api_controller: GithubAPIController = GithubAPIController(
+        api_token=api_token, use_cache=use_cache, cache_ttl=cache_ttl, use_etags=use_etags
+    )
+
+    try:
+        with gh_api_controller as gh:
+            yield from gh.iter_user_stars(
+                results_per_page=results_per_page,
+                parallel=parallel,
+                max_concurrency=max_concurrency,
+                checkpoint=checkpoint,
             )
-            raise
+    except Exception as exc:
+        msg = f"({type(exc)}) Unhandled exception getting user's starred repositories. Details: {exc}"
+        log.error(msg)
+        raise
 
-        log.debug(
-            f"Saved API response to database [response_id: {db_api_response_model.id}]"
-        )
 
-        ## Extract all repo IDs from the API response
-        node_ids: set[str] = {repo_data["node_id"] for repo_data in starred_repos}
+def iter_starred_repos_graphql(
+    api_token: str = settings.GITHUB_SETTINGS.get("GH_API_TOKEN", default=None),
+    results_per_page: int = 100,
+) -> t.Generator[list[dict], None, None]:
+    """Yield pages of the authenticated user's starred repositories, using the GraphQL API.
+
+    Description:
+        Only the fields that are saved to the database are requested, 100 repositories per request. Repositories
+        are yielded in the same shape as `iter_starred_repos()`, so pages can be passed to `save_github_stars()`.
+
+    Params:
+        api_token (str): The Github PAT to use with the API.
+        results_per_page (int): (default: 100) Number of repositories per page, between 1 and 100.
+
+    Yields:
+        (list[dict]): A page of starred repository dicts.
 
-        ## Initialize set to hold existing repository IDs
-        #  These IDs come from Github
-        existing_node_ids: set[str] = set()
+    """
+    gh_graphql_controller: GithubGraphQLController = GithubGraphQLController(api_token=api_token)
 
-        ## Loop over nodes and check for existence in DB
-        for _id in node_ids:
-            ## Lookup repo by node_id
-            repo: stars_domain.GithubStarredRepositoryModel = gh_repository_repo.get_by_node_id(node_id=_id)
+    try:
+        with gh_graphql_controller as gh:
+            yield from gh.iter_user_stars(results_per_page=results_per_page)
+    except Exception as exc:
+        msg = f"({type(exc)}) Unhandled exception getting user's starred repositories from the GraphQL API. Details: {exc}"
+        log.error(msg)
+        raise
+
+
+def iter_new_starred_repos(
+    api_token: str = settings.GITHUB_SETTINGS.get("GH_API_TOKEN", default=None),
+    use_cache: bool = False,
+    cache_ttl: int = 900,
+    results_per_page: int = 30,
+    use_etags: bool = True,
+    use_graphql: bool = False,
+) -> t.Generator[list[dict], None, None]:
+    """Yield pages of starred repositories that are not in the database yet.
 
-            if repo:
-                ## Repo exists, add to set
-                existing_node_ids.add(_id)
+    Description:
+        Incremental counterpart of `iter_starred_repos()`. The API returns stars sorted by `created desc`,
+        so every repository after the first one that already exists in `gh_starred_repo` has also been
+        stored by a previous sync. Paging stops as soon as a known `node_id` is found, meaning a sync with
+        no (or only a few) new stars only sends a single request.
 
-        log.debug(
-            f"Found {len(existing_node_ids)} existing repositories in the database."
+        Pages are always requested serially, because requesting them concurrently would fetch pages
+        that are thrown away.
+
+    Params:
+        api_token (str): The Github PAT to use with the API.
+        use_cache (bool): (default: False) Use the HTTP cache.
+        cache_ttl (int): (default: 900) Time to live for cached responses.
+        results_per_page (int): (default: 30) Number of repositories per page, between 1 and 100.
+        use_etags (bool): (default: True) Send conditional requests using stored `ETag`/`Last-Modified` values.
+        use_graphql (bool): (default: False) Request pages from the GraphQL API with `iter_starred_repos_graphql()`.
+            `use_cache` & `use_etags` do not apply to GraphQL requests.
+
+    Yields:
+        (list[dict]): A page of new starred repository dicts. The last page may be partial.
+
+    """
+    session_pool = db_depends.get_session_pool()
+
+    if use_graphql:
+        starred_pages: t.Iterator[list[dict]] = iter_starred_repos_graphql(
+            api_token=api_token, results_per_page=results_per_page
         )
+    else:
+        starred_pages: t.Iterator[list[dict]] = iter_starred_repos(
+            api_token=api_token,
+            use_cache=use_cache,
+            cache_ttl=cache_ttl,
+            results_per_page=results_per_page,
+            parallel=False,
+            use_etags=use_etags,
+        )
+
+    for page in starred_pages:
+        try:
+            with session_pool() as session:
+                gh_repository_repo: stars_domain.GithubStarredRepositoryDBRepository = stars_domain.GithubStarredRepositoryDBRepository(session)
+                existing_node_ids: set[str] = gh_repository_repo.get_existing_node_ids(
+                    repo_data["node_id"] for repo_data in page
+                )
+        except Exception as exc:
+            msg = f"({type(exc)}) Error looking up existing repositories. Details: {exc}"
+            log.error(msg)
+            raise
 
-        if len(existing_node_ids) == 0:
-            log.info("No existing repositories found, committing all")
-        else:
-            ## 1 or more repos exist in database already
-            log.debug(
-                f"Retrieving [{len(existing_node_ids)}] repositor(y/ies) from database"
+        ## Keep repositories up to the first one that was already saved
+        new_repos: list[dict] = list(
+            itertools.takewhile(
+                lambda repo_data: repo_data["node_id"] not in existing_node_ids, page
             )
+        )
 
-            ## Retrieve existing entity from the database
-            for _existing_node_id in existing_node_ids:
-                repo: stars_domain.GithubStarredRepositoryModel = gh_repository_repo.get_by_node_id(node_id=_existing_node_id)
-                existing_repos.append(repo)
+        if new_repos:
+            yield new_repos
 
-        ## Filter out repositories that already exist
-        new_repos_data: list[dict] = [
-            repo_data
-            for repo_data in starred_repos
-            if repo_data["node_id"] not in existing_node_ids
-        ] or []
+        if len(new_repos) < len(page):
+            log.info("Reached a repository that was already saved, stopping incremental sync.")
+            return
 
-        if len(new_repos_data) == 0:
-            log.debug("No new repositories found.")
 
-            ## All repos already exist in the database, return the existing entities
-            return existing_repos
+def save_github_stars(
+    starred_repos: list[dict],
+    chunk_size: int = 500,
+    owner_identity_map: dict[int, dict] | None = None,
+    batch_size: int = 2000,
+    snapshot_id: str | None = None,
+    page: int | None = None,
+) -> list[stars_domain.GithubStarredRepositoryModel]:
+    """Save a page of starred repositories & their owners to the database.
 
-        log.info(f"Processing {len(new_repos_data)} new repositories.")
+    Description:
+        The page is converted with `convert_starred_repos_page()` & written by the same writer as
+        `ingest_starred_repo_pages()`, in this process. Invalid repositories are logged & skipped. New
+        repositories are inserted, changed repositories are updated & unchanged repositories are skipped.
 
-        ## Save new repositories
-        for repo_data in new_repos_data:
-            repo_owner_data: str = repo_data["owner"]
+    Params:
+        starred_repos (list[dict]): Starred repositories from the Github API.
+        chunk_size (int): Max rows per bulk statement. Each chunk is written in its own SAVEPOINT, so a bad
+            row only costs its chunk a retry, not the whole transaction.
+        owner_identity_map (dict[int, dict] | None): Owners already saved during this run, mapping owner ID
+            to the owner row that was saved. Pass the same dict for every page of a sync, owners that
+            were already saved with an identical payload are not validated or written again. The map is
+            updated with the owners saved from this page.
+        batch_size (int): Number of repositories written per commit.
+        snapshot_id (str | None): ID of the sync the page belongs to, shared by every page of the sync. The raw
+            response is saved under this snapshot. A new snapshot is created when not set.
+        page (int | None): The page's number in the sync.
 
-            ## Create owner schema
-            try:
-                repo_owner_schema: stars_domain.GithubRepositoryOwnerIn = stars_domain.GithubRepositoryOwnerIn.model_validate(
-                    repo_owner_data
-                )
-            except Exception as e:
-                msg = f"({type(exc)}) Error validating repository owner schema. Details: {e}"
-                log.error(msg)
-                
-                raise
-             
-            ## Convert owner schema to DB model
-            try:
-                repo_owner: stars_domain.GithubRepositoryOwnerModel = stars_domain.converters.convert_github_repository_owner_schema_to_db_model(
-                    owner=repo_owner_schema
-                )
-            except Exception as exc:
-                msg = f"({type(exc)}) Error converting repository owner schema to DB model. Details: {exc}"
-                log.error(msg)
-                
-                raise
-
-            ## Create starred repository model instance
-            try:
-                github_repo_schema: stars_domain.GithubStarredRepoIn = stars_domain.GithubStarredRepoIn.model_validate(
-                    repo_data
-                )
-            except Exception as e:
-                msg = f"({type(exc)}) Error validating starred repository schema. Details: {e}"
-                log.error(msg)
-                
-                raise
-            
-            ## Convert starred repository schema to DB model
-            try:
-                github_repo: stars_domain.GithubStarredRepositoryModel = (
-                    stars_domain.converters.convert_github_starred_repo_schema_to_db_model(
-                        github_repo_schema
-                    )
-                )
-            except Exception as exc:
-                msg = f"({type(exc)}) Error converting starred repository schema to DB model. Details: {exc}"
-                log.error(msg)
-                
-                raise
-
-            # Save to database using repository class
-            try:
-                saved_repo: stars_domain.GithubStarredRepositoryModel = gh_repository_repo.create_or_get_repo(
-                    github_repo, repo_owner
-                )
-                saved_repos.append(saved_repo)
-                
-            except sa_exc.IntegrityError as exc:
-                log.debug(
-                    f"IntegrityError: Repository '{repo_data['name']}' already exists. Skipping save."
-                )
-                session.rollback()
-                
-                continue
-            
-            except Exception as exc:
-                log.error(
-                    f"({type(exc)}) Unhandled exception saving repository. Details: {exc}"
-                )
-                raise
+    Returns:
+        (list[GithubStarredRepositoryModel]): The new & existing repositories from `starred_repos`.
+
+    """
+    if owner_identity_map is None:
+        owner_identity_map = {}
+
+    session_pool = db_depends.get_session_pool()
+
+    converted_page: ConvertedStarsPage = convert_starred_repos_page(starred_repos)
+
+    try:
+        new_count, changed_count = write_converted_page(
+            session_pool,
+            starred_repos,
+            converted_page,
+            owner_identity_map,
+            snapshot_id=snapshot_id or str(uuid.uuid4()),
+            page=page,
+            chunk_size=chunk_size,
+            batch_size=batch_size,
+        )
+    except Exception as exc:
+        msg = f"({type(exc)}) Unhandled exception saving repositories. Details: {exc}"
+        log.error(msg)
+        raise
 
-            log.debug(f"Saved repository: {saved_repo.name} (ID: {saved_repo.repo_id})")
+    log.info(
+        f"Saved {new_count} new & {changed_count} changed repositories, skipped {len(converted_page.repo_rows) - new_count - changed_count} unchanged."
+    )
 
-    ## Join saved_repos and existing
-    saved_repos: list[stars_domain.GithubStarredRepositoryModel] = saved_repos + existing_repos
+    ## Load the new & existing repositories from the page to return them
+    with session_pool() as session:
+        gh_repository_repo: stars_domain.GithubStarredRepositoryDBRepository = stars_domain.GithubStarredRepositoryDBRepository(session)
+
+        saved_repos: list[stars_domain.GithubStarredRepositoryModel] = list(
+            gh_repository_repo.get_by_node_ids({row["node_id"] for row in converted_page.repo_rows}).values()
+        )
 
     return saved_repos
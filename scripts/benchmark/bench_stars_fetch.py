@@ -0,0 +1,371 @@
+"""Benchmark the starred repositories fetch pipeline against a local stand-in for the Github API.
+
+Measures pages/sec, repositories/sec & peak memory of fetching every page of starred repositories,
+for each fetch mode (serial, parallel & async), at 1k, 10k & 100k stars by default. No requests leave
+the machine, see `mock_github.py`.
+
+Pass `--end-to-end` to also time a full sync, fetching & saving every repository into a throwaway
+SQLite database, once saving each page as it arrives & once with the process pool ingestion pipeline.
+Pass `--etags` to repeat each fetch with the stored ETags, measuring a sync where
+nothing changed.
+
+Usage:
+    python scripts/benchmark/bench_stars_fetch.py
+    python scripts/benchmark/bench_stars_fetch.py --sizes 1000 10000 --modes serial async --latency 0.1
+    python scripts/benchmark/bench_stars_fetch.py --sizes 10000 --end-to-end
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+from dataclasses import dataclass
+import os
+from pathlib import Path
+import tempfile
+import time
+import tracemalloc
+import typing as t
+
+from mock_github import MockGithubAPI
+
+MODES: list[str] = ["serial", "parallel", "async"]
+MOCK_API_TOKEN: str = "mock-benchmark-token"
+
+
+@dataclass
+class BenchmarkResult:
+    name: str
+    stars: int
+    pages: int
+    repos: int
+    elapsed: float
+    peak_memory: int | None
+
+    @property
+    def pages_per_sec(self) -> float:
+        return self.pages / self.elapsed if self.elapsed else 0.0
+
+    @property
+    def repos_per_sec(self) -> float:
+        return self.repos / self.elapsed if self.elapsed else 0.0
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Benchmark fetching starred repositories from a local stand-in for the Github API."
+    )
+    parser.add_argument(
+        "--sizes",
+        type=int,
+        nargs="+",
+        default=[1_000, 10_000, 100_000],
+        help="Numbers of starred repositories to benchmark.",
+    )
+    parser.add_argument(
+        "--modes",
+        nargs="+",
+        choices=MODES,
+        default=MODES,
+        help="Fetch modes to benchmark.",
+    )
+    parser.add_argument(
+        "--per-page", type=int, default=100, help="Repositories per page (max 100)."
+    )
+    parser.add_argument(
+        "--latency",
+        type=float,
+        default=0.05,
+        help="Seconds each response is delayed by.",
+    )
+    parser.add_argument(
+        "--jitter", type=float, default=0.0, help="Max random seconds added to latency."
+    )
+    parser.add_argument(
+        "--max-concurrency",
+        type=int,
+        default=8,
+        help="Max concurrent page requests in the parallel & async modes.",
+    )
+    parser.add_argument(
+        "--etags",
+        action="store_true",
+        help="Repeat each fetch with stored ETags, where every page is answered with a 304.",
+    )
+    parser.add_argument(
+        "--end-to-end",
+        action="store_true",
+        help="Also time fetching & saving every repository to a throwaway SQLite database.",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=0,
+        help="Worker processes for the end-to-end ingestion pipeline. 0 converts pages in the writer process.",
+    )
+    parser.add_argument(
+        "--no-memory",
+        action="store_true",
+        help="Do not trace memory. tracemalloc slows down the benchmark, disable it for more accurate timings.",
+    )
+
+    return parser.parse_args()
+
+
+def measure(
+    name: str,
+    mock_api: MockGithubAPI,
+    run: t.Callable[[], int],
+    trace_memory: bool = True,
+) -> BenchmarkResult:
+    """Time a benchmark run & record its peak memory.
+
+    Params:
+        name (str): Name of the run, shown in the results table.
+        mock_api (MockGithubAPI): The stand-in API the run sends requests to.
+        run (Callable[[], int]): Function that runs the benchmark & returns the number of repositories fetched.
+        trace_memory (bool): Record peak memory with tracemalloc.
+
+    """
+    mock_api.reset_stats()
+
+    if trace_memory:
+        tracemalloc.start()
+
+    start: float = time.perf_counter()
+    try:
+        repos: int = run()
+        elapsed: float = time.perf_counter() - start
+    finally:
+        if trace_memory:
+            _, peak_memory = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+        else:
+            peak_memory = None
+
+    return BenchmarkResult(
+        name=name,
+        stars=mock_api.total_stars,
+        pages=mock_api.request_count,
+        repos=repos,
+        elapsed=elapsed,
+        peak_memory=peak_memory,
+    )
+
+
+def fetch_stars(
+    mock_api: MockGithubAPI,
+    per_page: int,
+    parallel: bool,
+    max_concurrency: int,
+    use_etags: bool,
+    on_page: t.Callable[[list[dict]], None] | None = None,
+) -> int:
+    from controllers import GithubAPIController
+
+    repos: int = 0
+
+    with GithubAPIController(
+        api_token=MOCK_API_TOKEN,
+        use_cache=False,
+        use_etags=use_etags,
+        transport=mock_api.transport(),
+    ) as gh:
+        for page in gh.iter_user_stars(
+            results_per_page=per_page,
+            parallel=parallel,
+            max_concurrency=max_concurrency,
+        ):
+            repos += len(page)
+
+            if on_page:
+                on_page(page)
+
+    return repos
+
+
+def fetch_stars_async(
+    mock_api: MockGithubAPI, per_page: int, max_concurrency: int, use_etags: bool
+) -> int:
+    from controllers import AsyncGithubAPIController
+
+    async def _fetch() -> int:
+        repos: int = 0
+
+        async with AsyncGithubAPIController(
+            api_token=MOCK_API_TOKEN,
+            use_cache=False,
+            use_etags=use_etags,
+            transport=mock_api.async_transport(),
+        ) as gh:
+            async for page in gh.iter_user_stars(
+                results_per_page=per_page,
+                parallel=True,
+                max_concurrency=max_concurrency,
+            ):
+                repos += len(page)
+
+        return repos
+
+    return asyncio.run(_fetch())
+
+
+def run_fetch_benchmarks(
+    args: argparse.Namespace, stars: int, etag_dir: Path
+) -> list[BenchmarkResult]:
+    results: list[BenchmarkResult] = []
+
+    for mode in args.modes:
+        mock_api: MockGithubAPI = MockGithubAPI(
+            total_stars=stars, latency=args.latency, jitter=args.jitter
+        )
+
+        if mode == "async":
+
+            def run() -> int:
+                return fetch_stars_async(
+                    mock_api, args.per_page, args.max_concurrency, args.etags
+                )
+
+        else:
+
+            def run() -> int:
+                return fetch_stars(
+                    mock_api,
+                    args.per_page,
+                    parallel=mode == "parallel",
+                    max_concurrency=args.max_concurrency,
+                    use_etags=args.etags,
+                )
+
+        ## Each run starts without stored ETags, so the cold fetch downloads every page
+        for etag_db in etag_dir.glob("*.sqlite3"):
+            etag_db.unlink()
+
+        results.append(measure(mode, mock_api, run, trace_memory=not args.no_memory))
+
+        if args.etags:
+            results.append(
+                measure(
+                    f"{mode} (etags)", mock_api, run, trace_memory=not args.no_memory
+                )
+            )
+
+    return results
+
+
+def run_end_to_end_benchmark(
+    args: argparse.Namespace, stars: int, db_file: Path
+) -> list[BenchmarkResult]:
+    from controllers import GithubAPIController
+    import db_lib as db
+    from depends import db_depends
+    from gh_client import ingest_starred_repo_pages, save_github_stars
+    import setup
+
+    def reset_database() -> None:
+        ## Start each run from empty tables
+        engine = db_depends.get_db_engine()
+        db.Base.metadata.drop_all(bind=engine)
+        setup.setup_database(engine=engine)
+
+    mock_api: MockGithubAPI = MockGithubAPI(
+        total_stars=stars, latency=args.latency, jitter=args.jitter
+    )
+
+    def run() -> int:
+        ## Owners saved during the sync, shared across pages like the CLI does
+        owner_identity_map: dict[int, dict] = {}
+
+        return fetch_stars(
+            mock_api,
+            args.per_page,
+            parallel=False,
+            max_concurrency=args.max_concurrency,
+            use_etags=False,
+            on_page=lambda page: save_github_stars(
+                page, owner_identity_map=owner_identity_map
+            ),
+        )
+
+    def run_pipeline() -> int:
+        with GithubAPIController(
+            api_token=MOCK_API_TOKEN,
+            use_cache=False,
+            use_etags=False,
+            transport=mock_api.transport(),
+        ) as gh:
+            return ingest_starred_repo_pages(
+                gh.iter_user_stars(results_per_page=args.per_page),
+                workers=args.workers,
+            )
+
+    results: list[BenchmarkResult] = []
+
+    reset_database()
+    results.append(
+        measure("end-to-end", mock_api, run, trace_memory=not args.no_memory)
+    )
+
+    reset_database()
+    results.append(
+        measure(
+            "end-to-end pipeline",
+            mock_api,
+            run_pipeline,
+            trace_memory=not args.no_memory,
+        )
+    )
+
+    return results
+
+
+def print_results(results: list[BenchmarkResult]) -> None:
+    header: str = f"{'stars':>8}  {'mode':<20} {'pages':>6} {'repos':>8} {'seconds':>9} {'pages/s':>9} {'repos/s':>10} {'peak MiB':>9}"
+    print(header)
+    print("-" * len(header))
+
+    for result in results:
+        peak: str = (
+            f"{result.peak_memory / 1024 / 1024:9.1f}"
+            if result.peak_memory is not None
+            else f"{'-':>9}"
+        )
+        print(
+            f"{result.stars:>8}  {result.name:<20} {result.pages:>6} {result.repos:>8} {result.elapsed:>9.2f} {result.pages_per_sec:>9.1f} {result.repos_per_sec:>10.0f} {peak}"
+        )
+
+
+if __name__ == "__main__":
+    args = parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="mygh-bench-") as tmp_dir:
+        ## Send the app's database to a throwaway file. Settings are read when the project's
+        #  packages are imported, so this must happen before importing them.
+        db_file: Path = Path(tmp_dir, "bench.sqlite3")
+        os.environ["DB_DB_TYPE"] = "sqlite"
+        os.environ["DB_DB_DRIVERNAME"] = "sqlite+pysqlite"
+        os.environ["DB_DB_DATABASE"] = str(db_file)
+
+        import controllers  # noqa: F401
+        from domain.github.stars import models  # noqa: F401
+        import gh_client  # noqa: F401
+        import setup
+
+        ## The ETag store is created relative to the working directory, keep it out of the project's cache
+        os.chdir(tmp_dir)
+
+        setup.setup_loguru_logging(log_level="WARNING", colorize=True)
+
+        results: list[BenchmarkResult] = []
+        for stars in args.sizes:
+            print(f"Benchmarking {stars} starred repositories ...")
+
+            results += run_fetch_benchmarks(
+                args, stars, Path(tmp_dir, ".cache", "http")
+            )
+            if args.end_to_end:
+                results += run_end_to_end_benchmark(args, stars, db_file)
+
+        print()
+        print_results(results)
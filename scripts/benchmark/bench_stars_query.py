@@ -0,0 +1,222 @@
+"""Benchmark filtering, sorting & paging saved starred repositories, the queries behind `/stars/all`.
+
+Fills a throwaway SQLite database with synthetic starred repositories (see `mock_github.py`), then for
+each filter & sort combination the API accepts, pages through the results with keyset cursors. Prints
+the time of the first page, the mean of every page & the time of the last page, so a deep page can be
+compared with the first, and the query plan SQLite chose for it.
+
+A plan that reads `gh_starred_repo` without one of its indexes is flagged as a full table scan.
+
+Usage:
+    python scripts/benchmark/bench_stars_query.py
+    python scripts/benchmark/bench_stars_query.py --stars 10000 --pages 20 --page-size 50
+"""
+
+from __future__ import annotations
+
+import argparse
+from dataclasses import dataclass, field
+import os
+from pathlib import Path
+import statistics
+import tempfile
+import time
+import typing as t
+
+from mock_github import make_repo
+
+## Filter & sort combinations to benchmark, as the params of `GithubStarredRepositoryDBRepository.get_page()`
+QUERY_CASES: dict[str, dict[str, t.Any]] = {
+    "repo_id asc": {},
+    "stars desc": {"sort": "stars", "descending": True},
+    "forks desc": {"sort": "forks", "descending": True},
+    "name asc": {"sort": "name"},
+    "updated desc": {"sort": "updated", "descending": True},
+    "language": {"language": "Rust"},
+    "language, stars desc": {"language": "Rust", "sort": "stars", "descending": True},
+    "min_stars, stars desc": {
+        "min_stars": 100,
+        "sort": "stars",
+        "descending": True,
+    },
+    "archived": {"archived": True},
+    "topic": {"topic": "homelab"},
+    "topic, stars desc": {"topic": "homelab", "sort": "stars", "descending": True},
+}
+
+
+@dataclass
+class QueryResult:
+    name: str
+    pages: int
+    repos: int
+    page_times: list[float] = field(default_factory=list)
+    plan: list[str] = field(default_factory=list)
+
+    @property
+    def full_scan(self) -> bool:
+        return any(
+            line.startswith("SCAN gh_starred_repo") and "INDEX" not in line
+            for line in self.plan
+        )
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Benchmark filtering, sorting & paging saved starred repositories."
+    )
+    parser.add_argument(
+        "--stars",
+        type=int,
+        default=100_000,
+        help="Number of starred repositories to save before querying.",
+    )
+    parser.add_argument(
+        "--page-size", type=int, default=100, help="Repositories per page."
+    )
+    parser.add_argument(
+        "--pages",
+        type=int,
+        default=100,
+        help="Max number of pages to walk for each query.",
+    )
+    parser.add_argument(
+        "--cases",
+        nargs="+",
+        choices=list(QUERY_CASES),
+        default=list(QUERY_CASES),
+        help="Queries to benchmark.",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=0,
+        help="Worker processes for saving the repositories. 0 converts pages in the writer process.",
+    )
+
+    return parser.parse_args()
+
+
+def fill_database(stars: int, workers: int) -> None:
+    """Save `stars` synthetic repositories to the database, 100 per page."""
+    from gh_client import ingest_starred_repo_pages
+
+    def _iter_pages() -> t.Iterator[list[dict]]:
+        for start in range(1, stars + 1, 100):
+            yield [
+                make_repo(repo_id)
+                for repo_id in range(start, min(start + 100, stars + 1))
+            ]
+
+    ingest_starred_repo_pages(_iter_pages(), workers=workers, keep_snapshots=1)
+
+
+def run_query(
+    name: str, params: dict[str, t.Any], page_size: int, max_pages: int
+) -> QueryResult:
+    """Walk the pages of one query with keyset cursors, timing each page & recording the query plan."""
+    from depends import db_depends
+    from domain.github import stars as stars_domain
+    import sqlalchemy as sa
+
+    engine = db_depends.get_db_engine()
+    session_pool = db_depends.get_session_pool(engine=engine)
+    result: QueryResult = QueryResult(name=name, pages=0, repos=0)
+
+    ## Capture the SELECT each page runs, to ask SQLite for its plan afterwards
+    statements: list[tuple[str, t.Any]] = []
+
+    def _capture(conn, cursor, statement, parameters, context, executemany) -> None:
+        if (
+            statement.lstrip().upper().startswith("SELECT")
+            and "gh_starred_repo" in statement
+        ):
+            statements.append((statement, parameters))
+
+    sa.event.listen(engine, "before_cursor_execute", _capture)
+
+    try:
+        with session_pool() as session:
+            repo = stars_domain.GithubStarredRepositoryDBRepository(session)
+            after: list[t.Any] | None = None
+
+            while result.pages < max_pages:
+                statements.clear()
+
+                start: float = time.perf_counter()
+                page = repo.get_page(limit=page_size, after=after, **params)
+                result.page_times.append(time.perf_counter() - start)
+
+                result.pages += 1
+                result.repos += len(page)
+
+                if len(page) < page_size:
+                    break
+
+                after = stars_domain.get_sort_key(
+                    page[-1], params.get("sort", "repo_id")
+                )
+
+                ## Expunge the page, so the session does not keep every walked repository in memory
+                session.expunge_all()
+    finally:
+        sa.event.remove(engine, "before_cursor_execute", _capture)
+
+    if statements:
+        statement, parameters = statements[0]
+        with engine.connect() as conn:
+            result.plan = [
+                row[-1]
+                for row in conn.exec_driver_sql(
+                    f"EXPLAIN QUERY PLAN {statement}", parameters
+                )
+            ]
+
+    return result
+
+
+def print_results(results: list[QueryResult]) -> None:
+    header: str = f"{'query':<24} {'pages':>6} {'repos':>8} {'first ms':>9} {'mean ms':>8} {'last ms':>8}  plan"
+    print(header)
+    print("-" * len(header))
+
+    for result in results:
+        print(
+            f"{result.name:<24} {result.pages:>6} {result.repos:>8} {result.page_times[0] * 1000:>9.1f} {statistics.mean(result.page_times) * 1000:>8.1f} {result.page_times[-1] * 1000:>8.1f}  {'FULL TABLE SCAN' if result.full_scan else 'indexed'}"
+        )
+        for line in result.plan:
+            print(f"{'':<24}   {line}")
+
+
+if __name__ == "__main__":
+    args = parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="mygh-bench-") as tmp_dir:
+        ## Send the app's database to a throwaway file. Settings are read when the project's
+        #  packages are imported, so this must happen before importing them.
+        db_file: Path = Path(tmp_dir, "bench.sqlite3")
+        os.environ["DB_DB_TYPE"] = "sqlite"
+        os.environ["DB_DB_DRIVERNAME"] = "sqlite+pysqlite"
+        os.environ["DB_DB_DATABASE"] = str(db_file)
+
+        from domain.github.stars import models  # noqa: F401
+        import gh_client  # noqa: F401
+        import setup
+
+        os.chdir(tmp_dir)
+
+        setup.setup_loguru_logging(log_level="WARNING", colorize=True)
+        setup.setup_database()
+
+        print(f"Saving {args.stars} starred repositories ...")
+        start: float = time.perf_counter()
+        fill_database(args.stars, args.workers)
+        print(f"Saved in {time.perf_counter() - start:.1f}s")
+        print()
+
+        results: list[QueryResult] = [
+            run_query(name, QUERY_CASES[name], args.page_size, args.pages)
+            for name in args.cases
+        ]
+
+        print_results(results)
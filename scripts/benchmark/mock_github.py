@@ -0,0 +1,512 @@
+"""Local stand-in for the Github API's starred repositories endpoints.
+
+Serves synthetic `/user/starred` pages shaped like the real API's responses, with `Link`, `ETag` &
+`X-RateLimit-*` headers and a configurable response latency. Requests never leave the process: pass
+`MockGithubAPI.transport()` (or `async_transport()`) to a controller's `transport` param.
+
+Usage:
+    mock_api = MockGithubAPI(total_stars=10_000, latency=0.05)
+
+    with GithubAPIController(api_token="mock", use_cache=False, transport=mock_api.transport()) as gh:
+        for page in gh.iter_user_stars(results_per_page=100):
+            ...
+"""
+
+from __future__ import annotations
+
+import asyncio
+from collections import OrderedDict
+import datetime as dt
+import hashlib
+import json
+import random
+import threading
+import time
+import typing as t
+
+import httpx
+
+__all__ = ["MockGithubAPI"]
+
+API_BASE_URL: str = "https://api.github.com"
+HTML_BASE_URL: str = "https://github.com"
+
+## URL template suffixes of a repository object, in the order the Github API returns them
+REPO_URL_TEMPLATES: dict[str, str] = {
+    "forks_url": "/forks",
+    "keys_url": "/keys{/key_id}",
+    "collaborators_url": "/collaborators{/collaborator}",
+    "teams_url": "/teams",
+    "hooks_url": "/hooks",
+    "issue_events_url": "/issues/events{/number}",
+    "events_url": "/events",
+    "assignees_url": "/assignees{/user}",
+    "branches_url": "/branches{/branch}",
+    "tags_url": "/tags",
+    "blobs_url": "/git/blobs{/sha}",
+    "git_tags_url": "/git/tags{/sha}",
+    "git_refs_url": "/git/refs{/sha}",
+    "trees_url": "/git/trees{/sha}",
+    "statuses_url": "/statuses/{sha}",
+    "languages_url": "/languages",
+    "stargazers_url": "/stargazers",
+    "contributors_url": "/contributors",
+    "subscribers_url": "/subscribers",
+    "subscription_url": "/subscription",
+    "commits_url": "/commits{/sha}",
+    "git_commits_url": "/git/commits{/sha}",
+    "comments_url": "/comments{/number}",
+    "issue_comment_url": "/issues/comments{/number}",
+    "contents_url": "/contents/{+path}",
+    "compare_url": "/compare/{base}...{head}",
+    "merges_url": "/merges",
+    "archive_url": "/{archive_format}{/ref}",
+    "downloads_url": "/downloads",
+    "issues_url": "/issues{/number}",
+    "pulls_url": "/pulls{/number}",
+    "milestones_url": "/milestones{/number}",
+    "notifications_url": "/notifications{?since,all,participating}",
+    "labels_url": "/labels{/name}",
+    "releases_url": "/releases{/id}",
+    "deployments_url": "/deployments",
+}
+
+LANGUAGES: list[str | None] = ["Python", "Go", "Rust", "TypeScript", "C", "Shell", None]
+TOPICS: list[str] = ["cli", "python", "database", "http", "api", "devops", "homelab"]
+LICENSES: list[dict[str, str] | None] = [
+    {
+        "key": "mit",
+        "name": "MIT License",
+        "spdx_id": "MIT",
+        "node_id": "MDc6TGljZW5zZTEz",
+    },
+    {
+        "key": "apache-2.0",
+        "name": "Apache License 2.0",
+        "spdx_id": "Apache-2.0",
+        "node_id": "MDc6TGljZW5zZTI=",
+    },
+    None,
+]
+
+## Oldest synthetic star, repositories are starred one hour apart after this
+EPOCH: dt.datetime = dt.datetime(2015, 1, 1, tzinfo=dt.timezone.utc)
+
+
+def _timestamp(value: dt.datetime) -> str:
+    return value.strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def make_owner(owner_id: int) -> dict[str, t.Any]:
+    """Build a synthetic repository owner, shaped like the Github API's simple user object."""
+    login: str = f"owner-{owner_id}"
+    url: str = f"{API_BASE_URL}/users/{login}"
+
+    return {
+        "login": login,
+        "id": 100_000 + owner_id,
+        "node_id": f"U_mock{owner_id}",
+        "avatar_url": f"https://avatars.githubusercontent.com/u/{100_000 + owner_id}?v=4",
+        "gravatar_id": "",
+        "url": url,
+        "html_url": f"{HTML_BASE_URL}/{login}",
+        "followers_url": f"{url}/followers",
+        "following_url": f"{url}/following{{/other_user}}",
+        "gists_url": f"{url}/gists{{/gist_id}}",
+        "starred_url": f"{url}/starred{{/owner}}{{/repo}}",
+        "subscriptions_url": f"{url}/subscriptions",
+        "organizations_url": f"{url}/orgs",
+        "repos_url": f"{url}/repos",
+        "events_url": f"{url}/events{{/privacy}}",
+        "received_events_url": f"{url}/received_events",
+        "type": "Organization" if owner_id % 4 == 0 else "User",
+        "user_view_type": "public",
+        "site_admin": False,
+    }
+
+
+def make_repo(repo_id: int, owner_count: int = 500) -> dict[str, t.Any]:
+    """Build a synthetic starred repository, shaped like the Github API's repository object.
+
+    Params:
+        repo_id (int): The repository's ID. The same ID always builds the same repository.
+        owner_count (int): Number of distinct owners repositories are spread across.
+
+    Returns:
+        (dict): The repository object.
+
+    """
+    ## Seeded per repository, so a repository is identical on every request
+    rng: random.Random = random.Random(repo_id)
+    owner: dict[str, t.Any] = make_owner(repo_id % owner_count)
+    name: str = f"repo-{repo_id}"
+    full_name: str = f"{owner['login']}/{name}"
+    api_url: str = f"{API_BASE_URL}/repos/{full_name}"
+    html_url: str = f"{HTML_BASE_URL}/{full_name}"
+
+    created_at: dt.datetime = EPOCH + dt.timedelta(hours=repo_id)
+    pushed_at: dt.datetime = created_at + dt.timedelta(days=rng.randint(1, 900))
+    stargazers: int = int(rng.paretovariate(1.2) * 10)
+    forks: int = stargazers // rng.randint(3, 20)
+    open_issues: int = rng.randint(0, 150)
+    license: dict[str, str] | None = rng.choice(LICENSES)
+
+    repo: dict[str, t.Any] = {
+        "id": repo_id,
+        "node_id": f"R_mock{repo_id}",
+        "name": name,
+        "full_name": full_name,
+        "private": False,
+        "owner": owner,
+        "html_url": html_url,
+        "description": f"Synthetic repository #{repo_id} served by the local Github API stand-in",
+        "fork": rng.random() < 0.1,
+        "url": api_url,
+    }
+    repo.update(
+        {key: f"{api_url}{suffix}" for key, suffix in REPO_URL_TEMPLATES.items()}
+    )
+    repo.update(
+        {
+            "created_at": _timestamp(created_at),
+            "updated_at": _timestamp(pushed_at + dt.timedelta(days=1)),
+            "pushed_at": _timestamp(pushed_at),
+            "git_url": f"git://github.com/{full_name}.git",
+            "ssh_url": f"git@github.com:{full_name}.git",
+            "clone_url": f"{html_url}.git",
+            "svn_url": html_url,
+            "homepage": f"https://{name}.example.com" if rng.random() < 0.3 else None,
+            "size": rng.randint(10, 500_000),
+            "stargazers_count": stargazers,
+            "watchers_count": stargazers,
+            "language": rng.choice(LANGUAGES),
+            "has_issues": True,
+            "has_projects": rng.random() < 0.5,
+            "has_downloads": True,
+            "has_wiki": rng.random() < 0.5,
+            "has_pages": rng.random() < 0.2,
+            "has_discussions": rng.random() < 0.2,
+            "forks_count": forks,
+            "mirror_url": None,
+            "archived": rng.random() < 0.05,
+            "disabled": False,
+            "open_issues_count": open_issues,
+            "license": (
+                {**license, "url": f"{API_BASE_URL}/licenses/{license['key']}"}
+                if license
+                else None
+            ),
+            "allow_forking": True,
+            "is_template": False,
+            "web_commit_signoff_required": False,
+            "topics": sorted(rng.sample(TOPICS, rng.randint(0, 4))),
+            "visibility": "public",
+            "forks": forks,
+            "open_issues": open_issues,
+            "watchers": stargazers,
+            "default_branch": "main",
+            "permissions": {
+                "admin": False,
+                "maintain": False,
+                "push": False,
+                "triage": False,
+                "pull": True,
+            },
+        }
+    )
+
+    return repo
+
+
+class MockGithubAPI:
+    """In-process stand-in for the Github API's `/user/starred` & `/user` endpoints.
+
+    Description:
+        Starred repositories are generated on request, newest star first, so large accounts do not
+        need to be held in memory. Pages honor `per_page` (max 100) & `page`, and responses include:
+
+        - `Link` headers with `next`, `prev`, `first` & `last` relations, built from the request URL.
+        - A weak `ETag` for each page. A request with a matching `If-None-Match` gets `304 Not Modified`,
+          which does not count against the rate limit.
+        - `X-RateLimit-*` headers, tracked separately for each `Authorization` header. Once the limit is
+          used up, requests get a `403` rate limit response until the window resets.
+
+        Each response is delayed by `latency` seconds, plus up to `jitter` seconds. The async transport
+        uses `asyncio.sleep()`, so concurrent requests overlap like they would against the real API.
+
+        The API is thread safe, one instance can serve a thread pool of requests.
+
+    Params:
+        total_stars (int): (default: 1000) Number of repositories the account has starred.
+        latency (float): (default: 0.05) Seconds each response is delayed by.
+        jitter (float): (default: 0.0) Max random seconds added to `latency`.
+        rate_limit (int): (default: 5000) Requests allowed per rate limit window, per token.
+        rate_limit_window (int): (default: 3600) Length of a rate limit window in seconds.
+        owner_count (int): (default: 500) Number of distinct owners repositories are spread across.
+        page_cache_size (int): (default: 32) Number of encoded pages kept in memory, so repeat requests
+            for a page do not regenerate it.
+
+    """
+
+    def __init__(
+        self,
+        total_stars: int = 1000,
+        latency: float = 0.05,
+        jitter: float = 0.0,
+        rate_limit: int = 5000,
+        rate_limit_window: int = 3600,
+        owner_count: int = 500,
+        page_cache_size: int = 32,
+    ):
+        if total_stars < 0:
+            raise ValueError(f"total_stars must be 0 or greater. Got: {total_stars}")
+
+        self.total_stars: int = total_stars
+        self.latency: float = latency
+        self.jitter: float = jitter
+        self.rate_limit: int = rate_limit
+        self.rate_limit_window: int = rate_limit_window
+        self.owner_count: int = owner_count
+        self.page_cache_size: int = page_cache_size
+
+        ## Request counters, read them to check what a benchmark sent
+        self.request_count: int = 0
+        self.not_modified_count: int = 0
+        self.rate_limited_count: int = 0
+        self.bytes_sent: int = 0
+
+        ## Remaining requests & window reset time, keyed by Authorization header
+        self._rate_limits: dict[str, tuple[int, int]] = {}
+        ## Encoded pages & their ETags, keyed by (per_page, page)
+        self._pages: OrderedDict[tuple[int, int], tuple[bytes, str]] = OrderedDict()
+        ## ETags of every page served, so a 304 does not need to regenerate the page
+        self._etags: dict[tuple[int, int], str] = {}
+        self._lock: threading.Lock = threading.Lock()
+
+    def add_stars(self, count: int) -> None:
+        """Star `count` new repositories. They are returned first, like new stars on the real API."""
+        with self._lock:
+            self.total_stars += count
+            ## Every page shifts, so every ETag changes
+            self._pages.clear()
+            self._etags.clear()
+
+    def reset_stats(self) -> None:
+        """Reset the request counters & rate limits."""
+        with self._lock:
+            self.request_count = 0
+            self.not_modified_count = 0
+            self.rate_limited_count = 0
+            self.bytes_sent = 0
+            self._rate_limits.clear()
+
+    def transport(self) -> httpx.MockTransport:
+        """Return a transport for an `httpx.Client`, i.e. `GithubAPIController(transport=...)`."""
+        return httpx.MockTransport(self.handle_request)
+
+    def async_transport(self) -> httpx.MockTransport:
+        """Return a transport for an `httpx.AsyncClient`, i.e. `AsyncGithubAPIController(transport=...)`."""
+        return httpx.MockTransport(self.handle_async_request)
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        """Handle a request, blocking for the configured latency."""
+        delay: float = self._get_delay()
+        if delay > 0:
+            time.sleep(delay)
+
+        return self._build_response(request)
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        """Handle a request, awaiting the configured latency."""
+        delay: float = self._get_delay()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+        return self._build_response(request)
+
+    def _get_delay(self) -> float:
+        return self.latency + (random.uniform(0, self.jitter) if self.jitter else 0.0)
+
+    def _take_rate_limit(
+        self, request: httpx.Request, counts: bool
+    ) -> tuple[dict[str, str], bool]:
+        """Take a request from the token's rate limit.
+
+        Returns:
+            (tuple[dict[str, str], bool]): The `X-RateLimit-*` headers, and `True` if the request is allowed.
+
+        """
+        key: str = request.headers.get("Authorization", "")
+        now: int = int(time.time())
+
+        with self._lock:
+            remaining, reset = self._rate_limits.get(
+                key, (self.rate_limit, now + self.rate_limit_window)
+            )
+            if now >= reset:
+                remaining, reset = self.rate_limit, now + self.rate_limit_window
+
+            allowed: bool = remaining > 0
+            if allowed and counts:
+                remaining -= 1
+
+            self._rate_limits[key] = (remaining, reset)
+
+        headers: dict[str, str] = {
+            "X-RateLimit-Limit": str(self.rate_limit),
+            "X-RateLimit-Remaining": str(remaining),
+            "X-RateLimit-Reset": str(reset),
+            "X-RateLimit-Used": str(self.rate_limit - remaining),
+            "X-RateLimit-Resource": "core",
+        }
+
+        return headers, allowed
+
+    def _get_page(self, per_page: int, page: int) -> tuple[bytes, str]:
+        """Return an encoded page of starred repositories & its ETag."""
+        cache_key: tuple[int, int] = (per_page, page)
+
+        with self._lock:
+            if cache_key in self._pages:
+                self._pages.move_to_end(cache_key)
+                return self._pages[cache_key]
+
+            total_stars: int = self.total_stars
+
+        ## Newest star first, the most recently starred repository has the highest ID
+        start: int = (page - 1) * per_page
+        repo_ids: range = range(
+            total_stars - 1 - start, max(total_stars - 1 - start - per_page, -1), -1
+        )
+        body: bytes = json.dumps(
+            [make_repo(i, self.owner_count) for i in repo_ids]
+        ).encode("utf-8")
+        etag: str = f'W/"{hashlib.md5(body).hexdigest()}"'
+
+        with self._lock:
+            self._pages[cache_key] = (body, etag)
+            self._etags[cache_key] = etag
+            while len(self._pages) > self.page_cache_size:
+                self._pages.popitem(last=False)
+
+        return body, etag
+
+    def _get_link_header(self, url: httpx.URL, page: int, last_page: int) -> str | None:
+        links: list[tuple[int, str]] = []
+
+        if page < last_page:
+            links += [(page + 1, "next"), (last_page, "last")]
+        if page > 1:
+            links += [(1, "first"), (page - 1, "prev")]
+
+        if not links:
+            return None
+
+        return ", ".join(
+            f'<{url.copy_set_param("page", link_page)}>; rel="{rel}"'
+            for link_page, rel in links
+        )
+
+    def _build_response(self, request: httpx.Request) -> httpx.Response:
+        path: str = request.url.path
+        if_none_match: str | None = request.headers.get("If-None-Match")
+
+        with self._lock:
+            self.request_count += 1
+
+        if path == "/user":
+            rate_limit_headers, allowed = self._take_rate_limit(request, counts=True)
+            if not allowed:
+                return self._rate_limited_response(rate_limit_headers)
+
+            token: str = request.headers.get("Authorization", "")
+            login: str = f"mock-user-{hashlib.sha256(token.encode()).hexdigest()[:8]}"
+
+            return self._json_response(
+                200, {"login": login, "id": 1, "type": "User"}, rate_limit_headers
+            )
+
+        if path != "/user/starred":
+            return self._json_response(
+                404,
+                {
+                    "message": "Not Found",
+                    "documentation_url": "https://docs.github.com/rest",
+                },
+                {},
+            )
+
+        try:
+            per_page: int = min(
+                100, max(1, int(request.url.params.get("per_page", 30)))
+            )
+            page: int = max(1, int(request.url.params.get("page", 1)))
+        except ValueError:
+            return self._json_response(422, {"message": "Validation Failed"}, {})
+
+        with self._lock:
+            etag: str | None = self._etags.get((per_page, page))
+
+        not_modified: bool = if_none_match is not None and if_none_match == etag
+        if not not_modified:
+            body, etag = self._get_page(per_page, page)
+
+        ## Conditional requests answered with a 304 do not count against the rate limit
+        rate_limit_headers, allowed = self._take_rate_limit(
+            request, counts=not not_modified
+        )
+        if not allowed:
+            return self._rate_limited_response(rate_limit_headers)
+
+        headers: dict[str, str] = {
+            **rate_limit_headers,
+            "ETag": etag,
+            "Cache-Control": "private, max-age=60, s-maxage=60",
+            "Vary": "Accept, Authorization, Cookie, X-GitHub-OTP",
+        }
+
+        last_page: int = max(1, -(-self.total_stars // per_page))
+        link: str | None = self._get_link_header(
+            request.url.copy_remove_param("page"), page, last_page
+        )
+        if link:
+            headers["Link"] = link
+
+        if not_modified:
+            with self._lock:
+                self.not_modified_count += 1
+
+            return httpx.Response(304, headers=headers)
+
+        with self._lock:
+            self.bytes_sent += len(body)
+
+        return httpx.Response(
+            200,
+            headers={**headers, "Content-Type": "application/json; charset=utf-8"},
+            content=body,
+        )
+
+    def _json_response(
+        self, status_code: int, data: t.Any, headers: dict[str, str]
+    ) -> httpx.Response:
+        return httpx.Response(
+            status_code,
+            headers={**headers, "Content-Type": "application/json; charset=utf-8"},
+            content=json.dumps(data).encode("utf-8"),
+        )
+
+    def _rate_limited_response(
+        self, rate_limit_headers: dict[str, str]
+    ) -> httpx.Response:
+        with self._lock:
+            self.rate_limited_count += 1
+
+        return self._json_response(
+            403,
+            {
+                "message": "API rate limit exceeded for user.",
+                "documentation_url": "https://docs.github.com/rest/overview/rate-limits-for-the-rest-api",
+            },
+            rate_limit_headers,
+        )